@@ -0,0 +1,4 @@
+"""Benchmarks for the lime_uow hot paths
+
+Run them with ``python -m benchmarks``; see ``python -m benchmarks --help`` for the options.
+"""
@@ -0,0 +1,77 @@
+"""Run the benchmarks and optionally compare them against a baseline
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --baseline benchmarks/baseline.json --tolerance 0.25
+
+The exit status is 1 when any benchmark is slower per operation than the baseline by more than the
+tolerance.  Baselines are only comparable on the machine they were recorded on.
+"""
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import pathlib
+import sys
+import typing
+
+from benchmarks import cases  # noqa: F401  # registers the benchmarks
+from benchmarks import runner
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=100_000,
+        help="number of items for the repository and file benchmarks (default: %(default)s)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument(
+        "-k", "--filter", help="only run benchmarks whose name matches this glob pattern"
+    )
+    parser.add_argument("--output", type=pathlib.Path, help="write the results to this JSON file")
+    parser.add_argument("--baseline", type=pathlib.Path, help="compare against this results file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed slowdown relative to the baseline (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    benchmarks = [
+        bm
+        for bm in runner.registered(args.scale)
+        if args.filter is None or fnmatch.fnmatch(bm.name, args.filter)
+    ]
+    results = runner.run(
+        benchmarks,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        log=lambda line: print(line, file=sys.stderr),
+    )
+    if args.output:
+        runner.save_results(results, args.output)
+    else:
+        print(json.dumps(runner.to_json(results), indent=2))
+
+    if args.baseline is None:
+        return 0
+
+    regressions = 0
+    for comparison in runner.compare(results, runner.load_results(args.baseline)):
+        regressed = comparison.is_regression(args.tolerance)
+        regressions += regressed
+        print(
+            f"{comparison.name:<45} {comparison.ratio:>6.2f}x"
+            f"{'  REGRESSION' if regressed else ''}",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""The benchmarked operations
+
+Each function registered with @benchmark takes the scale (the number of items used by the repository
+and file benchmarks) and returns a Benchmark whose size is the number of operations one timed call makes.
+"""
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import subprocess
+import sys
+import typing
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+
+import lime_uow as lu
+from lime_uow import sqlalchemy_resources as lsa
+from benchmarks.runner import Benchmark, benchmark
+
+
+@dataclasses.dataclass(frozen=True)
+class Item:
+    item_id: int
+    name: str
+
+
+class SharedThing(lu.Resource[str]):
+    @classmethod
+    def interface(cls) -> typing.Type[SharedThing]:
+        return cls
+
+    def open(self) -> str:
+        return "shared"
+
+
+class LocalThing(lu.Resource[str]):
+    def __init__(self, shared: str, /):
+        self._shared = shared
+
+    @classmethod
+    def interface(cls) -> typing.Type[LocalThing]:
+        return cls
+
+    def open(self) -> str:
+        return self._shared
+
+
+class ItemRepository(lu.DummyRepository[Item]):
+    def __init__(self, items: typing.Iterable[Item] = ()):
+        super().__init__(key_fn=lambda item: item.item_id, initial_values=items)
+
+    @classmethod
+    def interface(cls) -> typing.Type[ItemRepository]:
+        return cls
+
+
+class BenchUOW(lu.UnitOfWork):
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return [LocalThing(shared_resources.get(SharedThing))]
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return [SharedThing()]
+
+
+def make_items(n: int, /) -> typing.List[Item]:
+    return [Item(item_id=i, name=f"item {i}") for i in range(n)]
+
+
+@benchmark
+def uow_enter_exit(scale: int) -> Benchmark:
+    @contextlib.contextmanager
+    def setup(size: int):
+        uow = BenchUOW()
+
+        def fn():
+            for _ in range(size):
+                with uow:
+                    pass
+
+        yield fn
+        uow.close()
+
+    return Benchmark("uow.enter_exit", setup, size=10_000)
+
+
+@benchmark
+def uow_get(scale: int) -> Benchmark:
+    @contextlib.contextmanager
+    def setup(size: int):
+        uow = BenchUOW()
+        with uow:
+
+            def fn():
+                for _ in range(size):
+                    uow.get(LocalThing)
+
+            yield fn
+        uow.close()
+
+    return Benchmark("uow.get", setup, size=100_000)
+
+
+@benchmark
+def shared_resources_get(scale: int) -> Benchmark:
+    @contextlib.contextmanager
+    def setup(size: int):
+        with lu.SharedResources(SharedThing()) as shared_resources:
+            shared_resources.get(SharedThing)
+
+            def fn():
+                for _ in range(size):
+                    shared_resources.get(SharedThing)
+
+            yield fn
+
+    return Benchmark("shared_resources.get", setup, size=100_000)
+
+
+@benchmark
+def dummy_repository_add(scale: int) -> Benchmark:
+    @contextlib.contextmanager
+    def setup(size: int):
+        items = make_items(size)
+        repo = ItemRepository()
+
+        def fn():
+            for item in items:
+                repo.add(item)
+
+        yield fn
+
+    return Benchmark("dummy_repository.add", setup, size=scale)
+
+
+@benchmark
+def dummy_repository_add_all(scale: int) -> Benchmark:
+    @contextlib.contextmanager
+    def setup(size: int):
+        items = make_items(size)
+        repo = ItemRepository()
+        yield lambda: repo.add_all(items)
+
+    return Benchmark("dummy_repository.add_all", setup, size=scale)
+
+
+@benchmark
+def dummy_repository_set_all_save(scale: int) -> Benchmark:
+    @contextlib.contextmanager
+    def setup(size: int):
+        items = make_items(size)
+        repo = ItemRepository(items)
+
+        def fn():
+            repo.set_all(items)
+            repo.save()
+
+        yield fn
+
+    return Benchmark("dummy_repository.set_all+save", setup, size=scale)
+
+
+@benchmark
+def dummy_repository_get(scale: int) -> Benchmark:
+    # get is a linear scan, so a handful of lookups spread over the repository is enough
+    @contextlib.contextmanager
+    def setup(size: int):
+        repo = ItemRepository(make_items(scale))
+        keys = [scale * i // size for i in range(size)]
+
+        def fn():
+            for key in keys:
+                repo.get(key)
+
+        yield fn
+
+    return Benchmark(f"dummy_repository.get[n={scale}]", setup, size=100)
+
+
+class MappedItem:
+    def __init__(self, item_id: int, name: str):
+        self.item_id = item_id
+        self.name = name
+
+
+metadata = sa.MetaData()
+
+item_table = sa.Table(
+    "items",
+    metadata,
+    sa.Column("item_id", sa.Integer, primary_key=True),
+    sa.Column("name", sa.String, nullable=False),
+)
+
+
+def ensure_mapped() -> None:
+    """Map MappedItem to item_table, unless it already is (mappings can be cleared by other code)"""
+    try:
+        orm.class_mapper(MappedItem)
+    except orm.exc.UnmappedClassError:
+        orm.mapper(MappedItem, item_table)
+
+
+class MappedItemRepository(lsa.SqlAlchemyRepository[MappedItem]):
+    @property
+    def entity_type(self) -> typing.Type[MappedItem]:
+        return MappedItem
+
+    @classmethod
+    def interface(cls) -> typing.Type[MappedItemRepository]:
+        return cls
+
+
+@contextlib.contextmanager
+def sqlite_repository() -> typing.Iterator[MappedItemRepository]:
+    ensure_mapped()
+    engine = sa.create_engine("sqlite://")
+    metadata.create_all(engine)
+    session = orm.sessionmaker(bind=engine)()
+    try:
+        yield MappedItemRepository(session)
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@benchmark
+def sqlalchemy_repository_add_all(scale: int) -> Benchmark:
+    @contextlib.contextmanager
+    def setup(size: int):
+        ensure_mapped()
+        items = [MappedItem(i, f"item {i}") for i in range(size)]
+        with sqlite_repository() as repo:
+
+            def fn():
+                repo.add_all(items)
+                repo.save()
+
+            yield fn
+
+    return Benchmark(
+        "sqlalchemy_repository.add_all+save[sqlite]", setup, size=max(scale // 10, 1)
+    )
+
+
+@benchmark
+def sqlalchemy_repository_set_all(scale: int) -> Benchmark:
+    @contextlib.contextmanager
+    def setup(size: int):
+        with sqlite_repository() as repo:
+            repo.add_all([MappedItem(i, f"item {i}") for i in range(size)])
+            repo.save()
+            items = [MappedItem(i, f"new item {i}") for i in range(size)]
+
+            def fn():
+                repo.set_all(items)
+                repo.save()
+
+            yield fn
+
+    return Benchmark(
+        "sqlalchemy_repository.set_all+save[sqlite]", setup, size=max(scale // 10, 1)
+    )
+
+
+@benchmark
+def temp_file_add(scale: int) -> Benchmark:
+    @contextlib.contextmanager
+    def setup(size: int):
+        lines = [f"{i},item {i}\n" for i in range(size)]
+        with lu.TempFileSharedResource() as resource:
+
+            def fn():
+                for line in lines:
+                    resource.add(line)
+                resource.save()
+
+            yield fn
+
+    return Benchmark("temp_file.add+save", setup, size=scale)
+
+
+@benchmark
+def temp_file_add_all(scale: int) -> Benchmark:
+    @contextlib.contextmanager
+    def setup(size: int):
+        lines = [f"{i},item {i}\n" for i in range(size)]
+        with lu.TempFileSharedResource() as resource:
+
+            def fn():
+                resource.add_all(lines)
+                resource.save()
+
+            yield fn
+
+    return Benchmark("temp_file.add_all+save", setup, size=scale)
+
+
+@benchmark
+def import_lime_uow(scale: int) -> Benchmark:
+    @contextlib.contextmanager
+    def setup(size: int):
+        code = "import lime_uow as lu; lu.UnitOfWork; lu.SharedResources"
+        yield lambda: subprocess.run([sys.executable, "-c", code], check=True)
+
+    return Benchmark("import lime_uow (cold process)", setup, size=1)
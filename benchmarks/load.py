@@ -0,0 +1,422 @@
+"""Load generator for UnitOfWork throughput and latency under concurrency
+
+    python -m benchmarks.load --backend sqlite --mode thread --workers 1,2,4,8 --duration 10
+    python -m benchmarks.load --backend memory --mode process --workers 4 --write-ratio 0.5
+
+Each worker runs transactions in a loop for the duration of the run.  A transaction performs
+--ops-per-transaction reads or writes (a write with probability --write-ratio) and then saves.  The
+report, printed as JSON, has the overall throughput and latency percentiles for each worker count,
+plus the same figures for each --interval second window so warm-up and degradation over time are visible.
+
+With the sqlite backend, --engine shared makes the thread workers share one engine (and its connection
+pool) instead of each opening their own.  Process workers always open their own.  With the memory backend,
+the thread workers share one in-memory table, and a transaction holds its lock from its first get() until
+it ends, so contention shows up as latency.  Process workers each have their own table.
+"""
+from __future__ import annotations
+
+import argparse
+import array
+import concurrent.futures
+import dataclasses
+import json
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import threading
+import time
+import typing
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+
+import lime_uow as lu
+from lime_uow import sqlalchemy_resources as lsa
+from benchmarks import cases
+
+__all__ = (
+    "LoadConfig",
+    "LoadReport",
+    "run_load",
+)
+
+Backend = typing.Literal["memory", "sqlite"]
+Mode = typing.Literal["thread", "process"]
+EngineMode = typing.Literal["per-worker", "shared"]
+
+
+@dataclasses.dataclass(frozen=True)
+class LoadConfig:
+    backend: Backend = "memory"
+    mode: Mode = "thread"
+    workers: int = 1
+    duration: float = 5.0
+    interval: float = 1.0
+    write_ratio: float = 0.2
+    ops_per_transaction: int = 1
+    rows: int = 1_000
+    engine: EngineMode = "per-worker"
+    db_path: typing.Optional[str] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class LatencySummary:
+    transactions: int
+    errors: int
+    throughput: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+@dataclasses.dataclass(frozen=True)
+class LoadReport:
+    config: LoadConfig
+    overall: LatencySummary
+    timeline: typing.List[LatencySummary]
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return dataclasses.asdict(self)
+
+
+class _PreparedEngine(lsa.SqlAlchemyEngine):
+    """An engine opened up front, so thread workers can share its connection pool
+
+    close() disposes of the engine if it is owned, that is if it is not the engine shared by run_load.
+    """
+
+    def __init__(self, engine: sa.engine.Engine, /, *, owned: bool):
+        super().__init__(str(engine.url))
+        self._engine = engine
+        self._owned = owned
+
+    def close(self) -> None:
+        if self._owned and self._engine is not None:
+            self._engine.dispose()
+
+
+class _SessionItemRepository(cases.MappedItemRepository):
+    """MappedItemRepository that closes its session when the unit of work closes it at the end of a transaction"""
+
+    def close(self) -> None:
+        self.session.close()
+
+    @classmethod
+    def interface(cls) -> typing.Type[cases.MappedItemRepository]:
+        return cases.MappedItemRepository
+
+
+class _SqliteUOW(lu.UnitOfWork):
+    def __init__(self, engine: _PreparedEngine, /):
+        super().__init__()
+        self._engine = engine
+        self._session_factory: typing.Optional[orm.sessionmaker] = None
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            # the engine is opened up front, so it is disposed of even if no transaction used it
+            self._engine.close()
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        if self._session_factory is None:
+            self._session_factory = orm.sessionmaker(
+                bind=shared_resources.get(lsa.SqlAlchemyEngine)
+            )
+        return [_SessionItemRepository(self._session_factory())]
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return [self._engine]
+
+
+class _MemoryRepository(lu.ColumnarRepository[cases.Item]):
+    def __init__(self, rows: int, /):
+        super().__init__(
+            entity_type=cases.Item,
+            key_fn=lambda item: item.item_id,
+            initial_values=cases.make_items(rows),
+        )
+
+    @classmethod
+    def interface(cls) -> typing.Type[_MemoryRepository]:
+        return cls
+
+
+class _MemoryTable:
+    """The repository the memory workers of a run share, and the lock a transaction holds while using it"""
+
+    def __init__(self, rows: int, /):
+        self.repository = _MemoryRepository(rows)
+        self.lock = threading.Lock()
+
+
+class _LockedMemoryRepository(lu.Resource[_MemoryRepository]):
+    """A worker's access to a _MemoryTable: the table is locked from open() until the transaction ends"""
+
+    def __init__(self, table: _MemoryTable, /):
+        self._table = table
+        self._locked = False
+
+    @classmethod
+    def interface(cls) -> typing.Type[_MemoryRepository]:
+        return _MemoryRepository
+
+    def open(self) -> _MemoryRepository:
+        if not self._locked:
+            self._table.lock.acquire()
+            self._locked = True
+        return self._table.repository
+
+    def close(self) -> None:
+        self._unlock()
+
+    def reset(self) -> bool:
+        self._unlock()
+        return True
+
+    def rollback(self) -> None:
+        if self._locked:
+            self._table.repository.rollback()
+        self._unlock()
+
+    def save(self) -> None:
+        if self._locked:
+            self._table.repository.save()
+
+    def _unlock(self) -> None:
+        if self._locked:
+            self._locked = False
+            self._table.lock.release()
+
+
+class _MemoryUOW(lu.UnitOfWork):
+    def __init__(self, table: _MemoryTable, /):
+        super().__init__()
+        self._table = table
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return [_LockedMemoryRepository(self._table)]
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return []
+
+
+# the engine, or the memory table, shared by thread workers; set by run_load for the duration of a run
+_shared_engine: typing.Optional[sa.engine.Engine] = None
+_shared_table: typing.Optional[_MemoryTable] = None
+
+
+def _sqlite_engine(db_path: str, /) -> sa.engine.Engine:
+    # wait on locks rather than failing straight away, so contention shows up as latency
+    return sa.create_engine(f"sqlite:///{db_path}", connect_args={"timeout": 30})
+
+
+def _create_uow(config: LoadConfig, /) -> lu.UnitOfWork:
+    if config.backend == "memory":
+        return _MemoryUOW(_shared_table or _MemoryTable(config.rows))
+    elif _shared_engine is not None:
+        return _SqliteUOW(_PreparedEngine(_shared_engine, owned=False))
+    else:
+        return _SqliteUOW(
+            _PreparedEngine(_sqlite_engine(typing.cast(str, config.db_path)), owned=True)
+        )
+
+
+def _repository_type(config: LoadConfig, /) -> typing.Type[lu.Repository[typing.Any]]:
+    return _MemoryRepository if config.backend == "memory" else cases.MappedItemRepository
+
+
+def _new_item(config: LoadConfig, item_id: int, name: str, /) -> typing.Any:
+    if config.backend == "memory":
+        return cases.Item(item_id=item_id, name=name)
+    return cases.MappedItem(item_id, name)
+
+
+def _worker(
+    config: LoadConfig, worker_id: int, start_at: float, /
+) -> typing.Tuple["array.array[float]", "array.array[float]", int]:
+    """Run transactions until the run ends and return when each finished, its latency, and the error count"""
+    if config.backend == "sqlite":
+        cases.ensure_mapped()
+    rng = random.Random(worker_id)
+    repository_type = _repository_type(config)
+    finished_at = array.array("d")
+    latencies = array.array("d")
+    errors = 0
+    uow = _create_uow(config)
+    try:
+        time.sleep(max(start_at - time.time(), 0))
+        stop_at = start_at + config.duration
+        while (now := time.time()) < stop_at:
+            start = time.perf_counter()
+            try:
+                with uow:
+                    repo = uow.get(repository_type)
+                    for _ in range(config.ops_per_transaction):
+                        item_id = rng.randrange(config.rows)
+                        if rng.random() < config.write_ratio:
+                            repo.update(
+                                _new_item(config, item_id, f"worker {worker_id} at {now}")
+                            )
+                        else:
+                            repo.get(item_id)
+                    uow.save()
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            finished_at.append(time.time() - start_at)
+    finally:
+        uow.close()
+    return finished_at, latencies, errors
+
+
+def _percentile(sorted_values: typing.Sequence[float], q: float, /) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def _summarize(
+    latencies: typing.Sequence[float], errors: int, seconds: float, /
+) -> LatencySummary:
+    ordered = sorted(latencies)
+    return LatencySummary(
+        transactions=len(ordered),
+        errors=errors,
+        throughput=len(ordered) / seconds if seconds else 0.0,
+        p50=_percentile(ordered, 0.5),
+        p95=_percentile(ordered, 0.95),
+        p99=_percentile(ordered, 0.99),
+        max=ordered[-1] if ordered else 0.0,
+    )
+
+
+def _prepare_sqlite(config: LoadConfig, /) -> None:
+    cases.ensure_mapped()
+    engine = _sqlite_engine(typing.cast(str, config.db_path))
+    try:
+        cases.metadata.drop_all(engine)
+        cases.metadata.create_all(engine)
+        with engine.begin() as con:
+            con.execute(
+                cases.item_table.insert(),
+                [{"item_id": i, "name": f"item {i}"} for i in range(config.rows)],
+            )
+    finally:
+        engine.dispose()
+
+
+def run_load(config: LoadConfig, /) -> LoadReport:
+    global _shared_engine, _shared_table
+
+    if config.backend == "memory" and config.mode == "thread":
+        _shared_table = _MemoryTable(config.rows)
+    elif config.backend == "sqlite":
+        if config.db_path is None:
+            config = dataclasses.replace(
+                config,
+                db_path=os.path.join(tempfile.mkdtemp(prefix="lime_uow_load_"), "load.db"),
+            )
+        _prepare_sqlite(config)
+        if config.engine == "shared" and config.mode == "thread":
+            _shared_engine = _sqlite_engine(typing.cast(str, config.db_path))
+
+    executor_type: typing.Type[concurrent.futures.Executor] = (
+        concurrent.futures.ProcessPoolExecutor
+        if config.mode == "process"
+        else concurrent.futures.ThreadPoolExecutor
+    )
+    # leave time for the workers to start, so they all begin together
+    start_at = time.time() + (1.0 if config.mode == "process" else 0.1)
+    try:
+        with executor_type(max_workers=config.workers) as executor:
+            futures = [
+                executor.submit(_worker, config, worker_id, start_at)
+                for worker_id in range(config.workers)
+            ]
+            worker_results = [future.result() for future in futures]
+    finally:
+        _shared_table = None
+        if _shared_engine is not None:
+            _shared_engine.dispose()
+            _shared_engine = None
+
+    intervals = max(int(config.duration / config.interval + 0.5), 1)
+    windows: typing.List[typing.List[float]] = [[] for _ in range(intervals)]
+    all_latencies: typing.List[float] = []
+    errors = 0
+    for finished_at, latencies, worker_errors in worker_results:
+        errors += worker_errors
+        all_latencies.extend(latencies)
+        for offset, latency in zip(finished_at, latencies):
+            windows[min(int(offset / config.interval), intervals - 1)].append(latency)
+
+    return LoadReport(
+        config=config,
+        overall=_summarize(all_latencies, errors, config.duration),
+        timeline=[_summarize(window, 0, config.interval) for window in windows],
+    )
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument(
+        "--workers",
+        default="1",
+        help="worker count, or a comma separated list of counts to sweep (default: %(default)s)",
+    )
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per run")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds per timeline window")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--ops-per-transaction", type=int, default=1)
+    parser.add_argument("--rows", type=int, default=1_000)
+    parser.add_argument("--engine", choices=["per-worker", "shared"], default="per-worker")
+    parser.add_argument("--db-path", help="sqlite database file (default: a temporary file)")
+    parser.add_argument("--output", type=pathlib.Path, help="write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    reports = []
+    for workers in (int(n) for n in args.workers.split(",")):
+        report = run_load(
+            LoadConfig(
+                backend=args.backend,
+                mode=args.mode,
+                workers=workers,
+                duration=args.duration,
+                interval=args.interval,
+                write_ratio=args.write_ratio,
+                ops_per_transaction=args.ops_per_transaction,
+                rows=args.rows,
+                engine=args.engine,
+                db_path=args.db_path,
+            )
+        )
+        overall = report.overall
+        print(
+            f"workers={workers:<4} {overall.throughput:>10.1f} txn/s  "
+            f"p50={overall.p50 * 1e3:.3f}ms p99={overall.p99 * 1e3:.3f}ms errors={overall.errors}",
+            file=sys.stderr,
+        )
+        reports.append(report.to_dict())
+
+    content = json.dumps(reports, indent=2)
+    if args.output:
+        args.output.write_text(content + "\n")
+    else:
+        print(content)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import dataclasses
+import gc
+import json
+import pathlib
+import platform
+import statistics
+import sys
+import time
+import typing
+
+__all__ = (
+    "Benchmark",
+    "Comparison",
+    "Result",
+    "benchmark",
+    "compare",
+    "load_results",
+    "run",
+    "save_results",
+)
+
+# a benchmark's setup is a context manager that yields the operation to time and cleans up after it
+Setup = typing.Callable[[int], typing.ContextManager[typing.Callable[[], typing.Any]]]
+
+
+@dataclasses.dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Setup
+    size: int = 1
+    """Number of operations one call of the timed function performs, used to report per-op times"""
+
+
+@dataclasses.dataclass(frozen=True)
+class Result:
+    name: str
+    size: int
+    repeat: int
+    min: float
+    median: float
+    stdev: float
+
+    @property
+    def per_op(self) -> float:
+        return self.median / self.size
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {**dataclasses.asdict(self), "per_op": self.per_op}
+
+
+@dataclasses.dataclass(frozen=True)
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def is_regression(self, tolerance: float) -> bool:
+        return self.ratio > 1 + tolerance
+
+
+_REGISTRY: typing.List[typing.Callable[[int], Benchmark]] = []
+
+
+def benchmark(fn: typing.Callable[[int], Benchmark], /) -> typing.Callable[[int], Benchmark]:
+    """Register a function that builds a Benchmark for a given scale"""
+    _REGISTRY.append(fn)
+    return fn
+
+
+def registered(scale: int, /) -> typing.List[Benchmark]:
+    return [fn(scale) for fn in _REGISTRY]
+
+
+def run(
+    benchmarks: typing.Iterable[Benchmark],
+    /,
+    *,
+    repeat: int = 5,
+    warmup: int = 1,
+    log: typing.Optional[typing.Callable[[str], None]] = None,
+) -> typing.List[Result]:
+    """Time each benchmark repeat times after warmup untimed runs
+
+    A fresh operation is set up for every run, so state left behind by one run can't skew the next.
+    The garbage collector is disabled while timing, as timeit does.
+    """
+    results = []
+    for bm in benchmarks:
+        timings = []
+        for ix in range(warmup + repeat):
+            with bm.setup(bm.size) as fn:
+                gc_enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    start = time.perf_counter()
+                    fn()
+                    elapsed = time.perf_counter() - start
+                finally:
+                    if gc_enabled:
+                        gc.enable()
+            if ix >= warmup:
+                timings.append(elapsed)
+        result = Result(
+            name=bm.name,
+            size=bm.size,
+            repeat=repeat,
+            min=min(timings),
+            median=statistics.median(timings),
+            stdev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        )
+        if log:
+            log(f"{result.name:<45} {result.per_op * 1e6:>12.3f} us/op  (n={result.size})")
+        results.append(result)
+    return results
+
+
+def compare(
+    results: typing.Iterable[Result],
+    baseline: typing.Mapping[str, typing.Mapping[str, typing.Any]],
+    /,
+) -> typing.List[Comparison]:
+    """Compare per-op medians against a baseline loaded with load_results
+
+    Benchmarks missing from the baseline are skipped.
+    """
+    return [
+        Comparison(
+            name=result.name,
+            baseline=baseline[result.name]["per_op"],
+            current=result.per_op,
+        )
+        for result in results
+        if result.name in baseline
+    ]
+
+
+def load_results(
+    file_path: pathlib.Path, /
+) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    content = json.loads(file_path.read_text())
+    return {result["name"]: result for result in content["results"]}
+
+
+def save_results(results: typing.Iterable[Result], file_path: pathlib.Path, /) -> None:
+    file_path.write_text(json.dumps(to_json(results), indent=2) + "\n")
+
+
+def to_json(results: typing.Iterable[Result], /) -> typing.Dict[str, typing.Any]:
+    return {
+        "machine": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "results": [result.to_dict() for result in results],
+    }
@@ -1,5 +1,71 @@
-"""Barrel file for the library"""
-from lime_uow import exceptions
-from lime_uow.resources import *
-from lime_uow.shared_resource_manager import *
-from lime_uow.unit_of_work import *
+"""Barrel file for the library
+
+The public names are loaded from their modules on first access, so importing lime_uow stays cheap.
+"""
+import typing
+
+from lime_uow import _lazy, exceptions
+
+__getattr__, __dir__, __all__ = _lazy.attach(
+    __name__,
+    exports={
+        "bulk_load": ("BulkLoadStats", "load_staged_file"),
+        "group_commit": ("GroupCommitter",),
+        "identity_map": ("IdentityMap",),
+        "instrumentation": ("Event", "Histogram", "Listener", "MetricsCollector"),
+        "process_pool": ("ProcessPoolRunner",),
+        "replica_router": ("ReplicaRouter",),
+        "retry": ("RETRYABLE_SQLSTATES", "RetryPolicy", "is_retryable"),
+        "resources": (
+            "ColumnarRepository",
+            "DummyRepository",
+            "FileRepository",
+            "ReadOnlyRepository",
+            "Repository",
+            "Resource",
+            "ShardedRepository",
+            "SpooledTempFileSharedResource",
+            "TempFileSharedResource",
+            "WriteBehindRepository",
+            "WriteStats",
+            "check_for_ambiguous_implementations",
+        ),
+        "shared_resource_manager": (
+            "ExpiryPolicy",
+            "PlaceholderSharedResources",
+            "SharedResources",
+        ),
+        "slow_transaction_log": (
+            "JsonLinesSink",
+            "LoggerSink",
+            "ResourceTimings",
+            "SlowTransaction",
+            "SlowTransactionLog",
+        ),
+        "tracing": (
+            "InMemorySpan",
+            "InMemoryTracer",
+            "OpenTelemetryTracer",
+            "Span",
+            "Tracer",
+            "TracingListener",
+        ),
+        "unit_of_work": ("PlaceholderUnitOfWork", "UnitOfWork"),
+    },
+    submodules=("pyodbc_resources", "sqlalchemy_resources"),
+)
+__all__ += ("exceptions",)
+
+if typing.TYPE_CHECKING:
+    from lime_uow.bulk_load import *
+    from lime_uow.group_commit import *
+    from lime_uow.identity_map import *
+    from lime_uow.instrumentation import *
+    from lime_uow.process_pool import *
+    from lime_uow.replica_router import *
+    from lime_uow.resources import *
+    from lime_uow.retry import *
+    from lime_uow.shared_resource_manager import *
+    from lime_uow.slow_transaction_log import *
+    from lime_uow.tracing import *
+    from lime_uow.unit_of_work import *
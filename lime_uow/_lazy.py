@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import importlib
+import typing
+
+__all__ = ("attach",)
+
+
+def attach(
+    package_name: str,
+    /,
+    *,
+    exports: typing.Mapping[str, typing.Iterable[str]],
+    submodules: typing.Iterable[str] = (),
+) -> typing.Tuple[
+    typing.Callable[[str], typing.Any],
+    typing.Callable[[], typing.List[str]],
+    typing.Tuple[str, ...],
+]:
+    """Build the module-level __getattr__, __dir__ and __all__ for a lazily loaded barrel (PEP 562)
+
+    exports maps each submodule to the names it contributes.  A name's submodule is only imported
+    the first time the name is accessed, and the value is then cached in the package namespace.
+    """
+    package = importlib.import_module(package_name)
+    origins = {
+        name: f"{package_name}.{module_name}"
+        for module_name, names in exports.items()
+        for name in names
+    }
+    lazy_submodules = frozenset((*exports, *submodules))
+
+    def __getattr__(name: str) -> typing.Any:
+        if name in origins:
+            value = getattr(importlib.import_module(origins[name]), name)
+        elif name in lazy_submodules:
+            value = importlib.import_module(f"{package_name}.{name}")
+        else:
+            raise AttributeError(
+                f"module {package_name!r} has no attribute {name!r}"
+            )
+        setattr(package, name, value)
+        return value
+
+    def __dir__() -> typing.List[str]:
+        return sorted({*vars(package), *origins, *lazy_submodules})
+
+    return __getattr__, __dir__, tuple(origins)
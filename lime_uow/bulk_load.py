@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import csv
+import dataclasses
+import itertools
+import time
+import typing
+
+from lime_uow.resources import temp_file
+
+__all__ = (
+    "BulkLoadStats",
+    "load_staged_file",
+)
+
+Row = typing.Tuple[typing.Optional[str], ...]
+
+
+@dataclasses.dataclass(frozen=True)
+class BulkLoadStats:
+    rows: int
+    chunks: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def load_staged_file(
+    source: temp_file.TempFileSharedResource,
+    /,
+    load_chunk: typing.Callable[[typing.Sequence[str], typing.List[Row]], None],
+    *,
+    columns: typing.Optional[typing.Sequence[str]] = None,
+    header: bool = True,
+    delimiter: str = ",",
+    chunk_size: int = 10_000,
+    null_value: typing.Optional[str] = None,
+) -> BulkLoadStats:
+    """Stream the delimited rows staged in source to load_chunk, chunk_size rows at a time
+
+    If columns is not provided, the header row is used for the column names.  Fields equal to
+    null_value are passed on as None.  Nothing is committed here; the caller's resource does that
+    when the unit of work is saved.
+    """
+    start = time.perf_counter()
+    rows = csv.reader(source.iter_lines(), delimiter=delimiter)
+    if header:
+        header_row = next(rows, None)
+        if columns is None:
+            columns = header_row
+    if not columns:
+        raise ValueError("No columns were provided, and the source does not have a header.")
+
+    row_ct = 0
+    chunk_ct = 0
+    while raw_chunk := list(itertools.islice(rows, chunk_size)):
+        chunk: typing.List[Row] = [
+            tuple(None if value == null_value else value for value in row)
+            if null_value is not None
+            else tuple(row)
+            for row in raw_chunk
+        ]
+        load_chunk(columns, chunk)
+        row_ct += len(chunk)
+        chunk_ct += 1
+
+    return BulkLoadStats(
+        rows=row_ct, chunks=chunk_ct, seconds=time.perf_counter() - start
+    )
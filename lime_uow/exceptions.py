@@ -2,11 +2,15 @@ import typing
 
 __all__ = (
     "LimeUoWException",
+    "DuplicateKeyError",
     "MultipleRegisteredImplementations",
+    "CloseErrors",
     "InvalidResource",
     "MissingResourceError",
     "OutsideTransactionError",
     "RollbackError",
+    "ShardErrors",
+    "UncommittedChanges",
 )
 
 
@@ -29,6 +33,20 @@ class MultipleRegisteredImplementations(LimeUoWException):
         super().__init__(msg)
 
 
+class CloseErrors(LimeUoWException):
+    def __init__(self, errors: typing.Mapping[str, BaseException], /):
+        self.errors = errors
+        details = "; ".join(f"{name}: {e!r}" for name, e in sorted(errors.items()))
+        super().__init__(
+            f"The following errors occurred while closing resources: {details}."
+        )
+
+
+class DuplicateKeyError(LimeUoWException):
+    def __init__(self, /, message: str):
+        super().__init__(message)
+
+
 class InvalidResource(LimeUoWException):
     def __init__(self, /, message: str):
         super().__init__(message)
@@ -86,3 +104,18 @@ class ResourcesAlreadyOpen(LimeUoWException):
 class ResourceClosed(LimeUoWException):
     def __init__(self):
         super().__init__("Attempted to access a closed resource.")
+
+
+class ShardErrors(LimeUoWException):
+    def __init__(self, action: str, errors: typing.Mapping[int, BaseException], /):
+        self.action = action
+        self.errors = errors
+        details = "; ".join(f"shard {ix}: {e!r}" for ix, e in sorted(errors.items()))
+        super().__init__(
+            f"{len(errors)} shard(s) failed during {action}: {details}."
+        )
+
+
+class UncommittedChanges(LimeUoWException):
+    def __init__(self, /, message: str):
+        super().__init__(message)
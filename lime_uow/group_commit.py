@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import concurrent.futures
+import dataclasses
+import queue
+import threading
+import time
+import typing
+
+from lime_uow import exceptions, retry
+
+if typing.TYPE_CHECKING:
+    from lime_uow import unit_of_work
+
+__all__ = ("GroupCommitter",)
+
+R = typing.TypeVar("R")
+
+
+@dataclasses.dataclass(frozen=True)
+class _Operation:
+    fn: typing.Callable[..., typing.Any]
+    args: typing.Tuple[typing.Any, ...]
+    kwargs: typing.Dict[str, typing.Any]
+    future: concurrent.futures.Future  # type: ignore
+
+
+# put on the queue by close() to stop the committer thread
+_STOP = object()
+
+
+class _OperationFailed(Exception):
+    """Aborts a batch whose resources cannot roll back just the failed operation"""
+
+    def __init__(self, operation: _Operation, error: BaseException, /):
+        self.operation = operation
+        self.error = error
+        super().__init__(str(error))
+
+
+class GroupCommitter:
+    """Run small write operations from many producers in shared transactions
+
+    submit() queues fn(uow, *args, **kwargs) and returns a Future.  A background thread takes up to
+    max_batch_size queued operations, waiting at most max_delay seconds after the first one for more to
+    arrive, runs them all in one transaction of uow and saves it.  Each future then resolves to the
+    operation's return value, or to the error raised by the commit.
+
+    Each operation runs in a savepoint, so one that raises only fails its own future and the rest of the
+    batch is still committed.  If a resource does not support savepoints (see
+    UnitOfWork.supports_savepoints), a failed operation instead rolls back the whole transaction, and the
+    rest of the batch is run again without it, so its partial writes are never committed.  Errors that
+    retry_policy considers retryable fail the whole attempt, and the batch is run again with
+    UnitOfWork.run.  uow must only be used by the committer while it is running.
+    """
+
+    def __init__(
+        self,
+        uow: unit_of_work.UnitOfWork,
+        /,
+        *,
+        max_batch_size: int = 100,
+        max_delay: float = 0.005,
+        retry_policy: typing.Optional[retry.RetryPolicy] = None,
+    ):
+        self._uow = uow
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay
+        self._retry_policy = retry_policy or retry.RetryPolicy()
+
+        self._queue: queue.SimpleQueue[typing.Any] = queue.SimpleQueue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._batch_count = 0
+        self._operation_count = 0
+        self._thread = threading.Thread(
+            target=self._run, name="lime_uow-group-commit", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> GroupCommitter:
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    @property
+    def batch_count(self) -> int:
+        return self._batch_count
+
+    def close(self, *, wait: bool = True) -> None:
+        """Stop accepting operations, commit the ones already queued, and stop the committer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        if wait:
+            self._thread.join()
+
+    @property
+    def operation_count(self) -> int:
+        return self._operation_count
+
+    def submit(
+        self,
+        fn: typing.Callable[..., R],
+        /,
+        *args: typing.Any,
+        **kwargs: typing.Any,
+    ) -> concurrent.futures.Future[R]:
+        future: concurrent.futures.Future[R] = concurrent.futures.Future()
+        with self._lock:
+            if self._closed:
+                raise exceptions.ResourceClosed()
+            self._queue.put(_Operation(fn=fn, args=args, kwargs=kwargs, future=future))
+        return future
+
+    def _commit(self, batch: typing.List[_Operation], /) -> None:
+        batch = [op for op in batch if op.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        self._batch_count += 1
+        self._operation_count += len(batch)
+
+        def apply(uow: unit_of_work.UnitOfWork) -> typing.List[typing.Tuple[bool, typing.Any]]:
+            isolated = uow.supports_savepoints()
+            outcomes: typing.List[typing.Tuple[bool, typing.Any]] = []
+            for op in batch:
+                try:
+                    with uow.savepoint():
+                        outcomes.append((True, op.fn(uow, *op.args, **op.kwargs)))
+                except Exception as e:
+                    if self._retry_policy.retryable(e):
+                        raise
+                    if not isolated:
+                        raise _OperationFailed(op, e) from e
+                    outcomes.append((False, e))
+            return outcomes
+
+        while batch:
+            try:
+                outcomes = self._uow.run(apply, retry_policy=self._retry_policy)
+            except _OperationFailed as e:
+                e.operation.future.set_exception(e.error)
+                batch = [op for op in batch if op is not e.operation]
+                continue
+            except BaseException as e:
+                for op in batch:
+                    op.future.set_exception(e)
+            else:
+                for op, (ok, value) in zip(batch, outcomes):
+                    if ok:
+                        op.future.set_result(value)
+                    else:
+                        op.future.set_exception(value)
+            return
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch: typing.List[_Operation] = [first]
+            flush_at = time.monotonic() + self._max_delay
+            while len(batch) < self._max_batch_size:
+                timeout = flush_at - time.monotonic()
+                try:
+                    # drain whatever is already queued even once the window has passed
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+        # anything submitted before close() was queued ahead of _STOP, so the queue is empty here
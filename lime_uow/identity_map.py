@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import typing
+
+__all__ = ("IdentityMap",)
+
+E = typing.TypeVar("E")
+
+
+class IdentityMap:
+    """Entities loaded during a transaction, by backing store, entity type and key
+
+    A UnitOfWork binds one to each of its repositories, so an entity loaded by a repository is returned
+    from memory by later lookups, in the same transaction, through any repository with the same
+    identity_scope (see Repository.identity_scope).  It is cleared when a transaction starts and on
+    rollback.  The hit and miss counts cover the lifetime of the map.
+    """
+
+    def __init__(self):
+        self._entities: typing.Dict[
+            typing.Tuple[typing.Hashable, type, typing.Hashable], typing.Any
+        ] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key: typing.Tuple[typing.Hashable, type, typing.Hashable]) -> bool:
+        return key in self._entities
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def add(
+        self, scope: typing.Hashable, entity_type: typing.Type[E], key: typing.Hashable, entity: E, /
+    ) -> E:
+        self._entities[(scope, entity_type, key)] = entity
+        return entity
+
+    def clear(self) -> None:
+        self._entities.clear()
+
+    def discard(self, scope: typing.Hashable, entity_type: type, key: typing.Hashable, /) -> None:
+        self._entities.pop((scope, entity_type, key), None)
+
+    def discard_all(self, scope: typing.Hashable, entity_type: type, /) -> None:
+        for key in [
+            key for key in self._entities if key[0] == scope and key[1] is entity_type
+        ]:
+            del self._entities[key]
+
+    def get(
+        self, scope: typing.Hashable, entity_type: typing.Type[E], key: typing.Hashable, /
+    ) -> typing.Optional[E]:
+        """The entity mapped to key, if any, without counting a hit or miss"""
+        return self._entities.get((scope, entity_type, key))
+
+    def get_or_load(
+        self,
+        scope: typing.Hashable,
+        entity_type: typing.Type[E],
+        key: typing.Hashable,
+        load: typing.Callable[[], E],
+        /,
+    ) -> E:
+        try:
+            entity = self._entities[(scope, entity_type, key)]
+        except KeyError:
+            self.misses += 1
+            entity = load()
+            if entity is not None:
+                self._entities[(scope, entity_type, key)] = entity
+            return entity
+        self.hits += 1
+        return entity
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def setdefault(
+        self, scope: typing.Hashable, entity_type: typing.Type[E], key: typing.Hashable, entity: E, /
+    ) -> E:
+        """The entity already mapped to key, or entity after mapping key to it"""
+        return self._entities.setdefault((scope, entity_type, key), entity)
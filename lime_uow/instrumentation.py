@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import bisect
+import collections
+import dataclasses
+import logging
+import math
+import threading
+import time
+import typing
+
+__all__ = (
+    "Event",
+    "Histogram",
+    "Listener",
+    "MetricsCollector",
+)
+
+logger = logging.getLogger(__name__)
+
+Action = typing.Literal[
+    "enter", "get", "open", "save", "rollback", "close", "exit", "execute", "retry"
+]
+
+R = typing.TypeVar("R")
+
+
+@dataclasses.dataclass(frozen=True)
+class Event:
+    """Something a UnitOfWork or SharedResources did, reported to listeners once it finished"""
+
+    action: Action
+    source: str
+    resource_name: typing.Optional[str]
+    started_at: float
+    duration: float
+    error: typing.Optional[BaseException] = None
+    attributes: typing.Optional[typing.Mapping[str, typing.Any]] = None
+
+    @property
+    def outcome(self) -> typing.Literal["ok", "error"]:
+        return "ok" if self.error is None else "error"
+
+
+Listener = typing.Callable[[Event], None]
+
+
+def call(
+    listeners: typing.Sequence[Listener],
+    fn: typing.Callable[[], R],
+    /,
+    *,
+    action: Action,
+    source: str,
+    resource_name: typing.Optional[str] = None,
+    attributes: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+) -> R:
+    """Call fn and report how long it took to each listener"""
+    if not listeners:
+        return fn()
+
+    started_at = time.time()
+    start = time.perf_counter()
+    try:
+        result = fn()
+    except BaseException as e:
+        notify(
+            listeners,
+            Event(
+                action=action,
+                source=source,
+                resource_name=resource_name,
+                started_at=started_at,
+                duration=time.perf_counter() - start,
+                error=e,
+                attributes=attributes,
+            ),
+        )
+        raise
+    notify(
+        listeners,
+        Event(
+            action=action,
+            source=source,
+            resource_name=resource_name,
+            started_at=started_at,
+            duration=time.perf_counter() - start,
+            attributes=attributes,
+        ),
+    )
+    return result
+
+
+def notify(listeners: typing.Sequence[Listener], event: Event, /) -> None:
+    for listener in listeners:
+        # noinspection PyBroadException
+        try:
+            listener(event)
+        except Exception:
+            logger.exception("Listener %r failed to handle %r.", listener, event)
+
+
+class Histogram:
+    """Latency histogram with cumulative buckets, in the style of a Prometheus histogram"""
+
+    DEFAULT_BUCKETS = (
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    )
+
+    def __init__(self, buckets: typing.Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # the last one is the +Inf bucket
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float, /) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float, /) -> float:
+        """Estimate the q-quantile by interpolating within the bucket it falls in"""
+        if self.count == 0:
+            return math.nan
+
+        rank = q * self.count
+        cumulative = 0
+        for ix, ct in enumerate(self.counts):
+            if ct and cumulative + ct >= rank:
+                lower = self.buckets[ix - 1] if ix > 0 else 0.0
+                upper = self.buckets[ix] if ix < len(self.buckets) else self.max
+                return lower + (upper - lower) * (rank - cumulative) / ct
+            cumulative += ct
+        return self.max
+
+
+class MetricsCollector:
+    """Listener that keeps event counts and latency histograms in memory
+
+    Add it to a UnitOfWork with add_listener, then read it with count(), quantiles() or to_prometheus().
+    """
+
+    def __init__(self, *, buckets: typing.Sequence[float] = Histogram.DEFAULT_BUCKETS):
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._counts: typing.Counter[typing.Tuple[str, str, str]] = collections.Counter()
+        self._histograms: typing.Dict[typing.Tuple[str, str], Histogram] = {}
+
+    def __call__(self, event: Event, /) -> None:
+        resource_name = event.resource_name or ""
+        with self._lock:
+            self._counts[(event.action, resource_name, event.outcome)] += 1
+            key = (event.action, resource_name)
+            if (histogram := self._histograms.get(key)) is None:
+                histogram = self._histograms[key] = Histogram(self._buckets)
+            histogram.observe(event.duration)
+
+    def count(
+        self,
+        action: str,
+        resource_name: typing.Optional[str] = None,
+        outcome: typing.Optional[typing.Literal["ok", "error"]] = None,
+    ) -> int:
+        with self._lock:
+            return sum(
+                ct
+                for (a, r, o), ct in self._counts.items()
+                if a == action
+                and (resource_name is None or r == resource_name)
+                and (outcome is None or o == outcome)
+            )
+
+    def quantiles(
+        self,
+        action: str,
+        resource_name: typing.Optional[str] = None,
+        qs: typing.Sequence[float] = (0.5, 0.95, 0.99),
+    ) -> typing.Dict[float, float]:
+        with self._lock:
+            histogram = self._histograms.get((action, resource_name or ""))
+            if histogram is None:
+                return {q: math.nan for q in qs}
+            return {q: histogram.quantile(q) for q in qs}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._histograms.clear()
+
+    def to_prometheus(self, prefix: str = "lime_uow") -> str:
+        """Render the metrics in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {prefix}_events_total Number of unit of work events by outcome.",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        with self._lock:
+            for (action, resource_name, outcome), ct in sorted(self._counts.items()):
+                labels = _labels(action=action, resource=resource_name, outcome=outcome)
+                lines.append(f"{prefix}_events_total{{{labels}}} {ct}")
+
+            lines += [
+                f"# HELP {prefix}_duration_seconds Duration of unit of work events.",
+                f"# TYPE {prefix}_duration_seconds histogram",
+            ]
+            for (action, resource_name), histogram in sorted(self._histograms.items()):
+                labels = _labels(action=action, resource=resource_name)
+                cumulative = 0
+                for upper, ct in zip(histogram.buckets, histogram.counts):
+                    cumulative += ct
+                    lines.append(
+                        f'{prefix}_duration_seconds_bucket{{{labels},le="{upper}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'{prefix}_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}'
+                )
+                lines.append(f"{prefix}_duration_seconds_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{prefix}_duration_seconds_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(
+        f'{name}="{_escape(value)}"' for name, value in labels.items()
+    )
+
+
+def _escape(value: str, /) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
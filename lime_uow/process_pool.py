@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import itertools
+import multiprocessing
+import multiprocessing.util
+import os
+import typing
+
+from lime_uow import exceptions, retry
+
+if typing.TYPE_CHECKING:
+    from lime_uow import unit_of_work
+
+__all__ = ("ProcessPoolRunner",)
+
+I = typing.TypeVar("I")
+R = typing.TypeVar("R")
+
+# the unit of work and retry policy of the current worker process, set by _init_worker
+_worker_uow: typing.Optional[unit_of_work.UnitOfWork] = None
+_worker_retry_policy: typing.Optional[retry.RetryPolicy] = None
+
+# the result of one item of a chunk: (True, result) on success, or (False, error)
+Outcome = typing.Tuple[bool, typing.Any]
+
+
+class ProcessPoolRunner:
+    """Run units of work on a pool of worker processes, one UnitOfWork per worker
+
+    Each worker calls uow_factory once when it starts, opens the shared resources of the unit of work
+    it returns (see UnitOfWork.warmup) and closes them when the worker exits, so connections are made
+    per process rather than per task.  uow_factory, the task functions and their arguments and results
+    must be picklable, e.g. module-level functions and classes.
+
+    map() sends items to the workers in chunks of chunk_size, with at most max_in_flight chunks
+    submitted at a time, and yields the results in order as the chunks complete.  Each item runs in its
+    own transaction, through UnitOfWork.run, so it is saved on success and retried per retry_policy.
+    Each worker re-seeds its copy of the policy's rng, so workers do not back off in lockstep.
+    """
+
+    def __init__(
+        self,
+        uow_factory: typing.Callable[[], unit_of_work.UnitOfWork],
+        /,
+        *,
+        max_workers: typing.Optional[int] = None,
+        chunk_size: int = 1,
+        max_in_flight: typing.Optional[int] = None,
+        retry_policy: typing.Optional[retry.RetryPolicy] = None,
+        mp_context: typing.Optional[multiprocessing.context.BaseContext] = None,
+    ):
+        if chunk_size < 1:
+            raise exceptions.LimeUoWException("chunk_size must be at least 1.")
+
+        max_workers = max_workers or os.cpu_count() or 1
+        self._chunk_size = chunk_size
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(uow_factory, retry_policy),
+        )
+        # keep every worker busy with one chunk while it sends back the results of another
+        self._max_in_flight = max_in_flight or 2 * max_workers
+
+    def __enter__(self) -> ProcessPoolRunner:
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def close(self, *, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def map(
+        self,
+        fn: typing.Callable[..., R],
+        items: typing.Iterable[I],
+        /,
+    ) -> typing.Iterator[R]:
+        """fn(uow, item) for each of items, each run in a transaction on a worker, in order
+
+        Items are read from the iterable only as in-flight chunks complete.  An error raised by fn is
+        re-raised here once the results before it have been yielded; the other items of its chunk, and
+        chunks already submitted, still run.
+        """
+        chunks = _chunked(items, self._chunk_size)
+        in_flight: typing.Deque[concurrent.futures.Future[typing.List[Outcome]]] = (
+            collections.deque()
+        )
+        for chunk in itertools.islice(chunks, self._max_in_flight):
+            in_flight.append(self._submit(fn, chunk))
+        while in_flight:
+            outcomes = in_flight.popleft().result()
+            for chunk in itertools.islice(chunks, 1):
+                in_flight.append(self._submit(fn, chunk))
+            for ok, value in outcomes:
+                if not ok:
+                    raise value
+                yield value
+
+    def submit(
+        self,
+        fn: typing.Callable[..., R],
+        /,
+        *args: typing.Any,
+        **kwargs: typing.Any,
+    ) -> concurrent.futures.Future[R]:
+        """Run fn(uow, *args, **kwargs) in a transaction on a worker"""
+        return self._executor.submit(_run_task, fn, args, kwargs)
+
+    def _submit(
+        self, fn: typing.Callable[..., R], chunk: typing.List[I], /
+    ) -> concurrent.futures.Future[typing.List[Outcome]]:
+        return self._executor.submit(_run_chunk, fn, chunk)
+
+
+def _chunked(
+    items: typing.Iterable[I], size: int, /
+) -> typing.Iterator[typing.List[I]]:
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _init_worker(
+    uow_factory: typing.Callable[[], unit_of_work.UnitOfWork],
+    retry_policy: typing.Optional[retry.RetryPolicy],
+    /,
+) -> None:
+    global _worker_uow, _worker_retry_policy
+
+    if retry_policy is not None:
+        # every worker unpickles the same rng state, which would give them all the same jitter
+        retry_policy.rng.seed()
+    _worker_retry_policy = retry_policy
+    uow = uow_factory()
+    uow.warmup()
+    # run by multiprocessing when the worker process exits, including on executor shutdown
+    multiprocessing.util.Finalize(None, uow.close, exitpriority=10)
+    _worker_uow = uow
+
+
+def _run_chunk(
+    fn: typing.Callable[..., typing.Any],
+    chunk: typing.List[typing.Any],
+    /,
+) -> typing.List[Outcome]:
+    outcomes: typing.List[Outcome] = []
+    for item in chunk:
+        try:
+            outcomes.append((True, _run_task(fn, (item,), {})))
+        except Exception as e:
+            outcomes.append((False, e))
+    return outcomes
+
+
+def _run_task(
+    fn: typing.Callable[..., R],
+    args: typing.Tuple[typing.Any, ...],
+    kwargs: typing.Dict[str, typing.Any],
+    /,
+) -> R:
+    if _worker_uow is None:
+        raise exceptions.LimeUoWException(
+            "ProcessPoolRunner tasks can only run in a worker process."
+        )
+    return _worker_uow.run(fn, *args, retry_policy=_worker_retry_policy, **kwargs)
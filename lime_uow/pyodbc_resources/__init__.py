@@ -1,2 +1,19 @@
-from lime_uow.pyodbc_resources.pyodbc_connection import *
-from lime_uow.pyodbc_resources.pyodbc_cursor import *
+import typing
+
+from lime_uow import _lazy
+
+# imported up front because the function has the same name as its module
+from lime_uow.pyodbc_resources.pyodbc_bulk_load import *
+
+__getattr__, __dir__, __all__ = _lazy.attach(
+    __name__,
+    exports={
+        "pyodbc_connection": ("PyodbcConnection", "SavepointSyntax", "savepoint"),
+        "pyodbc_cursor": ("InstrumentedCursor", "PyodbcCursor"),
+    },
+)
+__all__ += ("pyodbc_bulk_load",)
+
+if typing.TYPE_CHECKING:
+    from lime_uow.pyodbc_resources.pyodbc_connection import *
+    from lime_uow.pyodbc_resources.pyodbc_cursor import *
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import typing
+
+from lime_uow import bulk_load
+from lime_uow.resources import temp_file
+
+if typing.TYPE_CHECKING:
+    import pyodbc
+
+__all__ = ("pyodbc_bulk_load",)
+
+
+def pyodbc_bulk_load(
+    cursor: pyodbc.Cursor,
+    source: temp_file.TempFileSharedResource,
+    /,
+    *,
+    table_name: str,
+    columns: typing.Optional[typing.Sequence[str]] = None,
+    header: bool = True,
+    delimiter: str = ",",
+    chunk_size: int = 10_000,
+    null_value: typing.Optional[str] = None,
+) -> bulk_load.BulkLoadStats:
+    """Insert the rows staged in source into table_name with one executemany call per chunk
+
+    Use a cursor from PyodbcCursor so fast_executemany is enabled and the rows are committed or
+    rolled back along with the rest of the unit of work.  table_name (which may be qualified by a
+    schema, e.g. "dbo.users") and the column names, which may come from the file's header, are quoted,
+    so they are never interpreted as SQL.
+    """
+    table = ".".join(_quote_identifier(part) for part in table_name.split("."))
+
+    def load_chunk(
+        cols: typing.Sequence[str], rows: typing.List[bulk_load.Row]
+    ) -> None:
+        column_list = ", ".join(_quote_identifier(col) for col in cols)
+        placeholders = ", ".join("?" for _ in cols)
+        sql = f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})"
+        cursor.executemany(sql, rows)
+
+    return bulk_load.load_staged_file(
+        source,
+        load_chunk,
+        columns=columns,
+        header=header,
+        delimiter=delimiter,
+        chunk_size=chunk_size,
+        null_value=null_value,
+    )
+
+
+def _quote_identifier(name: str, /) -> str:
+    """name as an ANSI delimited identifier, with embedded double quotes doubled"""
+    if not name or "\x00" in name:
+        raise ValueError(f"{name!r} is not a valid identifier.")
+    return '"' + name.replace('"', '""') + '"'
@@ -1,35 +1,63 @@
 from __future__ import annotations
 
+import contextlib
+import itertools
 import typing
 
-import pyodbc
-
-from lime_uow import exceptions
+from lime_uow import exceptions, replica_router
 from lime_uow.resources import resource
 
-__all__ = ("PyodbcConnection",)
+if typing.TYPE_CHECKING:
+    import pyodbc
+
+__all__ = ("PyodbcConnection", "SavepointSyntax", "savepoint")
+
+SavepointSyntax = typing.Literal["ansi", "mssql"]
+
+# savepoint names only need to be unique among the savepoints open on a connection
+_savepoint_ids = itertools.count(1)
+
 
+class PyodbcConnection(resource.Resource["pyodbc.Connection"]):
+    """Connection to db_uri, or to one of the replicas of a ReplicaRouter of connection strings
+
+    Inside reject_writes(), autocommit is switched off and save() raises ReadOnlyConnection, so
+    statements run on the raw connection are rolled back with the transaction.
+    """
 
-class PyodbcConnection(resource.Resource[pyodbc.Connection]):
     def __init__(
         self,
-        db_uri: str,
+        db_uri: typing.Union[str, replica_router.ReplicaRouter[str]],
         autocommit: bool = False,
         read_only: bool = False,
+        savepoint_syntax: typing.Optional[SavepointSyntax] = None,
     ):
         self._db_uri = db_uri
         self._autocommit = autocommit
         self._read_only = read_only
+        self._savepoint_syntax = savepoint_syntax
 
         self._handle: typing.Optional[pyodbc.Connection] = None
+        self._replica: typing.Optional[str] = None
+        self._rejecting_writes = False
 
     def open(self) -> pyodbc.Connection:
         if self._handle is None:
-            self._handle = pyodbc.connect(
-                self._db_uri,
-                autocommit=self._autocommit,
-                readonly=self._read_only,
-            )
+            import pyodbc
+
+            if isinstance(self._db_uri, replica_router.ReplicaRouter):
+                self._replica = db_uri = self._db_uri.acquire()
+            else:
+                db_uri = self._db_uri
+            try:
+                self._handle = pyodbc.connect(
+                    db_uri,
+                    autocommit=self._autocommit,
+                    readonly=self._read_only,
+                )
+            except BaseException:
+                self._release_replica()
+                raise
             self._handle.maxwrite = 1024 * 1024 * 1024
         return self._handle
 
@@ -37,17 +65,32 @@ class PyodbcConnection(resource.Resource[pyodbc.Connection]):
         if self._handle is not None:
             self._handle.close()
             self._handle = None
+            self._release_replica()
 
     @classmethod
     def interface(cls) -> typing.Type[PyodbcConnection]:
         return PyodbcConnection
 
+    @contextlib.contextmanager
+    def reject_writes(self) -> typing.Iterator[None]:
+        con = self.open()
+        autocommit = con.autocommit
+        con.autocommit = False
+        self._rejecting_writes = True
+        try:
+            yield
+        finally:
+            self._rejecting_writes = False
+            # the connection may have been closed within the scope
+            if self._handle is not None:
+                self._handle.autocommit = autocommit
+
     def rollback(self) -> None:
         if self._handle is not None:
             self._handle.rollback()
 
     def save(self) -> None:
-        if self._read_only:
+        if self._read_only or self._rejecting_writes:
             raise exceptions.ReadOnlyConnection(
                 "Attempted to call save() on a read-only connection."
             )
@@ -55,3 +98,55 @@ class PyodbcConnection(resource.Resource[pyodbc.Connection]):
             raise exceptions.ResourceClosed()
         else:
             self._handle.commit()
+
+    def savepoint(self) -> typing.ContextManager[None]:
+        return savepoint(self.open(), syntax=self._savepoint_syntax)
+
+    def _release_replica(self) -> None:
+        if self._replica is not None:
+            typing.cast(replica_router.ReplicaRouter[str], self._db_uri).release(
+                self._replica
+            )
+            self._replica = None
+
+
+@contextlib.contextmanager
+def savepoint(
+    con: typing.Union[pyodbc.Connection, pyodbc.Cursor],
+    /,
+    *,
+    syntax: typing.Optional[SavepointSyntax] = None,
+) -> typing.Iterator[None]:
+    """Wrap the block in a savepoint on con, a connection or a cursor, that is rolled back if it raises
+
+    SQL Server uses SAVE TRANSACTION, and every other database the ANSI SAVEPOINT statements.  If syntax is
+    not given, it is chosen from the DBMS name the driver reports.
+    """
+    if syntax is None:
+        syntax = _savepoint_syntax(con)
+    name = f"lime_uow_{next(_savepoint_ids)}"
+    if syntax == "mssql":
+        con.execute(f"SAVE TRANSACTION {name}")
+    else:
+        con.execute(f"SAVEPOINT {name}")
+    try:
+        yield
+    except BaseException:
+        if syntax == "mssql":
+            con.execute(f"ROLLBACK TRANSACTION {name}")
+        else:
+            con.execute(f"ROLLBACK TO SAVEPOINT {name}")
+        raise
+    else:
+        # SQL Server releases its savepoints when the transaction ends
+        if syntax != "mssql":
+            con.execute(f"RELEASE SAVEPOINT {name}")
+
+
+def _savepoint_syntax(con: typing.Union[pyodbc.Connection, pyodbc.Cursor], /) -> SavepointSyntax:
+    import pyodbc
+
+    connection = getattr(con, "connection", con)
+    if "SQL Server" in connection.getinfo(pyodbc.SQL_DBMS_NAME):
+        return "mssql"
+    return "ansi"
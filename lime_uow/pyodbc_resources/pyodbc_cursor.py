@@ -1,25 +1,78 @@
 from __future__ import annotations
 
+import contextlib
 import typing
 
-import pyodbc
-
+from lime_uow import exceptions, instrumentation
+from lime_uow.pyodbc_resources import pyodbc_connection
 from lime_uow.resources import resource
 
-__all__ = ("PyodbcCursor",)
+if typing.TYPE_CHECKING:
+    import pyodbc
+
+__all__ = ("InstrumentedCursor", "PyodbcCursor")
 
 
-class PyodbcCursor(resource.Resource[pyodbc.Cursor]):
+class InstrumentedCursor:
+    """Wraps a pyodbc.Cursor to report each execute and executemany to listeners as an "execute" event"""
+
+    def __init__(
+        self,
+        cursor: pyodbc.Cursor,
+        /,
+        listeners: typing.Sequence[instrumentation.Listener],
+    ):
+        self._cursor = cursor
+        self._listeners = listeners
+
+    def __getattr__(self, name: str) -> typing.Any:
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name: str, value: typing.Any) -> None:
+        if name in ("_cursor", "_listeners"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+    def __iter__(self) -> typing.Iterator[pyodbc.Row]:
+        return iter(self._cursor)
+
+    def execute(self, sql: str, *params: typing.Any) -> InstrumentedCursor:
+        instrumentation.call(
+            self._listeners,
+            lambda: self._cursor.execute(sql, *params),
+            action="execute",
+            source="pyodbc",
+            attributes={"db.statement": sql, "db.executemany": False},
+        )
+        return self
+
+    def executemany(self, sql: str, params: typing.Iterable[typing.Any]) -> None:
+        instrumentation.call(
+            self._listeners,
+            lambda: self._cursor.executemany(sql, params),
+            action="execute",
+            source="pyodbc",
+            attributes={"db.statement": sql, "db.executemany": True},
+        )
+
+
+class PyodbcCursor(resource.Resource["pyodbc.Cursor"]):
     def __init__(
         self,
         *,
         con: pyodbc.Connection,
         fast_executemany: bool = True,
+        listeners: typing.Optional[typing.Sequence[instrumentation.Listener]] = None,
+        savepoint_syntax: typing.Optional[pyodbc_connection.SavepointSyntax] = None,
     ):
         self._con = con
         self._fast_executemany = fast_executemany
+        self._listeners = listeners
+        self._savepoint_syntax = savepoint_syntax
 
         self._handle: typing.Optional[pyodbc.Cursor] = None
+        self._rejecting_writes = False
 
     def close(self) -> None:
         if self._handle is not None:
@@ -31,16 +84,43 @@ class PyodbcCursor(resource.Resource[pyodbc.Cursor]):
             self._handle = self._con.cursor()
             self._handle.fast_executemany = self._fast_executemany
             # self._handle.setinputsizes([(pyodbc.SQL_WVARCHAR, 0, 0)])
+        if self._listeners:
+            return typing.cast(
+                "pyodbc.Cursor", InstrumentedCursor(self._handle, self._listeners)
+            )
         return self._handle
 
     @classmethod
     def interface(cls) -> typing.Type[PyodbcCursor]:
         return PyodbcCursor
 
+    @contextlib.contextmanager
+    def reject_writes(self) -> typing.Iterator[None]:
+        # autocommit belongs to the connection this cursor's transaction runs on
+        autocommit = self._con.autocommit
+        self._con.autocommit = False
+        self._rejecting_writes = True
+        try:
+            yield
+        finally:
+            self._rejecting_writes = False
+            self._con.autocommit = autocommit
+
     def rollback(self) -> None:
         if self._handle is not None:
             self._handle.rollback()
 
     def save(self) -> None:
+        if self._rejecting_writes:
+            raise exceptions.ReadOnlyConnection(
+                "Attempted to call save() on a cursor in a read-only transaction."
+            )
         if self._handle is not None:
             self._handle.commit()
+
+    def savepoint(self) -> typing.ContextManager[None]:
+        # the savepoint belongs to the connection, which this cursor's transaction runs on
+        self.open()
+        return pyodbc_connection.savepoint(
+            typing.cast("pyodbc.Cursor", self._handle), syntax=self._savepoint_syntax
+        )
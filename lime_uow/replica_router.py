@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import contextlib
+import itertools
+import threading
+import typing
+
+from lime_uow import exceptions
+
+__all__ = ("ReplicaRouter",)
+
+T = typing.TypeVar("T")
+
+Strategy = typing.Literal["round_robin", "least_loaded"]
+
+
+class ReplicaRouter(typing.Generic[T]):
+    """Spread connections over a set of replicas
+
+    A replica is whatever the resource connects with: a connection string for PyodbcConnection or a
+    sessionmaker for SqlAlchemySession.  round_robin hands them out in turn; least_loaded picks the one
+    with the fewest connections that have been acquired and not yet released, taking them in turn on ties.
+    """
+
+    def __init__(self, /, *replicas: T, strategy: Strategy = "round_robin"):
+        if not replicas:
+            raise exceptions.InvalidResource("ReplicaRouter requires at least one replica.")
+        self._replicas = replicas
+        self._strategy = strategy
+        self._lock = threading.Lock()
+        self._turn = itertools.cycle(range(len(replicas)))
+        self._in_use = [0] * len(replicas)
+
+    def acquire(self) -> T:
+        """Choose a replica; pass it to release() once the connection to it is closed"""
+        with self._lock:
+            ix = next(self._turn)
+            if self._strategy == "least_loaded":
+                # scan starting from the round-robin position so ties rotate
+                n = len(self._replicas)
+                ix = min(
+                    ((ix + offset) % n for offset in range(n)),
+                    key=self._in_use.__getitem__,
+                )
+            self._in_use[ix] += 1
+            return self._replicas[ix]
+
+    def in_use(self) -> typing.Dict[T, int]:
+        with self._lock:
+            return dict(zip(self._replicas, self._in_use))
+
+    @contextlib.contextmanager
+    def lease(self) -> typing.Iterator[T]:
+        replica = self.acquire()
+        try:
+            yield replica
+        finally:
+            self.release(replica)
+
+    def release(self, replica: T, /) -> None:
+        with self._lock:
+            ix = self._replicas.index(replica)
+            self._in_use[ix] = max(self._in_use[ix] - 1, 0)
+
+    @property
+    def replicas(self) -> typing.Tuple[T, ...]:
+        return self._replicas
@@ -1,4 +1,31 @@
-from lime_uow.resources.resource import *
-from lime_uow.resources.temp_file import *
-from lime_uow.resources.repository import *
-from lime_uow.resources.dummy_repository import *
+import typing
+
+from lime_uow import _lazy
+
+__getattr__, __dir__, __all__ = _lazy.attach(
+    __name__,
+    exports={
+        "resource": ("Resource", "check_for_ambiguous_implementations"),
+        "temp_file": ("TempFileSharedResource", "WriteStats"),
+        "spooled_temp_file": ("SpooledTempFileSharedResource",),
+        "repository": ("Repository",),
+        "dummy_repository": ("DummyRepository",),
+        "columnar_repository": ("ColumnarRepository",),
+        "file_repository": ("FileRepository",),
+        "read_only_repository": ("ReadOnlyRepository",),
+        "sharded_repository": ("ShardedRepository", "crc32_shard"),
+        "write_behind_repository": ("WriteBehindRepository",),
+    },
+)
+
+if typing.TYPE_CHECKING:
+    from lime_uow.resources.resource import *
+    from lime_uow.resources.temp_file import *
+    from lime_uow.resources.spooled_temp_file import *
+    from lime_uow.resources.repository import *
+    from lime_uow.resources.dummy_repository import *
+    from lime_uow.resources.columnar_repository import *
+    from lime_uow.resources.file_repository import *
+    from lime_uow.resources.read_only_repository import *
+    from lime_uow.resources.sharded_repository import *
+    from lime_uow.resources.write_behind_repository import *
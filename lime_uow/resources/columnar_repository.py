@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import abc
+import array
+import contextlib
+import dataclasses
+import sys
+import typing
+
+from lime_uow import exceptions, identity_map as identity_map_
+from lime_uow.resources import repository
+
+E = typing.TypeVar("E")
+
+__all__ = ("ColumnarRepository",)
+
+Column = typing.Union["array.array[typing.Any]", typing.List[typing.Any]]
+
+_TYPECODES: typing.Dict[typing.Any, str] = {
+    int: "q",
+    "int": "q",
+    float: "d",
+    "float": "d",
+}
+
+
+class ColumnarRepository(repository.Repository[E], abc.ABC, typing.Generic[E]):
+    """In-memory repository that stores dataclass entities column-by-column
+
+    int and float fields are packed into typed arrays, str fields are interned, and entities
+    are only materialized when they are read.  Keys must be unique.  rollback and savepoints undo the
+    changes made since, newest first, rather than restoring a copy of every column.
+    """
+
+    def __init__(
+        self,
+        *,
+        entity_type: typing.Type[E],
+        key_fn: typing.Callable[[E], typing.Hashable],
+        initial_values: typing.Optional[typing.Iterable[E]] = None,
+        typecodes: typing.Optional[typing.Mapping[str, str]] = None,
+    ):
+        super().__init__()
+
+        if not dataclasses.is_dataclass(entity_type):
+            raise exceptions.InvalidResource(
+                f"{entity_type.__name__} is not a dataclass."
+            )
+
+        self._entity_type = entity_type
+        self._key_fn = key_fn
+
+        fields = [f for f in dataclasses.fields(entity_type) if f.init]
+        overrides = typecodes or {}
+        self._typecodes: typing.Dict[str, typing.Optional[str]] = {
+            f.name: overrides.get(f.name, _TYPECODES.get(f.type)) for f in fields
+        }
+        self._interned = frozenset(
+            f.name for f in fields if f.type in (str, "str")
+        )
+
+        self._columns: typing.Dict[str, Column] = self._empty_columns()
+        self._keys: typing.List[typing.Hashable] = []
+        self._index: typing.Dict[typing.Hashable, int] = {}
+
+        # how to undo each change since the last save, so rollback costs what the transaction changed
+        # rather than a copy of every column
+        self._undo_log: typing.List[typing.Callable[[], None]] = []
+
+        if initial_values:
+            self._extend(list(initial_values))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def rollback(self) -> None:
+        self._undo(0)
+
+    def save(self) -> None:
+        self._undo_log.clear()
+
+    @contextlib.contextmanager
+    def savepoint(self) -> typing.Iterator[None]:
+        mark = len(self._undo_log)
+        try:
+            yield
+        except BaseException:
+            self._undo(mark)
+            raise
+
+    def add(self, item: E, /) -> E:
+        self.add_all([item])
+        return item
+
+    def add_all(self, items: typing.Collection[E], /) -> typing.Collection[E]:
+        start = len(self._keys)
+        self._extend(items)
+        self._undo_log.append(lambda: self._truncate(start))
+        return items
+
+    def all(self) -> typing.Iterator[E]:
+        if self.identity_map is None:
+            return (self._materialize(row) for row in range(len(self._keys)))
+        return (self._materialize_mapped(row) for row in range(len(self._keys)))
+
+    def delete(self, item: E, /) -> E:
+        key = self._key_fn(item)
+        row = self._index.pop(key)
+        values = {name: column[row] for name, column in self._columns.items()}
+        for column in self._columns.values():
+            del column[row]
+        del self._keys[row]
+        self._reindex(row)
+        self._undo_log.append(lambda: self._insert(row, key, values))
+        if self.identity_map is not None:
+            self.identity_map.discard(self.identity_scope(), self._entity_type, key)
+        return item
+
+    def delete_all(self) -> None:
+        self._replace(self._empty_columns(), [])
+        if self.identity_map is not None:
+            self.identity_map.discard_all(self.identity_scope(), self._entity_type)
+
+    def delete_many(self, items: typing.Collection[E], /) -> typing.Collection[E]:
+        keys = [self._key_fn(item) for item in items]
+        dropped = {self._index[key] for key in keys}
+        kept = [row for row in range(len(self._keys)) if row not in dropped]
+        # rebuild each column once rather than shifting it for every deleted row
+        self._replace(
+            {
+                name: (
+                    array.array(column.typecode, (column[row] for row in kept))
+                    if isinstance(column, array.array)
+                    else [column[row] for row in kept]
+                )
+                for name, column in self._columns.items()
+            },
+            [self._keys[row] for row in kept],
+        )
+        if self.identity_map is not None:
+            for key in keys:
+                self.identity_map.discard(self.identity_scope(), self._entity_type, key)
+        return items
+
+    def get(self, item_id: typing.Any, /) -> E:
+        if self.identity_map is None:
+            return self._materialize(self._index[item_id])
+        return self.identity_map.get_or_load(
+            self.identity_scope(),
+            self._entity_type,
+            item_id,
+            lambda: self._materialize(self._index[item_id]),
+        )
+
+    def open(self) -> ColumnarRepository[E]:
+        return self
+
+    def set_all(self, items: typing.Collection[E], /) -> typing.Collection[E]:
+        keys = [self._key_fn(item) for item in items]
+        if len(set(keys)) != len(keys):
+            raise exceptions.DuplicateKeyError(
+                f"{self.__class__.__name__} keys must be unique."
+            )
+        # validate and build the new columns before the current ones are dropped
+        self._replace(self._build_columns(items), keys)
+        if self.identity_map is not None:
+            self.identity_map.discard_all(self.identity_scope(), self._entity_type)
+        return items
+
+    def update(self, item: E, /) -> E:
+        row = self._index[self._key_fn(item)]
+        values = {name: column[row] for name, column in self._columns.items()}
+        for name, column in self._columns.items():
+            column[row] = self._intern(name, getattr(item, name))
+        self._undo_log.append(lambda: self._restore(row, values))
+        if self.identity_map is not None:
+            self.identity_map.add(
+                self.identity_scope(), self._entity_type, self._key_fn(item), item
+            )
+        return item
+
+    def _build_columns(self, items: typing.Collection[E]) -> typing.Dict[str, Column]:
+        columns: typing.Dict[str, Column] = {}
+        for name, typecode in self._typecodes.items():
+            values = (getattr(item, name) for item in items)
+            if typecode:
+                columns[name] = array.array(typecode, values)
+            elif name in self._interned:
+                columns[name] = list(map(_intern_or_none, values))
+            else:
+                columns[name] = list(values)
+        return columns
+
+    def _empty_columns(self) -> typing.Dict[str, Column]:
+        return {
+            name: array.array(typecode) if typecode else []
+            for name, typecode in self._typecodes.items()
+        }
+
+    def _extend(self, items: typing.Collection[E]) -> None:
+        keys = [self._key_fn(item) for item in items]
+        duplicates = {key for key in keys if key in self._index}
+        if len(set(keys)) != len(keys) or duplicates:
+            raise exceptions.DuplicateKeyError(
+                f"{self.__class__.__name__} keys must be unique."
+            )
+
+        # build every column chunk before touching state so a bad value leaves the repository intact
+        chunks = self._build_columns(items)
+        for name, chunk in chunks.items():
+            self._columns[name].extend(chunk)
+
+        start = len(self._keys)
+        self._keys += keys
+        self._index.update((key, start + ix) for ix, key in enumerate(keys))
+
+    def _insert(
+        self, row: int, key: typing.Hashable, values: typing.Dict[str, typing.Any], /
+    ) -> None:
+        for name, column in self._columns.items():
+            column.insert(row, values[name])
+        self._keys.insert(row, key)
+        self._reindex(row)
+
+    def _intern(self, field_name: str, value: typing.Any) -> typing.Any:
+        if field_name in self._interned:
+            return _intern_or_none(value)
+        return value
+
+    def _materialize_mapped(self, row: int) -> E:
+        key = self._keys[row]
+        identity_map = typing.cast(identity_map_.IdentityMap, self.identity_map)
+        entity = identity_map.get(self.identity_scope(), self._entity_type, key)
+        if entity is None:
+            entity = identity_map.add(
+                self.identity_scope(), self._entity_type, key, self._materialize(row)
+            )
+        return entity
+
+    def _materialize(self, row: int) -> E:
+        return self._entity_type(
+            **{name: column[row] for name, column in self._columns.items()}
+        )
+
+    def _reindex(self, start: int, /) -> None:
+        for ix in range(start, len(self._keys)):
+            self._index[self._keys[ix]] = ix
+
+    def _replace(
+        self, columns: typing.Dict[str, Column], keys: typing.List[typing.Hashable], /
+    ) -> None:
+        """Swap in new columns; the old ones are kept, not copied, to undo it"""
+        state = (self._columns, self._keys, self._index)
+
+        def undo() -> None:
+            self._columns, self._keys, self._index = state
+
+        self._columns = columns
+        self._keys = keys
+        self._index = {key: ix for ix, key in enumerate(keys)}
+        self._undo_log.append(undo)
+
+    def _restore(self, row: int, values: typing.Dict[str, typing.Any], /) -> None:
+        for name, column in self._columns.items():
+            column[row] = values[name]
+
+    def _truncate(self, length: int, /) -> None:
+        for column in self._columns.values():
+            del column[length:]
+        for key in self._keys[length:]:
+            del self._index[key]
+        del self._keys[length:]
+
+    def _undo(self, mark: int, /) -> None:
+        """Undo the changes logged after the first mark entries of the undo log, newest first"""
+        while len(self._undo_log) > mark:
+            self._undo_log.pop()()
+
+
+def _intern_or_none(value: typing.Optional[str]) -> typing.Optional[str]:
+    return None if value is None else sys.intern(value)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import abc
+import contextlib
 import typing
 
 from lime_uow.resources import repository
@@ -38,6 +39,16 @@ class DummyRepository(repository.Repository[E], abc.ABC, typing.Generic[E]):
         self.events.append(("save", {}))
         self._previous_state = self._current_state.copy()
 
+    @contextlib.contextmanager
+    def savepoint(self) -> typing.Iterator[None]:
+        self.events.append(("savepoint", {}))
+        state = self._current_state.copy()
+        try:
+            yield
+        except BaseException:
+            self._current_state = state
+            raise
+
     def add(self, item: E, /) -> E:
         self.events.append(("add", {"item": item}))
         self._current_state.append(item)
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import abc
+import mmap
+import os
+import pathlib
+import pickle
+import struct
+import typing
+
+from lime_uow import exceptions
+from lime_uow.resources import repository
+
+E = typing.TypeVar("E")
+
+__all__ = ("FileRepository",)
+
+# op, key length, value length
+_HEADER = struct.Struct("<BII")
+_PUT, _DELETE, _CLEAR, _COMMIT = 1, 2, 3, 4
+
+# offset and length of a pickled entity within the log
+Location = typing.Tuple[int, int]
+
+
+class FileRepository(repository.Repository[E], abc.ABC, typing.Generic[E]):
+    """Repository persisted to an append-only log file
+
+    Every change is appended to the log, and save() writes a commit marker, so rollback() only has to
+    truncate the log back to the last marker.  Entities are read back through mmap.  The key index is
+    written alongside the log on save(), close() and compact(), so reopening only replays the tail of
+    the log.  The file stays open between transactions when a UnitOfWork recycles the repository.
+    """
+
+    def __init__(
+        self,
+        file_path: typing.Union[str, os.PathLike[str]],
+        /,
+        *,
+        key_fn: typing.Callable[[E], typing.Hashable],
+        initial_values: typing.Optional[typing.Iterable[E]] = None,
+        fsync: bool = True,
+    ):
+        super().__init__()
+
+        self._file_path = pathlib.Path(file_path)
+        self._index_path = self._file_path.with_name(f"{self._file_path.name}.idx")
+        self._key_fn = key_fn
+        self._initial_values = initial_values
+        self._fsync = fsync
+
+        self._file_handle: typing.Optional[typing.BinaryIO] = None
+        self._mmap: typing.Optional[mmap.mmap] = None
+        self._index: typing.Dict[typing.Hashable, Location] = {}
+        self._committed_offset = 0
+        self._end = 0
+
+        # prior index entries of the keys changed since the last save, or the whole committed index
+        # once delete_all() has been called
+        self._undo: typing.Dict[typing.Hashable, typing.Optional[Location]] = {}
+        self._committed_index: typing.Optional[
+            typing.Dict[typing.Hashable, Location]
+        ] = None
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._index)
+
+    @property
+    def file_path(self) -> pathlib.Path:
+        return self._file_path
+
+    @property
+    def handle(self) -> typing.BinaryIO:
+        self._ensure_loaded()
+        return self._file_handle  # type: ignore
+
+    def add(self, item: E, /) -> E:
+        self.add_all([item])
+        return item
+
+    def add_all(self, items: typing.Collection[E], /) -> typing.Collection[E]:
+        self._ensure_loaded()
+        self._put_all(self._encode_new(items, self._index))
+        return items
+
+    def all(self) -> typing.List[E]:
+        self._ensure_loaded()
+        return [self._load(location) for location in self._index.values()]
+
+    def close(self) -> None:
+        if self._file_handle is not None:
+            self.rollback()
+            self._write_index()
+            self._unmap()
+            self._file_handle.close()
+            self._file_handle = None
+            self._index = {}
+
+    def compact(self) -> None:
+        """Rewrite the log so that it only contains the current version of each entity"""
+        self._ensure_loaded()
+        if self._end != self._committed_offset:
+            raise exceptions.UncommittedChanges(
+                "compact() cannot be called while there are unsaved changes."
+            )
+
+        tmp_path = self._file_path.with_name(f"{self._file_path.name}.compact")
+        index: typing.Dict[typing.Hashable, Location] = {}
+        with open(tmp_path, "wb") as fh:
+            offset = 0
+            for key, location in self._index.items():
+                key_bytes = pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL)
+                value = self._read(location)
+                fh.write(_HEADER.pack(_PUT, len(key_bytes), len(value)))
+                fh.write(key_bytes)
+                fh.write(value)
+                offset += _HEADER.size + len(key_bytes)
+                index[key] = (offset, len(value))
+                offset += len(value)
+            fh.write(_HEADER.pack(_COMMIT, 0, 0))
+            offset += _HEADER.size
+            fh.flush()
+            os.fsync(fh.fileno())
+
+        self._unmap()
+        self.handle.close()
+        os.replace(tmp_path, self._file_path)
+        self._file_handle = open(self._file_path, "a+b")
+        self._index = index
+        self._end = self._committed_offset = offset
+        self._write_index()
+
+    def delete(self, item: E, /) -> E:
+        key = self._key_fn(item)
+        self._ensure_loaded()
+        if key in self._index:
+            self._append(_DELETE, pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL))
+            self._remember(key)
+            del self._index[key]
+        return item
+
+    def delete_all(self) -> None:
+        self._ensure_loaded()
+        self._append(_CLEAR)
+        if self._committed_index is None:
+            self._committed_index = self._restore_committed_index()
+        self._undo = {}
+        self._index = {}
+
+    def get(self, item_id: typing.Any, /) -> E:
+        self._ensure_loaded()
+        return self._load(self._index[item_id])
+
+    def open(self) -> FileRepository[E]:
+        self._ensure_loaded()
+        return self
+
+    def reset(self) -> bool:
+        # the handle, mmap and index stay valid between transactions
+        return True
+
+    def rollback(self) -> None:
+        if self._file_handle is not None and self._end != self._committed_offset:
+            self._unmap()
+            self._file_handle.truncate(self._committed_offset)
+            self._end = self._committed_offset
+            self._index = self._restore_committed_index()
+            self._undo = {}
+            self._committed_index = None
+
+    def save(self) -> None:
+        if self._file_handle is not None and self._end != self._committed_offset:
+            self._append(_COMMIT)
+            self._file_handle.flush()
+            if self._fsync:
+                os.fsync(self._file_handle.fileno())
+            self._committed_offset = self._end
+            self._undo = {}
+            self._committed_index = None
+            self._write_index()
+
+    def set_all(self, items: typing.Collection[E], /) -> typing.Collection[E]:
+        # encode, and check the keys, before anything is cleared
+        records = self._encode_new(items, {})
+        self.delete_all()
+        self._put_all(records)
+        return items
+
+    def update(self, item: E, /) -> E:
+        key = self._key_fn(item)
+        self._ensure_loaded()
+        if key not in self._index:
+            raise KeyError(key)
+        self._put(key, item)
+        return item
+
+    def _append(self, op: int, key: bytes = b"", value: bytes = b"") -> int:
+        """Append a record to the log and return the offset of its value"""
+        self.handle.write(_HEADER.pack(op, len(key), len(value)))
+        self.handle.write(key)
+        self.handle.write(value)
+        value_offset = self._end + _HEADER.size + len(key)
+        self._end = value_offset + len(value)
+        return value_offset
+
+    def _encode_new(
+        self,
+        items: typing.Iterable[E],
+        existing: typing.Mapping[typing.Hashable, Location],
+        /,
+    ) -> typing.List[typing.Tuple[typing.Hashable, bytes, bytes]]:
+        """The key, pickled key and pickled entity of each of items, whose keys must be new"""
+        records: typing.List[typing.Tuple[typing.Hashable, bytes, bytes]] = []
+        keys: typing.Set[typing.Hashable] = set()
+        for item in items:
+            key = self._key_fn(item)
+            if key in existing or key in keys:
+                raise exceptions.DuplicateKeyError(
+                    f"{self.__class__.__name__} already contains an item with the key {key!r}."
+                )
+            keys.add(key)
+            records.append(
+                (
+                    key,
+                    pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL),
+                    pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL),
+                )
+            )
+        return records
+
+    def _ensure_loaded(self) -> None:
+        if self._file_handle is not None:
+            return
+
+        is_new = not self._file_path.exists()
+        self._file_handle = open(self._file_path, "a+b")
+        start = 0
+        if self._index_path.exists():
+            try:
+                with open(self._index_path, "rb") as fh:
+                    inode, offset, index = pickle.load(fh)
+                stat = os.fstat(self._file_handle.fileno())
+                if inode == stat.st_ino and offset <= stat.st_size:
+                    start, self._index = offset, index
+            except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+                pass
+        self._replay(start)
+
+        if is_new and self._initial_values:
+            self.add_all(list(self._initial_values))
+            self.save()
+
+    def _load(self, location: Location) -> E:
+        return pickle.loads(self._read(location))
+
+    def _put(self, key: typing.Hashable, item: E) -> None:
+        value_offset = self._append(
+            _PUT,
+            pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL),
+            pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+        self._remember(key)
+        self._index[key] = (value_offset, self._end - value_offset)
+
+    def _put_all(
+        self, records: typing.Iterable[typing.Tuple[typing.Hashable, bytes, bytes]], /
+    ) -> None:
+        """Append a put record for each key, pickled key and pickled entity in one write"""
+        buffer = bytearray()
+        locations: typing.List[typing.Tuple[typing.Hashable, Location]] = []
+        for key, key_bytes, value in records:
+            buffer += _HEADER.pack(_PUT, len(key_bytes), len(value))
+            buffer += key_bytes
+            locations.append((key, (self._end + len(buffer), len(value))))
+            buffer += value
+        if not buffer:
+            return
+        self.handle.write(buffer)
+        self._end += len(buffer)
+        for key, location in locations:
+            self._remember(key)
+            self._index[key] = location
+
+    def _read(self, location: Location) -> bytes:
+        offset, length = location
+        if self._mmap is None or len(self._mmap) < offset + length:
+            self._unmap()
+            self.handle.flush()
+            self._mmap = mmap.mmap(self.handle.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap[offset : offset + length]
+
+    def _remember(self, key: typing.Hashable) -> None:
+        if self._committed_index is None and key not in self._undo:
+            self._undo[key] = self._index.get(key)
+
+    def _replay(self, start: int) -> None:
+        """Apply the committed records after start to the index, and drop any uncommitted tail"""
+        handle = self.handle
+        size = os.fstat(handle.fileno()).st_size
+        committed = start
+        if size > start:
+            pending: typing.List[
+                typing.Tuple[int, typing.Hashable, typing.Optional[Location]]
+            ] = []
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offset = start
+                while offset + _HEADER.size <= size:
+                    op, key_len, value_len = _HEADER.unpack_from(mm, offset)
+                    key_offset = offset + _HEADER.size
+                    value_offset = key_offset + key_len
+                    end = value_offset + value_len
+                    if end > size or op not in (_PUT, _DELETE, _CLEAR, _COMMIT):
+                        break
+                    if op == _COMMIT:
+                        for pending_op, key, location in pending:
+                            if pending_op == _PUT:
+                                self._index[key] = location  # type: ignore
+                            elif pending_op == _DELETE:
+                                self._index.pop(key, None)
+                            else:
+                                self._index.clear()
+                        pending = []
+                        committed = end
+                    elif op == _CLEAR:
+                        pending.append((op, None, None))
+                    else:
+                        key = pickle.loads(mm[key_offset:value_offset])
+                        pending.append((op, key, (value_offset, value_len)))
+                    offset = end
+        if size > committed:
+            handle.truncate(committed)
+        self._end = self._committed_offset = committed
+
+    def _restore_committed_index(self) -> typing.Dict[typing.Hashable, Location]:
+        if self._committed_index is not None:
+            return self._committed_index
+        for key, location in self._undo.items():
+            if location is None:
+                self._index.pop(key, None)
+            else:
+                self._index[key] = location
+        return self._index
+
+    def _unmap(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _write_index(self) -> None:
+        tmp_path = self._index_path.with_name(f"{self._index_path.name}.tmp")
+        with open(tmp_path, "wb") as fh:
+            pickle.dump(
+                (
+                    os.fstat(self.handle.fileno()).st_ino,
+                    self._committed_offset,
+                    self._index,
+                ),
+                fh,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, self._index_path)
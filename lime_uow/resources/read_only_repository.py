@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import functools
+import typing
+
+from lime_uow import exceptions
+from lime_uow.resources import repository
+
+E = typing.TypeVar("E")
+
+__all__ = ("ReadOnlyRepository",)
+
+
+class ReadOnlyRepository(repository.Repository[E], typing.Generic[E]):
+    """Wraps a repository so that its write methods raise ReadOnlyConnection
+
+    UnitOfWork.read_only() hands these out, through wrap(), in place of the repositories of the
+    transaction.  Reads, and any other attribute of the wrapped repository, are passed through.  Write
+    methods added by subclasses of Repository are only guarded so far as they call the write methods of
+    Repository or write through a resource that rejects writes (see Resource.reject_writes).
+    """
+
+    def __init__(self, inner: repository.Repository[E], /):
+        self.__inner = inner
+
+    @classmethod
+    def wrap(cls, inner: repository.Repository[E], /) -> repository.Repository[E]:
+        """Wrap inner in an instance of a subclass of both ReadOnlyRepository and inner's class
+
+        The result is an instance of the type the caller asked for, so isinstance checks and the methods
+        of that type keep working, while the write methods of Repository still raise.
+        """
+        wrapper = object.__new__(_read_only_type(type(inner)))
+        ReadOnlyRepository.__init__(wrapper, inner)
+        return wrapper
+
+    def __getattr__(self, name: str) -> typing.Any:
+        if name == "_ReadOnlyRepository__inner":
+            # not set yet, e.g. while unpickling
+            raise AttributeError(name)
+        return getattr(self.__inner, name)
+
+    def add(self, item: E, /) -> E:
+        raise self._error("add")
+
+    def add_all(self, items: typing.Collection[E], /) -> typing.Collection[E]:
+        raise self._error("add_all")
+
+    def all(self) -> typing.Iterable[E]:
+        return self.__inner.all()
+
+    def delete(self, item: E, /) -> E:
+        raise self._error("delete")
+
+    def delete_all(self) -> None:
+        raise self._error("delete_all")
+
+    def delete_many(self, items: typing.Collection[E], /) -> typing.Collection[E]:
+        raise self._error("delete_many")
+
+    def get(self, item_id: typing.Any, /) -> E:
+        return self.__inner.get(item_id)
+
+    @property
+    def inner(self) -> repository.Repository[E]:
+        return self.__inner
+
+    @classmethod
+    def interface(cls) -> typing.Type[ReadOnlyRepository[E]]:
+        return cls
+
+    def set_all(self, items: typing.Collection[E], /) -> typing.Collection[E]:
+        raise self._error("set_all")
+
+    def update(self, item: E, /) -> E:
+        raise self._error("update")
+
+    def update_many(self, items: typing.Collection[E], /) -> typing.Collection[E]:
+        raise self._error("update_many")
+
+    def _error(self, method: str, /) -> exceptions.ReadOnlyConnection:
+        return exceptions.ReadOnlyConnection(
+            f"Attempted to call {method}() on {self.__inner.__class__.__name__} in a read-only transaction."
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _read_only_type(
+    repository_type: typing.Type[repository.Repository[typing.Any]], /
+) -> typing.Type[ReadOnlyRepository[typing.Any]]:
+    return type(
+        f"ReadOnly{repository_type.__name__}",
+        (ReadOnlyRepository, repository_type),
+        # keep the interface of the wrapped type, which resources are registered under
+        {"interface": classmethod(lambda cls: repository_type.interface())},
+    )
@@ -3,6 +3,7 @@ from __future__ import annotations
 import abc
 import typing
 
+from lime_uow import identity_map as identity_map_
 from lime_uow.resources import resource
 
 __all__ = ("Repository",)
@@ -12,7 +13,14 @@ EntityType = typing.TypeVar("EntityType")
 
 
 class Repository(resource.Resource[typing.Any], abc.ABC, typing.Generic[EntityType]):
-    """Interface to access elements of a collection"""
+    """Interface to access elements of a collection
+
+    Implementations may consult and populate identity_map, which the UnitOfWork binds for the duration of
+    each transaction, so entities already loaded in the transaction are served from memory.  Entries are
+    shared only between repositories with equal identity_scope() values.
+    """
+
+    identity_map: typing.Optional[identity_map_.IdentityMap] = None
 
     @abc.abstractmethod
     def add(self, /, item: EntityType) -> EntityType:
@@ -34,6 +42,16 @@ class Repository(resource.Resource[typing.Any], abc.ABC, typing.Generic[EntityTy
     def delete_all(self) -> None:
         raise NotImplementedError
 
+    def delete_many(self, /, items: typing.Collection[EntityType]) -> typing.Collection[EntityType]:
+        """Delete each of items; implementations with a bulk delete should override this"""
+        for item in items:
+            self.delete(item)
+        return items
+
+    def identity_scope(self) -> typing.Hashable:
+        """The backing store, as a key of identity_map entries; repositories on the same store may share it"""
+        return self
+
     def open(self) -> Repository[EntityType]:
         return self
 
@@ -45,6 +63,12 @@ class Repository(resource.Resource[typing.Any], abc.ABC, typing.Generic[EntityTy
     def update(self, /, item: EntityType) -> EntityType:
         raise NotImplementedError
 
+    def update_many(self, /, items: typing.Collection[EntityType]) -> typing.Collection[EntityType]:
+        """Update each of items; implementations with a bulk update should override this"""
+        for item in items:
+            self.update(item)
+        return items
+
     @abc.abstractmethod
     def get(self, /, item_id: typing.Any) -> EntityType:
         raise NotImplementedError
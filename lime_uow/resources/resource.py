@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import abc
+import contextlib
 import typing
 
 from lime_uow import exceptions
@@ -17,20 +18,54 @@ class Resource(abc.ABC, typing.Generic[T]):
     def close(self) -> None:
         ...
 
+    def dependencies(self) -> typing.Iterable[typing.Type[Resource[typing.Any]]]:
+        """Shared resources that must be opened before, and closed after, this one"""
+        return ()
+
     @classmethod
     @abc.abstractmethod
     def interface(cls) -> typing.Type[Resource[T]]:
         raise NotImplementedError
 
+    def is_transactional(self) -> bool:
+        """Should units of work save and roll back this resource when it is shared?
+
+        Shared resources are normally left alone by UnitOfWork.save() and rollback().  Return True to have
+        them saved and rolled back, while their handle is open, along with the unit of work's own resources.
+        """
+        return False
+
     def open(self) -> T:
         return typing.cast(T, self)
 
+    def reject_writes(self) -> typing.ContextManager[typing.Any]:
+        """Scope in which writes through the open handle raise, or at least are never committed
+
+        Units of work enter it for the resources used by a read_only() transaction.  Resources that cannot
+        tell writes from reads keep this default, which does nothing.
+        """
+        return contextlib.nullcontext()
+
+    def reset(self) -> bool:
+        """Prepare the resource, already rolled back, for reuse by the next transaction
+
+        Return True if it can be reused; the default, False, makes the unit of work create a new one.
+        """
+        return False
+
     def rollback(self) -> None:
         ...
 
     def save(self) -> None:
         ...
 
+    def savepoint(self) -> typing.ContextManager[typing.Any]:
+        """Scope whose changes are rolled back on their own if it raises, leaving earlier work pending
+
+        Resources that cannot roll back part of a transaction keep this default, which does nothing.
+        """
+        return contextlib.nullcontext()
+
     def __eq__(self, other: object) -> bool:
         if other.__class__ is self.__class__:
             # noinspection PyTypeChecker
@@ -58,7 +93,11 @@ class Resource(abc.ABC, typing.Generic[T]):
 def check_for_ambiguous_implementations(
     rs: typing.Iterable[Resource[typing.Any]], /
 ) -> None:
-    names = [r.__class__.interface().__name__ for r in rs]
-    duplicate_names = {name: ct for name in names if (ct := names.count(name)) > 1}
+    interfaces = [r.__class__.interface() for r in rs]
+    duplicate_names = {
+        interface.__name__: ct
+        for interface in interfaces
+        if (ct := interfaces.count(interface)) > 1
+    }
     if duplicate_names:
         raise exceptions.MultipleRegisteredImplementations(duplicate_names)
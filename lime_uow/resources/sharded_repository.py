@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import abc
+import collections
+import concurrent.futures
+import contextlib
+import itertools
+import threading
+import typing
+import zlib
+
+from lime_uow import exceptions, identity_map as identity_map_
+from lime_uow.resources import repository
+
+E = typing.TypeVar("E")
+R = typing.TypeVar("R")
+
+__all__ = ("ShardedRepository", "crc32_shard")
+
+
+def crc32_shard(key: typing.Hashable, shard_count: int, /) -> int:
+    """The shard of key, from the CRC-32 of str(key)
+
+    Unlike hash(), this is stable across processes and Python versions, so every process that shares
+    the shards routes a key to the same one.
+    """
+    return zlib.crc32(str(key).encode("utf-8")) % shard_count
+
+
+class ShardedRepository(repository.Repository[E], abc.ABC, typing.Generic[E]):
+    """Repository whose entities are spread over several shard repositories by key
+
+    add, update, delete and get go to the one shard that shard_fn picks for the entity's key (get is
+    called with the key itself).  all, where, delete_all and set_all run on every shard in parallel and
+    combine the results.  save saves the shards written to since the last save or rollback, and rolls back
+    the ones that were only read, to end their read transactions; rollback rolls back both.  Both run on
+    the shards concurrently, and errors from several shards are raised together as a ShardErrors.  The threads used are
+    released when the transaction ends, on save, rollback or close.
+
+    There is no two-phase commit, so if saving one shard fails the shards that were already saved stay
+    saved.
+    """
+
+    def __init__(
+        self,
+        shards: typing.Sequence[repository.Repository[E]],
+        /,
+        *,
+        key_fn: typing.Callable[[E], typing.Hashable],
+        shard_fn: typing.Callable[[typing.Hashable, int], int] = crc32_shard,
+        max_workers: typing.Optional[int] = None,
+    ):
+        super().__init__()
+
+        if not shards:
+            raise exceptions.InvalidResource(
+                f"{self.__class__.__name__} requires at least one shard."
+            )
+
+        self._shards = list(shards)
+        self._key_fn = key_fn
+        self._shard_fn = shard_fn
+        self._max_workers = max_workers or len(self._shards)
+        self._executor: typing.Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._identity_map: typing.Optional[identity_map_.IdentityMap] = None
+        # the shards written to, and the shards read from, since the last save or rollback
+        self._touched: typing.Set[int] = set()
+        self._read: typing.Set[int] = set()
+
+    def add(self, item: E, /) -> E:
+        return self._shard(self._key_fn(item), write=True).add(item)
+
+    def add_all(self, items: typing.Collection[E], /) -> typing.Collection[E]:
+        groups = self._group(items)
+        self._touched.update(groups)
+        self._scatter(lambda shard, ix: shard.add_all(groups[ix]), groups)
+        return items
+
+    def all(self) -> typing.List[E]:
+        self._read.update(range(len(self._shards)))
+        return list(
+            itertools.chain.from_iterable(
+                self._scatter(lambda shard, ix: shard.all(), range(len(self._shards)))
+            )
+        )
+
+    def close(self) -> None:
+        errors: typing.Dict[int, BaseException] = {}
+        for ix, shard in enumerate(self._shards):
+            try:
+                shard.close()
+            except Exception as e:
+                errors[ix] = e
+        self._shutdown_executor()
+        if errors:
+            raise exceptions.ShardErrors("close", errors)
+
+    def delete(self, item: E, /) -> E:
+        return self._shard(self._key_fn(item), write=True).delete(item)
+
+    def delete_all(self) -> None:
+        self._touched.update(range(len(self._shards)))
+        self._scatter(lambda shard, ix: shard.delete_all(), range(len(self._shards)))
+
+    def get(self, item_id: typing.Any, /) -> E:
+        return self._shard(item_id).get(item_id)
+
+    @property
+    def identity_map(self) -> typing.Optional[identity_map_.IdentityMap]:
+        return self._identity_map
+
+    @identity_map.setter
+    def identity_map(self, value: typing.Optional[identity_map_.IdentityMap]) -> None:
+        self._identity_map = value
+        for shard in self._shards:
+            shard.identity_map = value
+
+    def open(self) -> ShardedRepository[E]:
+        return self
+
+    def reset(self) -> bool:
+        return all([shard.reset() for shard in self._shards])
+
+    def rollback(self) -> None:
+        used = sorted(self._touched | self._read)
+        self._touched, self._read = set(), set()
+        try:
+            self._scatter(lambda shard, ix: shard.rollback(), used, action="rollback")
+        finally:
+            self._shutdown_executor()
+
+    def save(self) -> None:
+        touched = self._touched
+        try:
+            self._scatter(
+                lambda shard, ix: shard.save() if ix in touched else shard.rollback(),
+                sorted(self._touched | self._read),
+                action="save",
+            )
+        finally:
+            self._shutdown_executor()
+        self._touched, self._read = set(), set()
+
+    @contextlib.contextmanager
+    def savepoint(self) -> typing.Iterator[None]:
+        with contextlib.ExitStack() as stack:
+            for ix, shard in enumerate(self._shards):
+                self._touched.add(ix)
+                stack.enter_context(shard.savepoint())
+            yield
+
+    def set_all(self, items: typing.Collection[E], /) -> typing.Collection[E]:
+        groups = self._group(items)
+        self._touched.update(range(len(self._shards)))
+        self._scatter(
+            lambda shard, ix: shard.set_all(groups.get(ix, [])), range(len(self._shards))
+        )
+        return items
+
+    @property
+    def shards(self) -> typing.List[repository.Repository[E]]:
+        return list(self._shards)
+
+    def shard_index(self, key: typing.Hashable, /) -> int:
+        return self._shard_fn(key, len(self._shards))
+
+    def update(self, item: E, /) -> E:
+        return self._shard(self._key_fn(item), write=True).update(item)
+
+    def where(self, predicate: typing.Any, /) -> typing.List[E]:
+        """Entities matching predicate on every shard, for shards that support where (e.g. SqlAlchemyRepository)"""
+        self._read.update(range(len(self._shards)))
+        return list(
+            itertools.chain.from_iterable(
+                self._scatter(
+                    lambda shard, ix: shard.where(predicate),  # type: ignore[attr-defined]
+                    range(len(self._shards)),
+                )
+            )
+        )
+
+    def _group(self, items: typing.Iterable[E], /) -> typing.Dict[int, typing.List[E]]:
+        groups: typing.DefaultDict[int, typing.List[E]] = collections.defaultdict(list)
+        for item in items:
+            groups[self.shard_index(self._key_fn(item))].append(item)
+        return dict(groups)
+
+    def _scatter(
+        self,
+        fn: typing.Callable[[repository.Repository[E], int], R],
+        indices: typing.Iterable[int],
+        /,
+        *,
+        action: str = "query",
+    ) -> typing.List[R]:
+        """fn(shard, index) for each shard index, run in parallel, with results in index order"""
+        indices = list(indices)
+        if not indices:
+            return []
+        if len(indices) == 1:
+            # no need for a thread, but report the error the same way
+            futures = {indices[0]: _call(fn, self._shards[indices[0]], indices[0])}
+        else:
+            executor = self._get_executor()
+            futures = {
+                ix: executor.submit(fn, self._shards[ix], ix) for ix in indices
+            }
+        results: typing.List[R] = []
+        errors: typing.Dict[int, BaseException] = {}
+        for ix, future in futures.items():
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors[ix] = e
+        if errors:
+            raise exceptions.ShardErrors(action, errors)
+        return results
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix=f"lime_uow-{self.__class__.__name__}",
+                )
+            return self._executor
+
+    def _shard(self, key: typing.Hashable, /, *, write: bool = False) -> repository.Repository[E]:
+        ix = self.shard_index(key)
+        (self._touched if write else self._read).add(ix)
+        return self._shards[ix]
+
+    def _shutdown_executor(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+def _call(
+    fn: typing.Callable[[repository.Repository[E], int], R],
+    shard: repository.Repository[E],
+    ix: int,
+    /,
+) -> concurrent.futures.Future[R]:
+    future: concurrent.futures.Future[R] = concurrent.futures.Future()
+    try:
+        future.set_result(fn(shard, ix))
+    except Exception as e:
+        future.set_exception(e)
+    return future
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import pathlib
+import typing
+
+from lime_uow.resources import temp_file
+
+__all__ = ("SpooledTempFileSharedResource",)
+
+
+class SpooledTempFileSharedResource(temp_file.TempFileSharedResource):
+    """TempFileSharedResource that keeps its content in memory until it grows past max_size
+
+    Accessing file_path also moves the content to a real file, since callers of it expect one to exist.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int = 1024 * 1024,
+        prefix: typing.Optional[str] = None,
+        file_extension: typing.Optional[str] = None,
+        buffer_size: int = io.DEFAULT_BUFFER_SIZE,
+    ):
+        super().__init__(
+            prefix=prefix,
+            file_extension=file_extension,
+            buffer_size=buffer_size,
+        )
+        self._max_size = max_size
+        self._rolled_over = False
+
+    def close(self) -> None:
+        if self._rolled_over:
+            super().close()
+        elif self._file_handle is not None:
+            self._file_handle.close()
+            self._file_handle = None
+        self._rolled_over = False
+
+    @property
+    def file_path(self) -> pathlib.Path:
+        self.rollover()
+        return super().file_path
+
+    @classmethod
+    def interface(cls) -> typing.Type[SpooledTempFileSharedResource]:
+        return cls
+
+    @property
+    def is_rolled_over(self) -> bool:
+        return self._rolled_over
+
+    @contextlib.contextmanager
+    def reader(self) -> typing.Iterator[typing.IO[bytes]]:
+        if self._rolled_over:
+            with super().reader() as fh:
+                yield fh
+        else:
+            yield io.BytesIO(self._buffer.getvalue())
+
+    def rollover(self) -> None:
+        """Move the in-memory content to a temporary file on disk"""
+        if not self._rolled_over:
+            fh = super()._create_file()
+            fh.write(self._buffer.getvalue())
+            fh.flush()
+            self._buffer.close()
+            self._file_handle = fh
+            self._rolled_over = True
+
+    @contextlib.contextmanager
+    def view(self) -> typing.Iterator[memoryview]:
+        if self._rolled_over:
+            with super().view() as buffer:
+                yield buffer
+        else:
+            with self._buffer.getbuffer() as buffer:
+                yield buffer
+
+    @property
+    def _buffer(self) -> io.BytesIO:
+        return typing.cast(io.BytesIO, self.handle)
+
+    def _create_file(self) -> typing.IO[bytes]:
+        return io.BytesIO()
+
+    def _write_stored(self, data: bytes, /) -> None:
+        super()._write_stored(data)
+        if not self._rolled_over and self.handle.tell() > self._max_size:
+            self.rollover()
@@ -1,28 +1,116 @@
 from __future__ import annotations
 
+import bz2
+import contextlib
+import dataclasses
+import gzip
+import io
+import lzma
+import mmap
 import os
 import pathlib
 import tempfile
+import time
 import types
 import typing
+import zlib
 
 from lime_uow.resources import resource
 
-__all__ = ("TempFileSharedResource",)
+__all__ = (
+    "TempFileSharedResource",
+    "WriteStats",
+)
+
+Compression = typing.Literal["bz2", "gzip", "lzma"]
+
+
+class _Compressor(typing.Protocol):
+    def compress(self, data: bytes, /) -> bytes:
+        ...
+
+    def flush(self) -> bytes:
+        ...
+
+
+_COMPRESSORS: typing.Dict[str, typing.Callable[[], _Compressor]] = {
+    "bz2": bz2.BZ2Compressor,
+    "gzip": lambda: zlib.compressobj(wbits=31),
+    "lzma": lzma.LZMACompressor,
+}
+
+_DECOMPRESSORS: typing.Dict[
+    str, typing.Callable[[typing.IO[bytes]], typing.IO[bytes]]
+] = {
+    "bz2": lambda fh: bz2.BZ2File(fh, mode="rb"),
+    "gzip": lambda fh: gzip.GzipFile(fileobj=fh, mode="rb"),  # type: ignore
+    "lzma": lambda fh: lzma.LZMAFile(fh, mode="rb"),
+}
+
+
+class _BoundedReader(io.RawIOBase):
+    """Reads the first size bytes of fh"""
+
+    def __init__(self, fh: typing.IO[bytes], size: int, /):
+        self._fh = fh
+        self._remaining = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: typing.Any) -> int:
+        with memoryview(buffer) as view:
+            data = self._fh.read(min(len(view), self._remaining))
+            view[: len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+@dataclasses.dataclass(frozen=True)
+class WriteStats:
+    records: int
+    bytes_written: int
+    bytes_stored: int
+    seconds: float
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_written / self.seconds if self.seconds else 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
 
 
 class TempFileSharedResource(resource.Resource[typing.IO[bytes]]):
+    """Temporary file for staging data
+
+    When compression is used, each save() finishes a compressed stream, so readers only see content up
+    to the last save().
+    """
+
     def __init__(
         self,
         *,
         prefix: typing.Optional[str] = None,
         file_extension: typing.Optional[str] = None,
+        buffer_size: int = io.DEFAULT_BUFFER_SIZE,
+        compression: typing.Optional[Compression] = None,
     ):
         self._prefix = prefix
         self._file_extension = file_extension
+        self._buffer_size = buffer_size
+        self._compression = compression
 
         self._file_handle: typing.Optional[typing.IO[bytes]] = None
         self._file_path: typing.Optional[pathlib.Path] = None
+        self._compressor: typing.Optional[_Compressor] = None
+        self._committed_offset = 0
+
+        self._records_written = 0
+        self._bytes_written = 0
+        self._bytes_stored = 0
+        self._write_seconds = 0.0
 
     def __enter__(self):
         self.open()
@@ -38,12 +126,18 @@ class TempFileSharedResource(resource.Resource[typing.IO[bytes]]):
         return False
 
     def clear(self):
+        """Remove all content, including content that has already been saved"""
         self.handle.seek(0, 0)  # go to beginning of file
         self.handle.truncate()
+        self._compressor = self._create_compressor()
+        self._committed_offset = 0
 
     def close(self) -> None:
-        self.handle.close()
-        os.unlink(self.file_path)
+        if self._file_handle is not None:
+            self._file_handle.close()
+            os.unlink(self._file_handle.name)
+            self._file_handle = None
+            self._file_path = None
 
     @property
     def handle(self) -> typing.IO[bytes]:
@@ -55,6 +149,10 @@ class TempFileSharedResource(resource.Resource[typing.IO[bytes]]):
     def interface(cls) -> typing.Type[TempFileSharedResource]:
         return cls
 
+    def is_transactional(self) -> bool:
+        # units of work save and roll back the staged data along with the rest of the transaction
+        return True
+
     @property
     def file_path(self) -> pathlib.Path:
         if self._file_path is None:
@@ -62,22 +160,124 @@ class TempFileSharedResource(resource.Resource[typing.IO[bytes]]):
         return self._file_path
 
     def open(self) -> typing.IO[bytes]:
-        ext = f".{self._file_extension}" if self._file_extension else None
-        self._file_handle = tempfile.NamedTemporaryFile(
-            prefix=self._prefix,
-            suffix=ext,
-            delete=False,
-        )
+        if self._file_handle is None:
+            self._file_handle = self._create_file()
+            self._compressor = self._create_compressor()
+            self._committed_offset = 0
+            self._records_written = 0
+            self._bytes_written = 0
+            self._bytes_stored = 0
+            self._write_seconds = 0.0
         return self._file_handle
 
+    def iter_chunks(self, chunk_size: int = io.DEFAULT_BUFFER_SIZE) -> typing.Iterator[bytes]:
+        with self.reader() as fh:
+            while chunk := fh.read(chunk_size):
+                yield chunk
+
+    def iter_lines(self, encoding: str = "utf-8") -> typing.Iterator[str]:
+        with self.reader() as fh:
+            yield from io.TextIOWrapper(fh, encoding=encoding, newline="")
+
+    @contextlib.contextmanager
+    def reader(self) -> typing.Iterator[typing.IO[bytes]]:
+        """Open a separate read-only handle on the file, so the content can be streamed to a bulk loader"""
+        self.handle.flush()
+        with open(self.file_path, "rb") as fh:
+            if self._compression is None:
+                yield fh
+            else:
+                # past the committed offset is the unfinished stream of the open compressor
+                committed = io.BufferedReader(_BoundedReader(fh, self._committed_offset))
+                with _DECOMPRESSORS[self._compression](committed) as decompressed:
+                    yield decompressed
+
+    @contextlib.contextmanager
+    def view(self) -> typing.Iterator[memoryview]:
+        """Zero-copy view of the file's content backed by mmap
+
+        The view is released when the with block exits, so it must not be used afterwards.  When
+        compression is used, the view holds the compressed bytes as they are stored on disk.
+        """
+        self.handle.flush()
+        fileno = self.handle.fileno()
+        if os.fstat(fileno).st_size == 0:
+            # empty files cannot be mapped
+            yield memoryview(b"")
+        else:
+            with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as buffer:
+                    yield buffer
+
     def all(self) -> str:
-        self.handle.seek(0, 0)  # go to beginning of file
-        content = self.handle.read()
-        self.handle.seek(0, 2)  # go to end of file
-        return content.decode()
+        return b"".join(self.iter_chunks()).decode()
+
+    def rollback(self) -> None:
+        """Discard everything written since the last save()"""
+        if self._file_handle is not None:
+            self._file_handle.seek(self._committed_offset, 0)
+            self._file_handle.truncate()
+            self._compressor = self._create_compressor()
 
     def save(self) -> None:
+        if self._compressor is not None:
+            self._write_stored(self._compressor.flush())
+            self._compressor = self._create_compressor()
         self.handle.flush()
+        self._committed_offset = self.handle.tell()
 
     def add(self, content: str) -> None:
-        self.handle.write(content.encode())
+        self._write(content.encode(), records=1)
+
+    def add_all(self, contents: typing.Iterable[str]) -> None:
+        """Write each string, batching them into writes of roughly buffer_size bytes"""
+        batch: typing.List[bytes] = []
+        batch_size = 0
+        for content in contents:
+            data = content.encode()
+            batch.append(data)
+            batch_size += len(data)
+            if batch_size >= self._buffer_size:
+                self._write(b"".join(batch), records=len(batch))
+                batch = []
+                batch_size = 0
+        if batch:
+            self._write(b"".join(batch), records=len(batch))
+
+    @property
+    def write_stats(self) -> WriteStats:
+        return WriteStats(
+            records=self._records_written,
+            bytes_written=self._bytes_written,
+            bytes_stored=self._bytes_stored,
+            seconds=self._write_seconds,
+        )
+
+    def _create_file(self) -> typing.IO[bytes]:
+        ext = f".{self._file_extension}" if self._file_extension else None
+        return tempfile.NamedTemporaryFile(
+            prefix=self._prefix,
+            suffix=ext,
+            delete=False,
+            buffering=self._buffer_size,
+        )
+
+    def _create_compressor(self) -> typing.Optional[_Compressor]:
+        if self._compression is None:
+            return None
+        return _COMPRESSORS[self._compression]()
+
+    def _write(self, data: bytes, /, *, records: int) -> None:
+        if self._file_handle is None:
+            self.open()
+        start = time.perf_counter()
+        self._records_written += records
+        self._bytes_written += len(data)
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        self._write_stored(data)
+        self._write_seconds += time.perf_counter() - start
+
+    def _write_stored(self, data: bytes, /) -> None:
+        self.handle.write(data)
+        self._bytes_stored += len(data)
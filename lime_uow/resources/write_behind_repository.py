@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import abc
+import contextlib
+import typing
+
+from lime_uow import exceptions, identity_map as identity_map_
+from lime_uow.resources import repository
+
+E = typing.TypeVar("E")
+
+__all__ = ("WriteBehindRepository",)
+
+Operation = typing.Literal["add", "update", "delete"]
+
+# the operation left after a second one on the same key, or None if the two cancel out; an add after an
+# add or an update is missing, as the key already exists, and so is an update after a delete, as it no longer does
+_COLLAPSE: typing.Dict[
+    typing.Tuple[Operation, Operation], typing.Optional[Operation]
+] = {
+    ("add", "update"): "add",
+    ("add", "delete"): None,
+    ("update", "update"): "update",
+    ("update", "delete"): "delete",
+    ("delete", "add"): "update",
+    ("delete", "delete"): "delete",
+}
+
+
+class WriteBehindRepository(repository.Repository[E], abc.ABC, typing.Generic[E]):
+    """Wrapper that buffers the writes to another repository until save()
+
+    add, update and delete are recorded by key, and a later write to the same key replaces the earlier
+    one (an add followed by an update is still an add, an add followed by a delete is dropped, and so on).
+    Adding a key that already has a buffered add or update raises DuplicateKeyError, and updating a key
+    with a buffered delete raises KeyError.
+    save() hands the buffer to the wrapped repository as one delete_many, update_many and add_all call,
+    in that order, then saves it.  Reads see the buffered writes, and rollback() discards them.
+
+    get raises KeyError for a key with a buffered delete.  delete_all and set_all discard the buffer and
+    go straight to the wrapped repository.
+    """
+
+    def __init__(
+        self,
+        inner: repository.Repository[E],
+        /,
+        *,
+        key_fn: typing.Callable[[E], typing.Hashable],
+    ):
+        super().__init__()
+
+        self._inner = inner
+        self._key_fn = key_fn
+        self._buffer: typing.Dict[typing.Hashable, typing.Tuple[Operation, E]] = {}
+
+    def add(self, item: E, /) -> E:
+        self._record("add", item)
+        return item
+
+    def add_all(self, items: typing.Collection[E], /) -> typing.Collection[E]:
+        for item in items:
+            self._record("add", item)
+        return items
+
+    def all(self) -> typing.List[E]:
+        if not self._buffer:
+            return list(self._inner.all())
+        result: typing.List[E] = []
+        seen: typing.Set[typing.Hashable] = set()
+        for item in self._inner.all():
+            key = self._key_fn(item)
+            seen.add(key)
+            if (buffered := self._buffer.get(key)) is None:
+                result.append(item)
+            elif buffered[0] != "delete":
+                result.append(buffered[1])
+        result += [
+            item
+            for key, (operation, item) in self._buffer.items()
+            if operation != "delete" and key not in seen
+        ]
+        return result
+
+    def close(self) -> None:
+        self._buffer.clear()
+        self._inner.close()
+
+    def delete(self, item: E, /) -> E:
+        self._record("delete", item)
+        return item
+
+    def delete_all(self) -> None:
+        self._buffer.clear()
+        self._inner.delete_all()
+
+    def flush(self) -> None:
+        """Apply the buffered writes to the wrapped repository without saving it"""
+        batches: typing.Dict[Operation, typing.List[E]] = {
+            "add": [],
+            "update": [],
+            "delete": [],
+        }
+        for operation, item in self._buffer.values():
+            batches[operation].append(item)
+        if batches["delete"]:
+            self._inner.delete_many(batches["delete"])
+        if batches["update"]:
+            self._inner.update_many(batches["update"])
+        if batches["add"]:
+            self._inner.add_all(batches["add"])
+        self._buffer.clear()
+
+    def get(self, item_id: typing.Any, /) -> E:
+        if (buffered := self._buffer.get(item_id)) is None:
+            return self._inner.get(item_id)
+        operation, item = buffered
+        if operation == "delete":
+            raise KeyError(item_id)
+        return item
+
+    @property
+    def identity_map(self) -> typing.Optional[identity_map_.IdentityMap]:
+        return self._inner.identity_map
+
+    @identity_map.setter
+    def identity_map(self, value: typing.Optional[identity_map_.IdentityMap]) -> None:
+        self._inner.identity_map = value
+
+    @property
+    def inner(self) -> repository.Repository[E]:
+        return self._inner
+
+    def open(self) -> WriteBehindRepository[E]:
+        return self
+
+    @property
+    def pending(self) -> int:
+        """The number of buffered writes, after collapsing"""
+        return len(self._buffer)
+
+    def reset(self) -> bool:
+        return self._inner.reset()
+
+    def rollback(self) -> None:
+        self._buffer.clear()
+        self._inner.rollback()
+
+    def save(self) -> None:
+        self.flush()
+        self._inner.save()
+
+    @contextlib.contextmanager
+    def savepoint(self) -> typing.Iterator[None]:
+        buffer = self._buffer.copy()
+        with self._inner.savepoint():
+            try:
+                yield
+            except BaseException:
+                self._buffer = buffer
+                raise
+
+    def set_all(self, items: typing.Collection[E], /) -> typing.Collection[E]:
+        self._buffer.clear()
+        return self._inner.set_all(items)
+
+    def update(self, item: E, /) -> E:
+        self._record("update", item)
+        return item
+
+    def _record(self, operation: Operation, item: E, /) -> None:
+        key = self._key_fn(item)
+        if (buffered := self._buffer.get(key)) is not None:
+            if buffered[0] == "delete" and operation == "update":
+                raise KeyError(key)
+            if (buffered[0], operation) not in _COLLAPSE:
+                raise exceptions.DuplicateKeyError(
+                    f"{self.__class__.__name__} already has a pending {buffered[0]} for key {key!r}."
+                )
+            collapsed = _COLLAPSE[(buffered[0], operation)]
+            if collapsed is None:
+                del self._buffer[key]
+                return
+            operation = collapsed
+        self._buffer[key] = (operation, item)
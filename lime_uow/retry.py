@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import dataclasses
+import random
+import re
+import time
+import typing
+
+__all__ = (
+    "RETRYABLE_SQLSTATES",
+    "RetryPolicy",
+    "is_retryable",
+)
+
+RETRYABLE_SQLSTATES = frozenset(
+    (
+        "40001",  # serialization failure; also how SQL Server and MySQL report deadlock victims
+        "40P01",  # PostgreSQL deadlock detected
+    )
+)
+
+_SQLSTATE = re.compile(r"^[0-9A-Z]{5}$")
+
+_SQLITE_BUSY_MESSAGES = ("database is locked", "database table is locked")
+
+
+def is_retryable(error: BaseException, /) -> bool:
+    """Is error a transient failure that is likely to succeed if the transaction is run again?
+
+    Deadlocks and serialization failures are recognized by SQLSTATE on psycopg2-style errors (pgcode) and
+    on DBAPI errors that carry it in args[0], like pyodbc's; busy SQLite databases by message, and dropped
+    connections by SQLAlchemy's connection_invalidated flag.  SQLAlchemy errors are classified by the DBAPI
+    error they wrap, and the __cause__/__context__ chain is followed, so errors re-raised by rollback
+    still count.
+    """
+    seen: typing.Set[int] = set()
+    current: typing.Optional[BaseException] = error
+    # the DBAPI error wrapped by a SQLAlchemy error, whose args[0] may be a SQLSTATE
+    wrapped: typing.Optional[BaseException] = None
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if getattr(current, "connection_invalidated", False):
+            return True
+        if _sqlstate(current, is_dbapi_error=current is wrapped) in RETRYABLE_SQLSTATES:
+            return True
+        if type(current).__name__ == "OperationalError" and any(
+            message in str(current) for message in _SQLITE_BUSY_MESSAGES
+        ):
+            return True
+        wrapped = getattr(current, "orig", None)
+        current = wrapped or current.__cause__ or current.__context__
+    return False
+
+
+@dataclasses.dataclass(frozen=True)
+class RetryPolicy:
+    """How UnitOfWork.run retries a transaction that failed with a retryable error
+
+    The delay before attempt n + 1 is drawn uniformly from [0, min(max_delay, base_delay * multiplier ** (n - 1))]
+    ("full jitter"), so workers that collided once are unlikely to collide again.  No attempt is started
+    once deadline seconds have passed since the first one.
+    """
+
+    max_attempts: int = 5
+    base_delay: float = 0.05
+    max_delay: float = 2.0
+    multiplier: float = 2.0
+    deadline: typing.Optional[float] = 30.0
+    retryable: typing.Callable[[BaseException], bool] = is_retryable
+    clock: typing.Callable[[], float] = dataclasses.field(
+        default=time.monotonic, compare=False
+    )
+    sleep: typing.Callable[[float], None] = dataclasses.field(
+        default=time.sleep, compare=False
+    )
+    rng: random.Random = dataclasses.field(
+        default_factory=random.Random, compare=False, repr=False
+    )
+
+    def delay(self, attempt: int, /) -> float:
+        """The time to wait after failed attempt number attempt (starting from 1)"""
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return self.rng.uniform(0, ceiling)
+
+
+def _sqlstate(error: BaseException, /, *, is_dbapi_error: bool) -> typing.Optional[str]:
+    for attr in ("pgcode", "sqlstate"):
+        if isinstance(code := getattr(error, attr, None), str):
+            return code
+    # any other exception may have a 5 character first argument, e.g. KeyError("40001")
+    if not (is_dbapi_error or _is_pyodbc_error(error)):
+        return None
+    if error.args and isinstance(code := error.args[0], str) and _SQLSTATE.match(code):
+        return code
+    return None
+
+
+def _is_pyodbc_error(error: BaseException, /) -> bool:
+    # checked by module rather than isinstance, so pyodbc does not have to be imported
+    return any(cls.__module__ == "pyodbc" for cls in type(error).__mro__)
@@ -1,29 +1,93 @@
 from __future__ import annotations
 
+import concurrent.futures
+import dataclasses
+import time
 import types
 import typing
 
-from lime_uow import exceptions, resources
+from lime_uow import exceptions, instrumentation, resources
 
 __all__ = (
+    "ExpiryPolicy",
     "SharedResources",
     "PlaceholderSharedResources",
 )
 
 T = typing.TypeVar("T")
 
+ResourceType = typing.Type[resources.Resource[typing.Any]]
+
+
+@dataclasses.dataclass(frozen=True)
+class ExpiryPolicy:
+    """How long a shared handle may be kept before it is closed and reopened
+
+    idle_timeout is measured from the last get() of the handle, or of a handle that depends on it, and
+    max_lifetime from when it was opened.  Expired handles are only closed by evict_expired(), which
+    units of work call when a transaction begins, so a handle is never closed while a transaction uses it.
+    """
+
+    idle_timeout: typing.Optional[float] = None
+    max_lifetime: typing.Optional[float] = None
+
 
 class SharedResources:
-    def __init__(self, /, *shared_resource: resources.Resource[typing.Any]):
+    def __init__(
+        self,
+        /,
+        *shared_resource: resources.Resource[typing.Any],
+        max_workers: typing.Optional[int] = None,
+        expiry_policies: typing.Optional[
+            typing.Mapping[ResourceType, ExpiryPolicy]
+        ] = None,
+        clock: typing.Callable[[], float] = time.monotonic,
+        listeners: typing.Optional[typing.List[instrumentation.Listener]] = None,
+    ):
         resources.check_for_ambiguous_implementations(shared_resource)
 
-        self.__shared_resources: typing.Dict[str, resources.Resource[typing.Any]] = {
-            resource.interface().__name__: resource for resource in shared_resource
+        self.__shared_resources: typing.Dict[
+            ResourceType, resources.Resource[typing.Any]
+        ] = {resource.interface(): resource for resource in shared_resource}
+        # maps every type get() has been called with to the interface it resolved to
+        self.__interfaces: typing.Dict[ResourceType, ResourceType] = {
+            interface: interface for interface in self.__shared_resources
         }
-        # self.__shared_resources = tuple(shared_resource)
-        self.__handles: typing.Dict[str, typing.Any] = {}
+        self.__handles: typing.Dict[ResourceType, typing.Any] = {}
         self.__opened = False
         self.__closed = False
+        self.__max_workers = max_workers
+        self.__dependency_levels = self.__sort_by_dependencies()
+        self.__dependents: typing.Dict[ResourceType, typing.Set[ResourceType]] = {
+            interface: set() for interface in self.__shared_resources
+        }
+        for interface, resource in self.__shared_resources.items():
+            for dependency in resource.dependencies():
+                self.__dependents[self.__resolve(dependency)].add(interface)
+        # the direct and indirect dependencies of each interface, which are in use whenever it is
+        self.__dependencies: typing.Dict[ResourceType, typing.Set[ResourceType]] = {
+            interface: set() for interface in self.__shared_resources
+        }
+        for dependency, dependents in self.__dependents.items():
+            pending = list(dependents)
+            while pending:
+                dependent = pending.pop()
+                if dependency not in self.__dependencies[dependent]:
+                    self.__dependencies[dependent].add(dependency)
+                    pending += self.__dependents[dependent]
+
+        self.__expiry_policies: typing.Dict[ResourceType, ExpiryPolicy] = {
+            self.__resolve(resource_type): policy
+            for resource_type, policy in (expiry_policies or {}).items()
+        }
+        self.__clock = clock
+        self.__opened_at: typing.Dict[ResourceType, float] = {}
+        self.__last_used: typing.Dict[ResourceType, float] = {}
+        self.__evicted: typing.Set[ResourceType] = set()
+        self.__eviction_count = 0
+        self.__reopen_count = 0
+        self.__generation = 0
+        self.__listeners = [] if listeners is None else listeners
 
     def __enter__(self) -> SharedResources:
         if self.__opened:
@@ -42,17 +106,76 @@ class SharedResources:
         self.close()
         return False
 
-    def close(self):
+    def add_listener(self, listener: instrumentation.Listener, /) -> None:
+        """Report each open and close of a shared resource to listener"""
+        self.__listeners.append(listener)
+
+    def close(self) -> typing.Dict[ResourceType, float]:
+        """Close the open handles, dependents first, and return how long each one took to close
+
+        Every handle is closed even if closing another one fails; the errors are then raised together
+        as a CloseErrors.
+        """
         if self.__closed:
             raise exceptions.ResourceClosed()
-        for resource_name in self.__handles.keys():
-            self.__shared_resources[resource_name].close()
-        self.__handles = {}
-        self.__closed = True
-        self.__opened = False
+        timings: typing.Dict[ResourceType, float] = {}
+        errors: typing.Dict[ResourceType, BaseException] = {}
+        try:
+            for level in reversed(self.__dependency_levels):
+                level_timings, level_errors = self.__run_concurrently(
+                    self.__close,
+                    [interface for interface in level if interface in self.__handles],
+                )
+                timings.update(level_timings)
+                errors.update(level_errors)
+        finally:
+            self.__handles = {}
+            self.__generation += 1
+            self.__closed = True
+            self.__opened = False
+        if errors:
+            raise exceptions.CloseErrors(
+                {interface.__name__: error for interface, error in errors.items()}
+            )
+        return timings
+
+    def enlisted(self) -> typing.List[resources.Resource[typing.Any]]:
+        """The open shared resources that units of work save and roll back (see Resource.is_transactional)"""
+        return [resource for resource in self.opened() if resource.is_transactional()]
+
+    @property
+    def eviction_count(self) -> int:
+        return self.__eviction_count
+
+    def evict_expired(self) -> int:
+        """Close every handle that has outlived its ExpiryPolicy and return how many were closed
+
+        Evicted handles are reopened by the next get().  Only call this between transactions, since a
+        unit of work may still be using a handle that has expired; units of work call it when a
+        transaction begins.
+        """
+        if not self.__expiry_policies:
+            return 0
+        now = self.__clock()
+        expired = [
+            interface
+            for interface in self.__handles
+            if self.__is_expired(interface, now)
+        ]
+        evicted = 0
+        for interface in expired:
+            # it may already have been evicted along with a dependency
+            if interface in self.__handles:
+                evicted += self.__evict(interface)
+        return evicted
+
+    @property
+    def generation(self) -> int:
+        """Incremented whenever a handle is closed, so holders of old handles can tell they are stale"""
+        return self.__generation
 
     def exists(self, /, resource_type: typing.Type[resources.Resource[T]]):
-        return resource_type.__name__ in self.__shared_resources.keys()
+        return resource_type in self.__shared_resources
 
     def get(
         self,
@@ -60,21 +183,197 @@ class SharedResources:
     ) -> T:
         if self.__closed:
             raise exceptions.ResourceClosed()
+
+        interface = self.__resolve(resource_type)
+        if interface in self.__handles:
+            if self.__expiry_policies:
+                self.__touch(interface, self.__clock())
+            return self.__handles[interface]
+        else:
+            return self.__open(interface)
+
+    def opened(self) -> typing.List[resources.Resource[typing.Any]]:
+        """The shared resources whose handles are open"""
+        return [self.__shared_resources[interface] for interface in self.__handles]
+
+    def remove_listener(self, listener: instrumentation.Listener, /) -> None:
+        self.__listeners.remove(listener)
+
+    @property
+    def reopen_count(self) -> int:
+        return self.__reopen_count
+
+    def warmup(self) -> typing.Dict[ResourceType, float]:
+        """Open every shared resource up front and return how long each one took to open
+
+        Resources are opened concurrently, but each one only after the resources it depends on.
+        """
+        if self.__closed:
+            raise exceptions.ResourceClosed()
+
+        timings: typing.Dict[ResourceType, float] = {}
+        for level in self.__dependency_levels:
+            level_timings, errors = self.__run_concurrently(
+                self.__open,
+                [interface for interface in level if interface not in self.__handles],
+            )
+            if errors:
+                # the next level depends on this one, so stop here
+                raise next(iter(errors.values()))
+            timings.update(level_timings)
+        return timings
+
+    def __close(self, /, interface: ResourceType) -> None:
+        instrumentation.call(
+            self.__listeners,
+            self.__shared_resources[interface].close,
+            action="close",
+            source=self.__class__.__name__,
+            resource_name=interface.__name__,
+        )
+
+    def __evict(self, /, interface: ResourceType) -> int:
+        """Close interface's handle and the open handles that depend on it, dependents first
+
+        Returns the number of handles closed.
+        """
+        evicting = {interface}
+        pending = [interface]
+        while pending:
+            for dependent in self.__dependents[pending.pop()]:
+                if dependent not in evicting:
+                    evicting.add(dependent)
+                    pending.append(dependent)
+        closed = 0
+        for level in reversed(self.__dependency_levels):
+            for evicted in level:
+                if evicted in evicting and evicted in self.__handles:
+                    del self.__handles[evicted]
+                    self.__generation += 1
+                    self.__evicted.add(evicted)
+                    self.__eviction_count += 1
+                    self.__close(evicted)
+                    closed += 1
+        return closed
+
+    def __is_expired(self, /, interface: ResourceType, now: float) -> bool:
+        if (policy := self.__expiry_policies.get(interface)) is None:
+            return False
         elif (
-            interface_name := resource_type.interface().__name__
-        ) in self.__handles.keys():
-            return self.__handles[interface_name]
-        elif interface_name in self.__shared_resources.keys():
-            resource = self.__shared_resources[interface_name]
-            handle = resource.open()
-            self.__handles[interface_name] = handle
-            return handle
+            policy.idle_timeout is not None
+            and now - self.__last_used[interface] > policy.idle_timeout
+        ):
+            return True
         else:
-            raise exceptions.MissingResourceError(
-                resource_name=interface_name,
-                available_resources=self.__shared_resources.keys(),
+            return (
+                policy.max_lifetime is not None
+                and now - self.__opened_at[interface] > policy.max_lifetime
             )
 
+    def __open(self, /, interface: ResourceType) -> typing.Any:
+        handle = instrumentation.call(
+            self.__listeners,
+            self.__shared_resources[interface].open,
+            action="open",
+            source=self.__class__.__name__,
+            resource_name=interface.__name__,
+        )
+        self.__handles[interface] = handle
+        self.__opened_at[interface] = now = self.__clock()
+        self.__touch(interface, now)
+        if interface in self.__evicted:
+            self.__evicted.remove(interface)
+            self.__reopen_count += 1
+        return handle
+
+    def __resolve(self, /, resource_type: ResourceType) -> ResourceType:
+        """Find the interface a resource type is registered under
+
+        Callers may pass either the interface or an implementation of it.
+        """
+        try:
+            return self.__interfaces[resource_type]
+        except KeyError:
+            interface = resource_type.interface()
+            if interface not in self.__shared_resources:
+                raise exceptions.MissingResourceError(
+                    resource_name=interface.__name__,
+                    available_resources=self.__resource_names(),
+                )
+            self.__interfaces[resource_type] = interface
+            return interface
+
+    def __resource_names(self) -> typing.List[str]:
+        return [interface.__name__ for interface in self.__shared_resources]
+
+    def __run_concurrently(
+        self,
+        fn: typing.Callable[[ResourceType], None],
+        interfaces: typing.List[ResourceType],
+        /,
+    ) -> typing.Tuple[
+        typing.Dict[ResourceType, float], typing.Dict[ResourceType, BaseException]
+    ]:
+        """Call fn on each interface and return the timings of the calls that succeeded and the errors of the rest"""
+        def timed(interface: ResourceType) -> float:
+            start = time.perf_counter()
+            fn(interface)
+            return time.perf_counter() - start
+
+        timings: typing.Dict[ResourceType, float] = {}
+        errors: typing.Dict[ResourceType, BaseException] = {}
+        if len(interfaces) <= 1:
+            for interface in interfaces:
+                try:
+                    timings[interface] = timed(interface)
+                except Exception as e:
+                    errors[interface] = e
+            return timings, errors
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.__max_workers
+        ) as executor:
+            futures = {interface: executor.submit(timed, interface) for interface in interfaces}
+        # every future has finished once the executor has shut down
+        for interface, future in futures.items():
+            if (error := future.exception()) is None:
+                timings[interface] = future.result()
+            else:
+                errors[interface] = error
+        return timings, errors
+
+    def __touch(self, /, interface: ResourceType, now: float) -> None:
+        """Record a use of interface, and so of the handles it depends on"""
+        self.__last_used[interface] = now
+        for dependency in self.__dependencies[interface]:
+            if dependency in self.__handles:
+                self.__last_used[dependency] = now
+
+    def __sort_by_dependencies(self) -> typing.List[typing.List[ResourceType]]:
+        """Group the resources into levels that only depend on resources in earlier levels"""
+        dependencies = {
+            interface: {self.__resolve(dep) for dep in resource.dependencies()}
+            for interface, resource in self.__shared_resources.items()
+        }
+        levels: typing.List[typing.List[ResourceType]] = []
+        sorted_interfaces: typing.Set[ResourceType] = set()
+        while dependencies:
+            level = [
+                interface
+                for interface, deps in dependencies.items()
+                if deps <= sorted_interfaces
+            ]
+            if not level:
+                raise exceptions.InvalidResource(
+                    f"The following shared resources have circular dependencies: "
+                    f"{', '.join(sorted(interface.__name__ for interface in dependencies))}."
+                )
+            levels.append(level)
+            sorted_interfaces.update(level)
+            for interface in level:
+                del dependencies[interface]
+        return levels
+
     def __eq__(self, other: object) -> bool:
         if other.__class__ is self.__class__:
             # noinspection PyTypeChecker
@@ -86,10 +385,10 @@ class SharedResources:
             return NotImplemented
 
     def __hash__(self) -> int:
-        return hash(self.__shared_resources)
+        return hash(frozenset(self.__shared_resources.keys()))
 
     def __repr__(self) -> str:
-        resources_str = ", ".join(self.__shared_resources.keys())
+        resources_str = ", ".join(self.__resource_names())
         return f"{self.__class__.__name__}: {resources_str}"
 
 
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import collections
+import contextlib
+import dataclasses
+import json
+import logging
+import os
+import pathlib
+import sys
+import threading
+import typing
+
+from lime_uow import instrumentation
+
+__all__ = (
+    "JsonLinesSink",
+    "LoggerSink",
+    "ResourceTimings",
+    "SlowTransaction",
+    "SlowTransactionLog",
+)
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+_CONTEXTLIB_FILE = os.path.abspath(contextlib.__file__)
+
+
+@dataclasses.dataclass(frozen=True)
+class ResourceTimings:
+    resource_name: str
+    open: float = 0.0
+    save: float = 0.0
+    rollback: float = 0.0
+
+
+@dataclasses.dataclass(frozen=True)
+class SlowTransaction:
+    unit_of_work: str
+    started_at: float
+    duration: float
+    get_count: int
+    resources: typing.Tuple[ResourceTimings, ...]
+    caller: typing.Optional[str]
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return dataclasses.asdict(self)
+
+
+SlowTransactionSink = typing.Callable[[SlowTransaction], None]
+
+
+class LoggerSink:
+    def __init__(
+        self,
+        logger: typing.Optional[logging.Logger] = None,
+        level: int = logging.WARNING,
+    ):
+        self._logger = logger or logging.getLogger("lime_uow.slow_transactions")
+        self._level = level
+
+    def __call__(self, record: SlowTransaction, /) -> None:
+        self._logger.log(self._level, "Slow transaction: %s", json.dumps(record.to_dict()))
+
+
+class JsonLinesSink:
+    def __init__(self, file_path: typing.Union[str, os.PathLike[str]], /):
+        self._file_path = pathlib.Path(file_path)
+        self._lock = threading.Lock()
+
+    def __call__(self, record: SlowTransaction, /) -> None:
+        line = json.dumps(record.to_dict())
+        with self._lock:
+            with self._file_path.open("a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+
+
+class SlowTransactionLog:
+    """Listener that reports transactions running longer than threshold seconds to sink
+
+    Each record breaks the time down by resource and notes where the transaction was entered from.  The
+    timings are added up as the events arrive, so a transaction costs the same memory however many
+    events it reports.
+    """
+
+    # resource events reported outside of a transaction that are kept, because the resources opened
+    # while entering a transaction are reported before its enter event
+    _MAX_PENDING = 64
+
+    def __init__(
+        self,
+        threshold: float,
+        sink: typing.Optional[SlowTransactionSink] = None,
+    ):
+        self.threshold = threshold
+        self._sink = sink or LoggerSink()
+        self._local = threading.local()
+
+    def __call__(self, event: instrumentation.Event, /) -> None:
+        transaction: typing.Optional[_Transaction] = getattr(
+            self._local, "transaction", None
+        )
+        if event.action == "enter":
+            transaction = self._local.transaction = _Transaction(
+                enter=event, caller=_find_caller()
+            )
+            for pending in self._local.__dict__.pop("pending", ()):
+                if pending.started_at >= event.started_at:
+                    transaction.add(pending)
+        elif transaction is None:
+            if event.action in _TIMED_ACTIONS:
+                self._local.__dict__.setdefault(
+                    "pending", collections.deque(maxlen=self._MAX_PENDING)
+                ).append(event)
+        elif event.action == "exit":
+            self._local.transaction = None
+            duration = event.started_at + event.duration - transaction.enter.started_at
+            if duration >= self.threshold:
+                self._sink(transaction.summarize(duration))
+        else:
+            transaction.add(event)
+
+
+_TIMED_ACTIONS = ("open", "save", "rollback")
+
+
+class _Transaction:
+    """Running totals for the transaction started by enter"""
+
+    def __init__(self, *, enter: instrumentation.Event, caller: typing.Optional[str]):
+        self.enter = enter
+        self.caller = caller
+        self.get_count = 0
+        self.timings: typing.Dict[str, typing.Dict[str, float]] = {}
+
+    def add(self, event: instrumentation.Event, /) -> None:
+        if event.action == "get":
+            self.get_count += 1
+        elif event.action in _TIMED_ACTIONS and event.resource_name:
+            resource_timings = self.timings.setdefault(event.resource_name, {})
+            resource_timings[event.action] = (
+                resource_timings.get(event.action, 0.0) + event.duration
+            )
+
+    def summarize(self, duration: float, /) -> SlowTransaction:
+        return SlowTransaction(
+            unit_of_work=self.enter.source,
+            started_at=self.enter.started_at,
+            duration=duration,
+            get_count=self.get_count,
+            resources=tuple(
+                ResourceTimings(resource_name=name, **resource_timings)
+                for name, resource_timings in self.timings.items()
+            ),
+            caller=self.caller,
+        )
+
+
+def _find_caller() -> typing.Optional[str]:
+    """Describe the first frame on the stack that is outside of lime_uow and contextlib
+
+    contextlib is skipped so that `with uow.read_only():` reports the with statement.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        file_name = os.path.abspath(frame.f_code.co_filename)
+        if not file_name.startswith(_PACKAGE_DIR) and file_name != _CONTEXTLIB_FILE:
+            return f"{file_name}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back  # type: ignore
+    return None
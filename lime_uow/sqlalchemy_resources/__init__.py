@@ -1,4 +1,25 @@
-from lime_uow.sqlalchemy_resources.sqlalchemy_engine import *
-from lime_uow.sqlalchemy_resources.sqlalchemy_repository import *
-from lime_uow.sqlalchemy_resources.sqlalchemy_session import *
-from lime_uow.sqlalchemy_resources.sqlalchemy_transaction import *
+import typing
+
+from lime_uow import _lazy
+
+# imported up front because the function has the same name as its module
+from lime_uow.sqlalchemy_resources.sqlalchemy_bulk_load import *
+
+__getattr__, __dir__, __all__ = _lazy.attach(
+    __name__,
+    exports={
+        "sqlalchemy_engine": ("SqlAlchemyEngine",),
+        "sqlalchemy_repository": ("SqlAlchemyRepository",),
+        "sqlalchemy_session": ("SqlAlchemySession",),
+        "sqlalchemy_transaction": ("SqlAlchemyTransaction",),
+        "sqlalchemy_instrumentation": ("instrument_engine",),
+    },
+)
+__all__ += ("sqlalchemy_bulk_load",)
+
+if typing.TYPE_CHECKING:
+    from lime_uow.sqlalchemy_resources.sqlalchemy_engine import *
+    from lime_uow.sqlalchemy_resources.sqlalchemy_repository import *
+    from lime_uow.sqlalchemy_resources.sqlalchemy_session import *
+    from lime_uow.sqlalchemy_resources.sqlalchemy_transaction import *
+    from lime_uow.sqlalchemy_resources.sqlalchemy_instrumentation import *
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import typing
+
+from lime_uow import bulk_load
+from lime_uow.resources import temp_file
+
+if typing.TYPE_CHECKING:
+    import sqlalchemy as sa
+    from sqlalchemy import orm
+
+__all__ = ("sqlalchemy_bulk_load",)
+
+
+def sqlalchemy_bulk_load(
+    con: typing.Union[orm.Session, sa.engine.Connection],
+    source: temp_file.TempFileSharedResource,
+    /,
+    *,
+    table: sa.Table,
+    columns: typing.Optional[typing.Sequence[str]] = None,
+    header: bool = True,
+    delimiter: str = ",",
+    chunk_size: int = 10_000,
+    null_value: typing.Optional[str] = None,
+    multi_row: bool = False,
+) -> bulk_load.BulkLoadStats:
+    """Insert the rows staged in source into table, one chunk at a time
+
+    Each chunk is sent as a Core executemany, or as a single multi-row INSERT when multi_row is True
+    (keep chunk_size * columns under the backend's bind parameter limit in that case).  The rows are
+    committed or rolled back with the session or transaction that con belongs to.
+    """
+
+    def load_chunk(
+        cols: typing.Sequence[str], rows: typing.List[bulk_load.Row]
+    ) -> None:
+        params = [dict(zip(cols, row)) for row in rows]
+        if multi_row:
+            con.execute(table.insert().values(params))
+        else:
+            con.execute(table.insert(), params)
+
+    return bulk_load.load_staged_file(
+        source,
+        load_chunk,
+        columns=columns,
+        header=header,
+        delimiter=delimiter,
+        chunk_size=chunk_size,
+        null_value=null_value,
+    )
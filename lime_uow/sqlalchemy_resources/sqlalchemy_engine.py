@@ -2,15 +2,16 @@ from __future__ import annotations
 
 import typing
 
-import sqlalchemy as sa
-
 from lime_uow.resources import resource
 from lime_uow.sqlalchemy_resources import sqlalchemy_transaction
 
+if typing.TYPE_CHECKING:
+    import sqlalchemy as sa
+
 __all__ = ("SqlAlchemyEngine",)
 
 
-class SqlAlchemyEngine(resource.Resource[sa.engine.Engine]):
+class SqlAlchemyEngine(resource.Resource["sa.engine.Engine"]):
     def __init__(self, /, db_uri: str):
         self._db_uri = db_uri
         self._engine: typing.Optional[sa.engine.Engine] = None
@@ -20,6 +21,8 @@ class SqlAlchemyEngine(resource.Resource[sa.engine.Engine]):
 
     def open(self) -> sa.engine.Engine:
         if self._engine is None:
+            import sqlalchemy as sa
+
             self._engine = sa.create_engine(self._db_uri)
         return self._engine
 
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import time
+import typing
+
+from lime_uow import instrumentation
+
+if typing.TYPE_CHECKING:
+    import sqlalchemy as sa
+
+__all__ = ("instrument_engine",)
+
+_STARTED_AT_KEY = "lime_uow_execute_started_at"
+
+
+def instrument_engine(
+    engine: sa.engine.Engine,
+    /,
+    *listeners: instrumentation.Listener,
+) -> None:
+    """Report each statement executed through engine to listeners as an "execute" event
+
+    The statement is included in the event attributes under "db.statement", so a TracingListener
+    on the same thread nests it under the transaction that ran it.
+    """
+    import sqlalchemy as sa
+
+    listener_list = list(listeners)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_STARTED_AT_KEY, []).append(
+            (time.time(), time.perf_counter())
+        )
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _notify(conn, statement, executemany, error=None)
+
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(_STARTED_AT_KEY):
+            _notify(
+                conn,
+                exception_context.statement,
+                False,
+                error=exception_context.original_exception,
+            )
+
+    def _notify(conn, statement, executemany, *, error):
+        started_at, start = conn.info[_STARTED_AT_KEY].pop()
+        instrumentation.notify(
+            listener_list,
+            instrumentation.Event(
+                action="execute",
+                source="sqlalchemy",
+                resource_name=None,
+                started_at=started_at,
+                duration=time.perf_counter() - start,
+                error=error,
+                attributes={
+                    "db.system": engine.dialect.name,
+                    "db.statement": statement,
+                    "db.executemany": executemany,
+                },
+            ),
+        )
+
+    sa.event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    sa.event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    sa.event.listen(engine, "handle_error", handle_error)
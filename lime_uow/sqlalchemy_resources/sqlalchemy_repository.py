@@ -3,10 +3,11 @@ from __future__ import annotations
 import abc
 import typing
 
-from sqlalchemy import orm
-
 from lime_uow.resources import repository
 
+if typing.TYPE_CHECKING:
+    from sqlalchemy import orm
+
 EntityType = typing.TypeVar("EntityType")
 
 __all__ = ("SqlAlchemyRepository",)
@@ -15,6 +16,10 @@ __all__ = ("SqlAlchemyRepository",)
 class SqlAlchemyRepository(
     repository.Repository[EntityType], abc.ABC, typing.Generic[EntityType]
 ):
+    # set to True in a subclass to have units of work reuse the repository, and its session, between
+    # transactions instead of calling create_resources again
+    recyclable: typing.ClassVar[bool] = False
+
     def __init__(self, session: orm.Session, /):
         self._session = session
         self._entity_type: typing.Optional[typing.Type[EntityType]] = None
@@ -29,18 +34,61 @@ class SqlAlchemyRepository(
         self.session.bulk_save_objects(items)
         return items
 
-    def all(self) -> typing.Generator[EntityType, None, None]:
-        return self.session.query(self.entity_type).all()
+    def all(self) -> typing.List[EntityType]:
+        items = self.session.query(self.entity_type).all()
+        if self.identity_map is None:
+            return items
+        return [
+            self.identity_map.setdefault(
+                self.identity_scope(), self.entity_type, self._identity(item), item
+            )
+            for item in items
+        ]
 
     def delete(self, item: EntityType, /) -> EntityType:
         self.session.delete(item)
+        if self.identity_map is not None:
+            self.identity_map.discard(
+                self.identity_scope(), self.entity_type, self._identity(item)
+            )
         return item
 
+    def delete_many(
+        self, items: typing.Collection[EntityType], /
+    ) -> typing.Collection[EntityType]:
+        if not items:
+            return items
+        keys = [self._identity(item) for item in items]
+        # one DELETE ... WHERE pk IN (...) rather than a statement per item
+        self.session.query(self.entity_type).filter(self._has_key(keys)).delete(
+            synchronize_session=False
+        )
+        # the session is not synchronized, so drop the deleted objects it has loaded
+        for instance in self._loaded(keys):
+            self.session.expunge(instance)
+        if self.identity_map is not None:
+            for key in keys:
+                self.identity_map.discard(self.identity_scope(), self.entity_type, key)
+        return items
+
     def delete_all(self) -> None:
         self.session.query(self.entity_type).delete(synchronize_session=False)
+        if self.identity_map is not None:
+            self.identity_map.discard_all(self.identity_scope(), self.entity_type)
 
     def get(self, item_id: typing.Any, /) -> EntityType:
-        return self.session.query(self.entity_type).get(item_id)
+        if self.identity_map is None:
+            return self.session.query(self.entity_type).get(item_id)
+        return self.identity_map.get_or_load(
+            self.identity_scope(),
+            self.entity_type,
+            item_id,
+            lambda: self.session.query(self.entity_type).get(item_id),
+        )
+
+    def identity_scope(self) -> typing.Hashable:
+        # repositories on the same session read and write the same rows
+        return self.session
 
     @property
     @abc.abstractmethod
@@ -50,12 +98,22 @@ class SqlAlchemyRepository(
     def open(self) -> SqlAlchemyRepository[EntityType]:
         return self
 
+    def reset(self) -> bool:
+        if not self.recyclable or not self.session.is_active:
+            return False
+        # the session is reused, so drop the objects loaded by the last transaction
+        self.session.expunge_all()
+        return True
+
     def rollback(self) -> None:
         self.session.rollback()
 
     def save(self) -> None:
         self.session.commit()
 
+    def savepoint(self) -> typing.ContextManager[typing.Any]:
+        return self.session.begin_nested()
+
     @property
     def session(self) -> orm.Session:
         return self._session
@@ -65,11 +123,94 @@ class SqlAlchemyRepository(
     ) -> typing.Collection[EntityType]:
         self.session.query(self.entity_type).delete()
         self.session.bulk_save_objects(items)
+        if self.identity_map is not None:
+            self.identity_map.discard_all(self.identity_scope(), self.entity_type)
         return items
 
     def update(self, item: EntityType, /) -> EntityType:
         self.session.merge(item)
+        if self.identity_map is not None:
+            # the merged copy held by the session is the one a later get should see
+            self.identity_map.discard(
+                self.identity_scope(), self.entity_type, self._identity(item)
+            )
         return item
 
+    def update_many(
+        self, items: typing.Collection[EntityType], /
+    ) -> typing.Collection[EntityType]:
+        if not items:
+            return items
+        from sqlalchemy import orm
+
+        mapper = orm.class_mapper(self.entity_type)
+        keys = [self._identity(item) for item in items]
+        # like update, which merges, rows that do not exist yet are inserted
+        existing = {
+            row[0] if len(row) == 1 else tuple(row)
+            for row in self.session.query(*mapper.primary_key).filter(
+                self._has_key(keys)
+            )
+        }
+        updates: typing.List[typing.Dict[str, typing.Any]] = []
+        inserts: typing.List[typing.Dict[str, typing.Any]] = []
+        for key, item in zip(keys, items):
+            (updates if key in existing else inserts).append(
+                {attr.key: getattr(item, attr.key) for attr in mapper.column_attrs}
+            )
+        if updates:
+            self.session.bulk_update_mappings(mapper, updates)
+        if inserts:
+            self.session.bulk_insert_mappings(mapper, inserts)
+        # the bulk statements bypass the objects the session has loaded, so reload them on next access
+        for instance in self._loaded(keys):
+            self.session.expire(instance)
+        if self.identity_map is not None:
+            for key in keys:
+                self.identity_map.discard(self.identity_scope(), self.entity_type, key)
+        return items
+
     def where(self, predicate: typing.Any, /) -> typing.List[EntityType]:
         return self.session.query(self.entity_type).filter(predicate).all()
+
+    def _has_key(self, keys: typing.Collection[typing.Any], /) -> typing.Any:
+        """Filter for the rows with the given keys, as returned by _identity"""
+        import sqlalchemy as sa
+        from sqlalchemy import orm
+
+        mapper = orm.class_mapper(self.entity_type)
+        primary_key = mapper.primary_key
+        if len(primary_key) == 1:
+            return primary_key[0].in_(keys)
+        if self.session.get_bind(mapper).dialect.name != "sqlite":
+            return sa.tuple_(*primary_key).in_(keys)
+        # SQLite cannot compare tuples with IN
+        return sa.or_(
+            *(
+                sa.and_(*(column == value for column, value in zip(primary_key, key)))
+                for key in keys
+            )
+        )
+
+    def _loaded(self, keys: typing.Iterable[typing.Any], /) -> typing.List[EntityType]:
+        """The objects with the given keys that the session has loaded"""
+        from sqlalchemy import orm
+
+        mapper = orm.class_mapper(self.entity_type)
+        loaded = (
+            self.session.identity_map.get(
+                mapper.identity_key_from_primary_key(
+                    list(key) if len(mapper.primary_key) > 1 else [key]
+                )
+            )
+            for key in keys
+        )
+        return [instance for instance in loaded if instance is not None]
+
+    @staticmethod
+    def _identity(item: EntityType, /) -> typing.Any:
+        # the key get() is called with: the primary key value, or a tuple of them for composite keys
+        from sqlalchemy import orm
+
+        key = tuple(orm.object_mapper(item).primary_key_from_instance(item))
+        return key[0] if len(key) == 1 else key
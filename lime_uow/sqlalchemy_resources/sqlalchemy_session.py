@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import contextlib
 import typing
 
-from sqlalchemy import orm
+from lime_uow import exceptions, replica_router
 
-from lime_uow import exceptions
+if typing.TYPE_CHECKING:
+    from sqlalchemy import orm
 
 
 __all__ = ("SqlAlchemySession",)
@@ -12,23 +14,76 @@ __all__ = ("SqlAlchemySession",)
 from lime_uow.resources import resource
 
 
-class SqlAlchemySession(resource.Resource[orm.Session]):
-    def __init__(self, session_factory: orm.sessionmaker, /):
+class SqlAlchemySession(resource.Resource["orm.Session"]):
+    """Session from session_factory, or from one of the replicas of a ReplicaRouter of sessionmakers
+
+    A read_only session raises ReadOnlyConnection as soon as an object is added to it, when a flush
+    would write changes to loaded objects, and on commit.  Any session does the same inside
+    reject_writes(), which units of work enter for read_only() transactions.
+    """
+
+    # set to True in a subclass to have units of work reuse the session between transactions when it
+    # is a per-transaction resource
+    recyclable: typing.ClassVar[bool] = False
+
+    def __init__(
+        self,
+        session_factory: typing.Union[
+            orm.sessionmaker, replica_router.ReplicaRouter[orm.sessionmaker]
+        ],
+        /,
+        *,
+        read_only: bool = False,
+    ):
         self._session_factory = session_factory
+        self._read_only = read_only
         self._session: typing.Optional[orm.Session] = None
+        self._replica: typing.Optional[orm.sessionmaker] = None
 
     @classmethod
     def interface(cls) -> typing.Type[SqlAlchemySession]:
         return cls
 
     def open(self) -> orm.Session:
-        self._session = self._session_factory()
+        if self._session is None:
+            if isinstance(self._session_factory, replica_router.ReplicaRouter):
+                self._replica = self._session_factory.acquire()
+                self._session = self._replica()
+            else:
+                self._session = self._session_factory()
+            if self._read_only:
+                _guard_writes(self._session)
+                self._session.info[_READ_ONLY] = True
         return self._session
 
     def close(self) -> None:
         if self._session:
             self._session.close()
             self._session = None
+        self._release_replica()
+
+    @contextlib.contextmanager
+    def reject_writes(self) -> typing.Iterator[None]:
+        session = self.open()
+        _guard_writes(session)
+        previous = session.info.get(_READ_ONLY, False)
+        session.info[_READ_ONLY] = True
+        try:
+            yield
+        finally:
+            session.info[_READ_ONLY] = previous
+
+    def reset(self) -> bool:
+        if not self.recyclable:
+            return False
+        if self._replica is not None:
+            # release the replica, so the router can spread the next transaction's session
+            self.close()
+        elif self._session is not None:
+            if not self._session.is_active:
+                return False
+            self._session.expunge_all()
+        return True
 
     def rollback(self) -> None:
         if self._session is None:
@@ -39,5 +94,61 @@ class SqlAlchemySession(resource.Resource[orm.Session]):
             self._session.rollback()
 
     def save(self) -> None:
+        if self._read_only:
+            raise exceptions.ReadOnlyConnection(
+                "Attempted to call save() on a read-only session."
+            )
         if self._session:
             self._session.commit()
+
+    def savepoint(self) -> typing.ContextManager[typing.Any]:
+        if self._session is None:
+            raise exceptions.ResourceClosed()
+        return self._session.begin_nested()
+
+    def _release_replica(self) -> None:
+        if self._replica is not None:
+            typing.cast(
+                "replica_router.ReplicaRouter[orm.sessionmaker]", self._session_factory
+            ).release(self._replica)
+            self._replica = None
+
+
+# session.info keys: whether the session currently rejects writes, and whether its listeners are installed
+_READ_ONLY = "lime_uow.read_only"
+_GUARDED = "lime_uow.guarded"
+
+
+def _guard_writes(session: orm.Session, /) -> None:
+    """Install the listeners that reject writes while session.info[_READ_ONLY] is set"""
+    import sqlalchemy as sa
+
+    if session.info.get(_GUARDED):
+        return
+
+    def before_attach(session: orm.Session, instance: typing.Any) -> None:
+        if session.info.get(_READ_ONLY):
+            raise exceptions.ReadOnlyConnection(
+                f"Attempted to add {instance!r} to a read-only session."
+            )
+
+    def before_flush(
+        session: orm.Session, flush_context: typing.Any, instances: typing.Any
+    ) -> None:
+        if session.info.get(_READ_ONLY) and (
+            session.new or session.dirty or session.deleted
+        ):
+            raise exceptions.ReadOnlyConnection(
+                "Attempted to flush changes from a read-only session."
+            )
+
+    def before_commit(session: orm.Session) -> None:
+        if session.info.get(_READ_ONLY):
+            raise exceptions.ReadOnlyConnection(
+                "Attempted to commit a read-only session."
+            )
+
+    sa.event.listen(session, "before_attach", before_attach)
+    sa.event.listen(session, "before_flush", before_flush)
+    sa.event.listen(session, "before_commit", before_commit)
+    session.info[_GUARDED] = True
@@ -2,27 +2,40 @@ from __future__ import annotations
 
 import typing
 
-import sqlalchemy as sa
-
 from lime_uow.resources.resource import Resource
 
+if typing.TYPE_CHECKING:
+    import sqlalchemy as sa
+
 __all__ = ("SqlAlchemyTransaction",)
 
 
-class SqlAlchemyTransaction(Resource[sa.engine.Transaction]):
+class SqlAlchemyTransaction(Resource["sa.engine.Transaction"]):
     def __init__(self, /, engine: sa.engine.Engine):
         self._engine = engine
+        self._connection: typing.Optional[sa.engine.Connection] = None
         self._transaction: typing.Optional[sa.engine.Transaction] = None
 
+    @property
+    def connection(self) -> sa.engine.Connection:
+        """The connection the transaction runs on, for executing statements in it"""
+        self.open()
+        return typing.cast("sa.engine.Connection", self._connection)
+
     def open(self) -> sa.engine.Transaction:
         if self._transaction is None:
-            self._transaction = self._engine.begin()
+            # Engine.begin() only returns a context manager, so keep the connection to run savepoints on
+            self._connection = self._engine.connect()
+            self._transaction = self._connection.begin()
         return self._transaction
 
     def close(self) -> None:
         if self._transaction is not None:
             self._transaction.close()
             self._transaction = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
 
     @classmethod
     def interface(cls) -> typing.Type[SqlAlchemyTransaction]:
@@ -31,7 +44,13 @@ class SqlAlchemyTransaction(Resource[sa.engine.Transaction]):
     def rollback(self) -> None:
         if self._transaction is not None:
             self._transaction.rollback()
+            # release the connection; the next open() starts a new transaction
+            self.close()
 
     def save(self) -> None:
         if self._transaction is not None:
             self._transaction.commit()
+            self.close()
+
+    def savepoint(self) -> typing.ContextManager[typing.Any]:
+        return self.connection.begin_nested()
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import collections
+import dataclasses
+import json
+import os
+import threading
+import typing
+
+from lime_uow import instrumentation
+
+__all__ = (
+    "InMemorySpan",
+    "InMemoryTracer",
+    "OpenTelemetryTracer",
+    "Span",
+    "Tracer",
+    "TracingListener",
+)
+
+
+class Span(typing.Protocol):
+    """The subset of the OpenTelemetry Span API used by TracingListener"""
+
+    def set_attribute(self, key: str, value: typing.Any) -> None:
+        ...
+
+    def record_exception(self, exception: BaseException) -> None:
+        ...
+
+    def end(self, end_time: typing.Optional[int] = None) -> None:
+        ...
+
+
+class Tracer(typing.Protocol):
+    def start_span(
+        self,
+        name: str,
+        *,
+        parent: typing.Optional[Span] = None,
+        start_time: typing.Optional[int] = None,
+        attributes: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+    ) -> Span:
+        ...
+
+
+@dataclasses.dataclass
+class InMemorySpan:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: typing.Optional[str]
+    start_time: int
+    end_time: typing.Optional[int] = None
+    attributes: typing.Dict[str, typing.Any] = dataclasses.field(default_factory=dict)
+    exceptions: typing.List[str] = dataclasses.field(default_factory=list)
+    _tracer: typing.Optional[InMemoryTracer] = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+
+    def set_attribute(self, key: str, value: typing.Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.exceptions.append(repr(exception))
+
+    def end(self, end_time: typing.Optional[int] = None) -> None:
+        self.end_time = end_time if end_time is not None else self.start_time
+        if self._tracer is not None:
+            self._tracer.export(self)
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "attributes": {k: _jsonable(v) for k, v in self.attributes.items()},
+            "exceptions": self.exceptions,
+        }
+
+
+class InMemoryTracer:
+    """Tracer that keeps finished spans in a list, mainly for tests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: typing.List[InMemorySpan] = []
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def export(self, span: InMemorySpan, /) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        parent: typing.Optional[Span] = None,
+        start_time: typing.Optional[int] = None,
+        attributes: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+    ) -> InMemorySpan:
+        parent_span = typing.cast(typing.Optional[InMemorySpan], parent)
+        return InMemorySpan(
+            name=name,
+            trace_id=parent_span.trace_id if parent_span else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent_span.span_id if parent_span else None,
+            start_time=start_time or 0,
+            attributes=dict(attributes or {}),
+            _tracer=self,
+        )
+
+    def to_json(self) -> str:
+        with self._lock:
+            return json.dumps([span.to_dict() for span in self.spans])
+
+
+class OpenTelemetryTracer:
+    """Adapts an opentelemetry.trace.Tracer to the Tracer protocol"""
+
+    def __init__(self, tracer: typing.Any, /):
+        from opentelemetry import trace
+
+        self._tracer = tracer
+        self._set_span_in_context = trace.set_span_in_context
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        parent: typing.Optional[Span] = None,
+        start_time: typing.Optional[int] = None,
+        attributes: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+    ) -> Span:
+        context = None if parent is None else self._set_span_in_context(parent)
+        return self._tracer.start_span(
+            name,
+            context=context,
+            start_time=start_time,
+            attributes={k: _jsonable(v) for k, v in (attributes or {}).items()},
+        )
+
+
+class TracingListener:
+    """Instrumentation listener that turns each transaction into a tree of spans
+
+    The root span covers __enter__ to __exit__, with a child span for each resource open, save and
+    rollback, and for each SQL statement executed through an instrumented engine or cursor.  The spans
+    are created once the transaction exits, using the recorded start times.
+    """
+
+    _CHILD_ACTIONS = frozenset(("open", "save", "rollback", "execute"))
+
+    # the most opens kept while a thread is outside a transaction
+    _MAX_PENDING = 64
+
+    def __init__(self, tracer: Tracer, /):
+        self._tracer = tracer
+        self._local = threading.local()
+
+    def __call__(self, event: instrumentation.Event, /) -> None:
+        events: typing.Optional[typing.List[instrumentation.Event]] = getattr(
+            self._local, "events", None
+        )
+        if event.action == "enter":
+            # the resources opened while entering were reported before the enter event itself
+            pending = self._local.__dict__.pop("pending", ())
+            if events is not None:
+                pending = events
+            self._local.events = [e for e in pending if e.started_at >= event.started_at]
+            self._local.events.append(event)
+        elif events is None:
+            # outside a transaction, only opens can belong to the next one; anything else, such as
+            # statements run outside any unit of work, is dropped
+            if event.action == "open":
+                self._local.__dict__.setdefault(
+                    "pending", collections.deque(maxlen=self._MAX_PENDING)
+                ).append(event)
+        elif event.action == "exit":
+            if enter := next((e for e in events if e.action == "enter"), None):
+                self._export(enter=enter, exit=event, events=events)
+            self._local.events = None
+        else:
+            events.append(event)
+
+    def _export(
+        self,
+        *,
+        enter: instrumentation.Event,
+        exit: instrumentation.Event,
+        events: typing.List[instrumentation.Event],
+    ) -> None:
+        root = self._tracer.start_span(
+            enter.source,
+            start_time=_ns(enter.started_at),
+            attributes={
+                "lime_uow.get_count": sum(1 for e in events if e.action == "get")
+            },
+        )
+        for event in events:
+            if event.action in self._CHILD_ACTIONS:
+                name: str = event.action
+                if event.resource_name:
+                    name = f"{event.action} {event.resource_name}"
+                child = self._tracer.start_span(
+                    name,
+                    parent=root,
+                    start_time=_ns(event.started_at),
+                    attributes=event.attributes,
+                )
+                if event.error is not None:
+                    child.record_exception(event.error)
+                child.end(_ns(event.started_at + event.duration))
+        if exit.error is not None:
+            root.record_exception(exit.error)
+        root.end(_ns(exit.started_at + exit.duration))
+
+
+def _jsonable(value: typing.Any, /) -> typing.Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _ns(seconds: float, /) -> int:
+    return int(seconds * 1_000_000_000)
@@ -1,9 +1,23 @@
 from __future__ import annotations
 
 import abc
+import contextlib
+import logging
+import threading
+import time
 import typing
 
-from lime_uow import exceptions, resources, shared_resource_manager
+from lime_uow import (
+    exceptions,
+    identity_map,
+    instrumentation,
+    resources,
+    retry,
+    shared_resource_manager,
+)
+
+if typing.TYPE_CHECKING:
+    from lime_uow import slow_transaction_log, tracing
 
 __all__ = (
     "PlaceholderUnitOfWork",
@@ -13,45 +27,86 @@ __all__ = (
 
 from lime_uow.resources import resource
 
+logger = logging.getLogger(__name__)
+
 # noinspection PyTypeChecker
 T = typing.TypeVar("T", bound="UnitOfWork")
+R = typing.TypeVar("R")
 
 
 class UnitOfWork(abc.ABC):
     def __init__(self):
         self.__resources: typing.Optional[
-            typing.Dict[str, resources.Resource[typing.Any]]
+            typing.Dict[
+                typing.Type[resources.Resource[typing.Any]],
+                resources.Resource[typing.Any],
+            ]
+        ] = None
+        # handles returned by get() during the current transaction
+        self.__handles: typing.Optional[
+            typing.Dict[typing.Type[resources.Resource[typing.Any]], typing.Any]
         ] = None
         self.__resources_validated = False
         self.__shared_resource_manager: typing.Optional[
             shared_resource_manager.SharedResources
         ] = None
+        self.__read_only_shared_resource_manager: typing.Optional[
+            shared_resource_manager.SharedResources
+        ] = None
+        self.__read_only = False
+        # the Resource.reject_writes scopes entered by the current read-only transaction, by resource id
+        self.__write_guards: typing.Optional[contextlib.ExitStack] = None
+        self.__guarded: typing.Dict[int, resources.Resource[typing.Any]] = {}
+        # the savepoint() scopes of the current transaction, outermost first, each with the ids of the
+        # resources that have a savepoint in it
+        self.__savepoints: typing.List[typing.Tuple[contextlib.ExitStack, typing.Set[int]]] = []
+        # resource sets whose reset() succeeded, by read-only mode, with the generation of the
+        # SharedResources they were created from; a set is either here or in use, never both
+        self.__free_resources: typing.Dict[
+            bool,
+            typing.List[
+                typing.Tuple[
+                    int,
+                    typing.Dict[
+                        typing.Type[resources.Resource[typing.Any]],
+                        resources.Resource[typing.Any],
+                    ],
+                ]
+            ],
+        ] = {False: [], True: []}
+        self.__free_resources_lock = threading.Lock()
+        self.__generation = 0
+        self.__identity_map = identity_map.IdentityMap()
+        # shared with the SharedResources created by this UnitOfWork
+        self.__listeners: typing.List[instrumentation.Listener] = []
 
     def __enter__(self: T) -> T:
-        if self.__shared_resource_manager is None:
-            shared_resources = self.create_shared_resources()
-            self.__shared_resource_manager = shared_resource_manager.SharedResources(*shared_resources)
-        fresh_resources = self.create_resources(self.__shared_resource_manager)
-        resources.check_for_ambiguous_implementations(fresh_resources)
-        self.__resources = {
-            resource.interface().__name__: resource for resource in fresh_resources
-        }
-        self.__resources_validated = True
-        return self
+        return instrumentation.call(
+            self.__listeners,
+            self.__begin,
+            action="enter",
+            source=self.__class__.__name__,
+        )
 
     def __exit__(self, *args):
-        errors: typing.List[exceptions.RollbackError] = []
-        try:
-            self.rollback()
-        except exceptions.RollbackErrors as e:
-            errors += e.rollback_errors
-        self.__resources = None
-        if errors:
-            raise exceptions.RollbackErrors(*errors)
+        instrumentation.call(
+            self.__listeners,
+            self.__end,
+            action="exit",
+            source=self.__class__.__name__,
+        )
+
+    def add_listener(self, listener: instrumentation.Listener, /) -> None:
+        """Report each enter, get, open, save, rollback, close, exit and retry event to listener"""
+        self.__listeners.append(listener)
 
     def close(self) -> None:
-        if self.__shared_resource_manager:
-            self.__shared_resource_manager.close()
+        try:
+            if self.__shared_resource_manager:
+                self.__shared_resource_manager.close()
+        finally:
+            if self.__read_only_shared_resource_manager:
+                self.__read_only_shared_resource_manager.close()
 
     def exists(
         self, /, resource_type: typing.Type[resource.Resource[typing.Any]]
@@ -59,23 +114,23 @@ class UnitOfWork(abc.ABC):
         if self.__resources is None:
             raise exceptions.OutsideTransactionError()
         else:
-            return resource_type.__name__ in self.__resources.keys()
+            return resource_type in self.__resources
 
     def get(self, resource_type: typing.Type[resources.Resource[T]]) -> T:
-        if self.__resources is None:
-            raise exceptions.OutsideTransactionError()
-        else:
-            if self.__shared_resource_manager is None:
-                raise exceptions.OutsideTransactionError()
-            elif self.__shared_resource_manager.exists(resource_type):
-                return self.__shared_resource_manager.get(resource_type)
-            elif (interface_name := resource_type.__name__) in self.__resources.keys():
-                return self.__resources[interface_name].open()
-            else:
-                raise exceptions.MissingResourceError(
-                    resource_name=interface_name,
-                    available_resources=self.__resources.keys(),
-                )
+        if self.__listeners:
+            return instrumentation.call(
+                self.__listeners,
+                lambda: self.__get(resource_type),
+                action="get",
+                source=self.__class__.__name__,
+                resource_name=resource_type.__name__,
+            )
+        return self.__get(resource_type)
+
+    @property
+    def identity_map(self) -> identity_map.IdentityMap:
+        """Entities loaded by the repositories of the current transaction, shared between them"""
+        return self.__identity_map
 
     @abc.abstractmethod
     def create_resources(
@@ -83,40 +138,447 @@ class UnitOfWork(abc.ABC):
     ) -> typing.Iterable[resources.Resource[typing.Any]]:
         raise NotImplementedError
 
+    def create_read_only_resources(
+        self, /, shared_resources: shared_resource_manager.SharedResources
+    ) -> typing.Iterable[resources.Resource[typing.Any]]:
+        """The resources of a read_only() transaction, e.g. read-only sessions; create_resources by default
+
+        Either way, the repositories get() returns in a read-only transaction raise ReadOnlyConnection on writes.
+        """
+        return self.create_resources(shared_resources)
+
+    def create_read_only_shared_resources(
+        self,
+    ) -> typing.Optional[typing.Iterable[resources.Resource[typing.Any]]]:
+        """The shared resources of read_only() transactions, e.g. connections to replicas
+
+        Return None (the default) to use the same shared resources as read-write transactions.
+        """
+        return None
+
     @abc.abstractmethod
     def create_shared_resources(self) -> typing.Iterable[resources.Resource[typing.Any]]:
         raise NotImplementedError
 
+    def expiry_policies(
+        self,
+    ) -> typing.Mapping[
+        typing.Type[resources.Resource[typing.Any]], shared_resource_manager.ExpiryPolicy
+    ]:
+        """How long each shared resource may be kept open; expired ones are reopened when a transaction begins
+
+        None are given by default, so shared resources stay open until close().
+        """
+        return {}
+
+    @property
+    def is_read_only(self) -> bool:
+        return self.__read_only
+
+    def log_slow_transactions(
+        self,
+        threshold: float,
+        sink: typing.Optional[slow_transaction_log.SlowTransactionSink] = None,
+    ) -> slow_transaction_log.SlowTransactionLog:
+        """Report transactions that take longer than threshold seconds to sink (logged by default)"""
+        from lime_uow import slow_transaction_log
+
+        listener = slow_transaction_log.SlowTransactionLog(threshold, sink)
+        self.add_listener(listener)
+        return listener
+
+    @contextlib.contextmanager
+    def read_only(self: T) -> typing.Iterator[T]:
+        """Run a transaction that can only read
+
+        The transaction uses create_read_only_resources and create_read_only_shared_resources.  The write
+        methods of the repositories returned by get(), and save(), raise ReadOnlyConnection, and the resources
+        used are kept in their Resource.reject_writes scope, so raw sessions and connections reject writes
+        too.  On exit only the resources that were actually used are rolled back.
+        """
+        if self.__resources is not None:
+            raise exceptions.LimeUoWException(
+                "A read-only transaction cannot be started inside another transaction."
+            )
+        self.__read_only = True
+        try:
+            with self:
+                yield self
+        finally:
+            self.__read_only = False
+
+    def remove_listener(self, listener: instrumentation.Listener, /) -> None:
+        self.__listeners.remove(listener)
+
     def rollback(self):
-        errors: typing.List[exceptions.RollbackError] = []
         if self.__resources is None:
             raise exceptions.OutsideTransactionError()
         else:
-            for resource in self.__resources.values():
-                try:
-                    resource.rollback()
-                except Exception as e:
-                    errors.append(
-                        exceptions.RollbackError(
-                            f"An error occurred while rolling back {self.__class__.__name__}: {e}",
-                        )
-                    )
+            self.__identity_map.clear()
+            self.__rollback(
+                [
+                    *self.__resources.values(),
+                    *self.__get_shared_resource_manager().enlisted(),
+                ]
+            )
 
-        if errors:
-            raise exceptions.RollbackErrors(*errors)
+    def run(
+        self: T,
+        fn: typing.Callable[..., R],
+        /,
+        *args: typing.Any,
+        retry_policy: typing.Optional[retry.RetryPolicy] = None,
+        **kwargs: typing.Any,
+    ) -> R:
+        """Call fn(uow, *args, **kwargs) in a new transaction and save it, retrying transient failures
+
+        When fn or save() raises an error the policy considers retryable, the transaction is rolled back
+        and run again from the start, after a jittered exponential backoff.  Each retry is reported to
+        listeners as a "retry" event.  fn should not have side effects outside the unit of work.
+        """
+        policy = retry_policy or retry.RetryPolicy()
+        started = policy.clock()
+        attempt = 1
+        while True:
+            try:
+                with self:
+                    result = fn(self, *args, **kwargs)
+                    self.save()
+                    return result
+            except Exception as e:
+                if attempt >= policy.max_attempts or not policy.retryable(e):
+                    raise
+                delay = policy.delay(attempt)
+                if (
+                    policy.deadline is not None
+                    and policy.clock() + delay - started > policy.deadline
+                ):
+                    raise
+                if self.__listeners:
+                    instrumentation.notify(
+                        self.__listeners,
+                        instrumentation.Event(
+                            action="retry",
+                            source=self.__class__.__name__,
+                            resource_name=None,
+                            started_at=time.time(),
+                            duration=delay,
+                            error=e,
+                            attributes={"attempt": attempt},
+                        ),
+                    )
+                policy.sleep(delay)
+                attempt += 1
 
     def save(self):
+        if self.__read_only:
+            raise exceptions.ReadOnlyConnection(
+                f"Attempted to save a read-only {self.__class__.__name__}."
+            )
         # noinspection PyBroadException
         try:
             if self.__resources is None:
                 raise exceptions.OutsideTransactionError()
             else:
-                for resource in self.__resources.values():
-                    resource.save()
+                for resource in [
+                    *self.__resources.values(),
+                    *self.__get_shared_resource_manager().enlisted(),
+                ]:
+                    instrumentation.call(
+                        self.__listeners,
+                        resource.save,
+                        action="save",
+                        source=self.__class__.__name__,
+                        resource_name=resource.interface().__name__,
+                    )
         except:
             self.rollback()
             raise
 
+    @contextlib.contextmanager
+    def savepoint(self) -> typing.Iterator[None]:
+        """Nested scope that rolls back only its own changes if it raises
+
+        The exception is re-raised, and work done before the savepoint stays pending until save() or
+        rollback().  Savepoints are taken on the resources already in use, including the enlisted shared
+        resources, and on the ones first used inside the block as they are opened; resources without
+        savepoint support are left as they are.
+        """
+        if self.__resources is None or self.__handles is None:
+            raise exceptions.OutsideTransactionError()
+        with contextlib.ExitStack() as stack:
+            scope: typing.Tuple[contextlib.ExitStack, typing.Set[int]] = (stack, set())
+            self.__savepoints.append(scope)
+            stack.callback(self.__savepoints.remove, scope)
+            self.__enter_savepoints(
+                [
+                    *(
+                        resource
+                        for interface, resource in self.__resources.items()
+                        if interface in self.__handles
+                    ),
+                    *self.__get_shared_resource_manager().enlisted(),
+                ]
+            )
+            try:
+                yield
+            except BaseException:
+                # entities changed inside the savepoint may be mapped with their rolled back state
+                self.__identity_map.clear()
+                raise
+
+    def supports_savepoints(self) -> bool:
+        """Can every resource of the current transaction roll back just the changes made in a savepoint?
+
+        Resources that keep the default Resource.savepoint, which does nothing, cannot.
+        """
+        if self.__resources is None:
+            raise exceptions.OutsideTransactionError()
+        return all(
+            type(resource).savepoint is not resources.Resource.savepoint
+            for resource in self.__resources.values()
+        )
+
+    def trace(self, tracer: tracing.Tracer, /) -> tracing.TracingListener:
+        """Record a span for each transaction, with child spans for resource opens, saves and rollbacks"""
+        from lime_uow import tracing
+
+        listener = tracing.TracingListener(tracer)
+        self.add_listener(listener)
+        return listener
+
+    def warmup(self) -> typing.Dict[typing.Type[resources.Resource[typing.Any]], float]:
+        """Open the shared resources now rather than on first use, and return how long each took to open"""
+        return self.__get_shared_resource_manager().warmup()
+
+    def __begin(self: T) -> T:
+        if self.__resources is not None:
+            raise exceptions.LimeUoWException(
+                f"{self.__class__.__name__} is already in a transaction."
+            )
+        shared_resources = self.__get_shared_resource_manager()
+        # between transactions, so no handle that is closed is still in use
+        shared_resources.evict_expired()
+        if (recycled := self.__take_free_resources(shared_resources)) is not None:
+            self.__resources = recycled
+        else:
+            if self.__read_only:
+                fresh_resources = self.create_read_only_resources(shared_resources)
+            else:
+                fresh_resources = self.create_resources(shared_resources)
+            resources.check_for_ambiguous_implementations(fresh_resources)
+            self.__resources = {
+                resource.interface(): resource for resource in fresh_resources
+            }
+        self.__generation = shared_resources.generation
+        self.__identity_map.clear()
+        for resource in self.__resources.values():
+            if isinstance(resource, resources.Repository):
+                resource.identity_map = self.__identity_map
+        self.__handles = {}
+        self.__resources_validated = True
+        if self.__read_only:
+            self.__write_guards = contextlib.ExitStack()
+            # the shared resources opened by create_resources back the resources created with them
+            self.__reject_writes(shared_resources.opened())
+        return self
+
+    def __end(self) -> None:
+        errors: typing.List[exceptions.RollbackError] = []
+        try:
+            if self.__read_only:
+                # there is nothing to undo, only open transactions to release
+                assert self.__resources is not None and self.__handles is not None
+                self.__rollback(
+                    resource
+                    for interface, resource in self.__resources.items()
+                    if interface in self.__handles
+                )
+            else:
+                self.rollback()
+        except exceptions.RollbackErrors as e:
+            errors += e.rollback_errors
+        if self.__write_guards is not None:
+            self.__write_guards.close()
+            self.__write_guards = None
+            self.__guarded = {}
+        close_errors: typing.Dict[str, BaseException] = {}
+        if errors or not self.__recycle_resources():
+            close_errors = self.__close_resources()
+        self.__resources = None
+        self.__handles = None
+        if errors:
+            raise exceptions.RollbackErrors(*errors)
+        if close_errors:
+            raise exceptions.CloseErrors(close_errors)
+
+    def __get_shared_resource_manager(self) -> shared_resource_manager.SharedResources:
+        if self.__read_only:
+            if self.__read_only_shared_resource_manager is None:
+                shared_resources = self.create_read_only_shared_resources()
+                if shared_resources is None:
+                    return self.__get_primary_shared_resource_manager()
+                self.__read_only_shared_resource_manager = (
+                    shared_resource_manager.SharedResources(
+                        *shared_resources,
+                        expiry_policies=self.expiry_policies(),
+                        listeners=self.__listeners,
+                    )
+                )
+            return self.__read_only_shared_resource_manager
+        return self.__get_primary_shared_resource_manager()
+
+    def __get_primary_shared_resource_manager(
+        self,
+    ) -> shared_resource_manager.SharedResources:
+        if self.__shared_resource_manager is None:
+            shared_resources = self.create_shared_resources()
+            self.__shared_resource_manager = shared_resource_manager.SharedResources(
+                *shared_resources,
+                expiry_policies=self.expiry_policies(),
+                listeners=self.__listeners,
+            )
+        return self.__shared_resource_manager
+
+    def __get(self, resource_type: typing.Type[resources.Resource[T]]) -> T:
+        handles = self.__handles
+        if handles is None:
+            raise exceptions.OutsideTransactionError()
+        try:
+            return handles[resource_type]
+        except KeyError:
+            handle = self.__open(resource_type)
+            handles[resource_type] = handle
+            return handle
+
+    def __open(self, resource_type: typing.Type[resources.Resource[T]]) -> T:
+        if self.__resources is None:
+            raise exceptions.OutsideTransactionError()
+        elif (shared := self.__get_shared_resource_manager()).exists(resource_type):
+            handle = shared.get(resource_type)
+            if self.__read_only:
+                self.__reject_writes(shared.opened())
+            if self.__savepoints:
+                self.__enter_savepoints(shared.enlisted())
+            return handle
+        elif (resource := self.__resources.get(resource_type)) is not None:
+            handle = instrumentation.call(
+                self.__listeners,
+                resource.open,
+                action="open",
+                source=self.__class__.__name__,
+                resource_name=resource_type.__name__,
+            )
+            if self.__savepoints:
+                self.__enter_savepoints([resource, *shared.enlisted()])
+            if self.__read_only:
+                self.__reject_writes([resource])
+                if isinstance(handle, resources.Repository):
+                    return typing.cast(T, resources.ReadOnlyRepository.wrap(handle))
+            return handle
+        else:
+            raise exceptions.MissingResourceError(
+                resource_name=resource_type.__name__,
+                available_resources=[
+                    interface.__name__ for interface in self.__resources
+                ],
+            )
+
+    def __enter_savepoints(
+        self, rs: typing.Iterable[resources.Resource[typing.Any]], /
+    ) -> None:
+        """Take a savepoint on each resource in every savepoint() scope it does not have one in yet"""
+        rs = list(rs)
+        for stack, covered in self.__savepoints:
+            for resource in rs:
+                if id(resource) not in covered:
+                    covered.add(id(resource))
+                    stack.enter_context(resource.savepoint())
+
+    def __reject_writes(
+        self, rs: typing.Iterable[resources.Resource[typing.Any]], /
+    ) -> None:
+        assert self.__write_guards is not None
+        for resource in rs:
+            if id(resource) not in self.__guarded:
+                self.__guarded[id(resource)] = resource
+                self.__write_guards.enter_context(resource.reject_writes())
+
+    def __rollback(
+        self, rs: typing.Iterable[resources.Resource[typing.Any]], /
+    ) -> None:
+        errors: typing.List[exceptions.RollbackError] = []
+        for resource in rs:
+            try:
+                instrumentation.call(
+                    self.__listeners,
+                    resource.rollback,
+                    action="rollback",
+                    source=self.__class__.__name__,
+                    resource_name=resource.interface().__name__,
+                )
+            except Exception as e:
+                errors.append(
+                    exceptions.RollbackError(
+                        f"An error occurred while rolling back {self.__class__.__name__}: {e}",
+                    )
+                )
+
+        if errors:
+            raise exceptions.RollbackErrors(*errors)
+
+    def __close_resources(self) -> typing.Dict[str, BaseException]:
+        """Close the resources of the ending transaction, which will not be reused, and return the errors"""
+        assert self.__resources is not None
+        errors: typing.Dict[str, BaseException] = {}
+        for interface, resource in self.__resources.items():
+            try:
+                instrumentation.call(
+                    self.__listeners,
+                    resource.close,
+                    action="close",
+                    source=self.__class__.__name__,
+                    resource_name=interface.__name__,
+                )
+            except Exception as e:
+                errors[interface.__name__] = e
+        return errors
+
+    def __recycle_resources(self) -> bool:
+        """Put the resources of the ending transaction on the free list if all of them can be reset
+
+        Returns False if they cannot, in which case they should be closed.
+        """
+        assert self.__resources is not None
+        # noinspection PyBroadException
+        try:
+            if not all(resource.reset() for resource in self.__resources.values()):
+                return False
+        except Exception:
+            logger.exception("Failed to reset the resources of %s.", self.__class__.__name__)
+            return False
+        with self.__free_resources_lock:
+            self.__free_resources[self.__read_only].append(
+                (self.__generation, self.__resources)
+            )
+        return True
+
+    def __take_free_resources(
+        self, shared_resources: shared_resource_manager.SharedResources, /
+    ) -> typing.Optional[
+        typing.Dict[
+            typing.Type[resources.Resource[typing.Any]], resources.Resource[typing.Any]
+        ]
+    ]:
+        with self.__free_resources_lock:
+            free_list = self.__free_resources[self.__read_only]
+            while free_list:
+                generation, recycled = free_list.pop()
+                # resources created before a shared handle was closed may still hold it
+                if generation == shared_resources.generation:
+                    return recycled
+        return None
+
 
 class PlaceholderUnitOfWork(UnitOfWork):
     def __init__(self):
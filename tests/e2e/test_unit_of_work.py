@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import dataclasses
 import typing
 
+import pytest
+import sqlalchemy as sa
 from sqlalchemy import orm
 import lime_uow as lu
 from lime_uow import sqlalchemy_resources as lsa
-from tests.conftest import User, UserRepository
+from tests.conftest import User, UserRepository, user_table
 
 
 class SqlAlchemyUserSession(lsa.SqlAlchemySession):
@@ -59,3 +62,318 @@ def test_unit_of_work_rollback(session_factory: orm.sessionmaker):
     actual = session_factory().query(User).all()
     expected = [User(user_id=1, name="Mark"), User(user_id=2, name="Mandie")]
     assert actual == expected
+
+
+def test_unit_of_work_savepoint_rolls_back_only_the_failed_item(
+    session_factory: orm.sessionmaker,
+):
+    with TestUnitOfWork(session_factory) as uow:
+        repo = uow.get(UserRepository)
+        for user_id, name in [(3, "Terri"), (4, ""), (5, "Steve")]:
+            try:
+                with uow.savepoint():
+                    repo.add(User(user_id=user_id, name=name))
+                    repo.session.flush()
+                    if not name:
+                        raise ValueError("missing name")
+            except ValueError:
+                pass
+        uow.save()
+
+    actual = session_factory().query(User).all()
+    expected = [
+        User(user_id=1, name="Mark"),
+        User(user_id=2, name="Mandie"),
+        User(user_id=3, name="Terri"),
+        User(user_id=5, name="Steve"),
+    ]
+    assert actual == expected
+
+
+def test_sqlalchemy_transaction_savepoint_rolls_back_only_its_block(
+    engine: sa.engine.Engine,
+):
+    transaction = lsa.SqlAlchemyTransaction(engine)
+    transaction.connection.execute(user_table.insert(), {"user_id": 3, "name": "Terri"})
+    with pytest.raises(ValueError):
+        with transaction.savepoint():
+            transaction.connection.execute(
+                user_table.insert(), {"user_id": 4, "name": "Kellen"}
+            )
+            raise ValueError()
+    transaction.save()
+
+    assert engine.execute(sa.select([user_table.c.name])).fetchall() == [("Terri",)]
+
+
+def test_read_only_session_rejects_writes(session_factory: orm.sessionmaker):
+    resource = lsa.SqlAlchemySession(
+        lu.ReplicaRouter(session_factory, strategy="least_loaded"), read_only=True
+    )
+    session = resource.open()
+    assert session.query(User).count() == 2
+    with pytest.raises(lu.exceptions.ReadOnlyConnection):
+        session.add(User(user_id=3, name="Terri"))
+
+    user = session.query(User).get(1)
+    user.name = "Changed"
+    with pytest.raises(lu.exceptions.ReadOnlyConnection):
+        session.flush()
+    with pytest.raises(lu.exceptions.ReadOnlyConnection):
+        resource.save()
+    resource.close()
+
+
+class RecyclableUserRepository(UserRepository):
+    recyclable = True
+
+
+class RecyclingUnitOfWork(lu.UnitOfWork):
+    def __init__(
+        self,
+        session_factory: orm.sessionmaker,
+        repository_type: typing.Type[UserRepository] = RecyclableUserRepository,
+    ):
+        super().__init__()
+        self._session_factory = session_factory
+        self._repository_type = repository_type
+        self.created = 0
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        self.created += 1
+        return [self._repository_type(self._session_factory())]
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return []
+
+
+def test_sqlalchemy_repository_is_recycled_between_transactions(
+    session_factory: orm.sessionmaker,
+):
+    uow = RecyclingUnitOfWork(session_factory)
+    with uow:
+        repo = uow.get(RecyclableUserRepository)
+        repo.get(1)
+        repo.add(User(user_id=3, name="Terri"))
+        uow.save()
+    with uow:
+        assert uow.get(RecyclableUserRepository) is repo
+        assert len(repo.session.identity_map) == 0
+        assert len(repo.all()) == 3
+    assert uow.created == 1
+
+
+def test_sqlalchemy_repository_is_only_recycled_when_it_opts_in(
+    session_factory: orm.sessionmaker,
+):
+    uow = RecyclingUnitOfWork(session_factory, UserRepository)
+    for _ in range(2):
+        with uow:
+            uow.get(UserRepository).get(1)
+    assert uow.created == 2
+
+
+def test_read_only_unit_of_work_rejects_repository_writes(
+    session_factory: orm.sessionmaker,
+):
+    uow = TestUnitOfWork(session_factory)
+    with uow.read_only():
+        repo = uow.get(UserRepository)
+        assert isinstance(repo, UserRepository)
+        assert repo.get(1) == User(1, "Mark")
+        with pytest.raises(lu.exceptions.ReadOnlyConnection):
+            repo.add(User(3, "Terri"))
+        with pytest.raises(lu.exceptions.ReadOnlyConnection):
+            repo.delete(User(1, "Mark"))
+    with uow:
+        assert len(uow.get(UserRepository).all()) == 2
+
+
+def test_read_only_unit_of_work_rejects_writes_to_raw_sessions(
+    session_factory: orm.sessionmaker,
+):
+    uow = TestUnitOfWork(session_factory)
+    with uow.read_only():
+        session = uow.get(SqlAlchemyUserSession)
+        with pytest.raises(lu.exceptions.ReadOnlyConnection):
+            session.add(User(user_id=3, name="Terri"))
+        with pytest.raises(lu.exceptions.ReadOnlyConnection):
+            session.commit()
+    # the guard only lasts as long as the read-only transaction
+    with uow:
+        uow.get(SqlAlchemyUserSession).add(User(user_id=3, name="Terri"))
+        uow.save()
+    with uow:
+        assert len(uow.get(UserRepository).all()) == 3
+
+
+class RecyclableReplicaSession(lsa.SqlAlchemySession):
+    recyclable = True
+
+    @classmethod
+    def interface(cls) -> typing.Type[RecyclableReplicaSession]:
+        return cls
+
+
+class ReplicaUnitOfWork(lu.UnitOfWork):
+    def __init__(self, router: lu.ReplicaRouter[orm.sessionmaker]):
+        super().__init__()
+        self._router = router
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return [RecyclableReplicaSession(self._router)]
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return []
+
+
+def test_per_transaction_session_releases_its_replica_between_transactions(
+    session_factory: orm.sessionmaker,
+):
+    other_factory = orm.sessionmaker(bind=session_factory.kw["bind"])
+    router = lu.ReplicaRouter(session_factory, other_factory, strategy="least_loaded")
+    uow = ReplicaUnitOfWork(router)
+    for _ in range(3):
+        with uow:
+            assert uow.get(RecyclableReplicaSession).query(User).count() == 2
+            assert sum(router.in_use().values()) == 1
+        assert router.in_use() == {session_factory: 0, other_factory: 0}
+
+
+def test_sqlalchemy_repository_uses_the_unit_of_work_identity_map(
+    session_factory: orm.sessionmaker,
+):
+    uow = TestUnitOfWork(session_factory)
+    with uow:
+        repo = uow.get(UserRepository)
+        users = repo.all()
+        assert repo.get(1) is users[0]
+        assert uow.identity_map.hits == 1
+        repo.delete(users[0])
+        assert (repo.session, User, 1) not in uow.identity_map
+        uow.rollback()
+        assert len(uow.identity_map) == 0
+
+
+class OtherUserRepository(UserRepository):
+    @classmethod
+    def interface(cls) -> typing.Type[OtherUserRepository]:
+        return cls
+
+
+class TwoRepositoryUnitOfWork(TestUnitOfWork):
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.AbstractSet[lu.Resource[typing.Any]]:
+        session = shared_resources.get(SqlAlchemyUserSession)
+        return {UserRepository(session), OtherUserRepository(session)}
+
+
+def test_sqlalchemy_repositories_on_one_session_share_identity_map_entries(
+    session_factory: orm.sessionmaker,
+):
+    with TwoRepositoryUnitOfWork(session_factory) as uow:
+        user = uow.get(UserRepository).get(1)
+        assert uow.get(OtherUserRepository).get(1) is user
+        assert uow.identity_map.hits == 1
+
+
+def test_sqlalchemy_repository_bulk_updates_and_deletes(
+    session_factory: orm.sessionmaker,
+):
+    with TestUnitOfWork(session_factory) as uow:
+        repo = uow.get(UserRepository)
+        repo.add_all([User(user_id=3, name="Terri"), User(user_id=4, name="Bill")])
+        repo.update_many([User(user_id=1, name="Steve"), User(user_id=3, name="Sue")])
+        repo.delete_many([User(user_id=2, name="Mandie"), User(user_id=4, name="Bill")])
+        uow.save()
+
+    actual = session_factory().query(User).order_by(User.user_id).all()
+    assert actual == [User(user_id=1, name="Steve"), User(user_id=3, name="Sue")]
+
+
+def test_sqlalchemy_repository_update_many_inserts_missing_rows_like_update(
+    session_factory: orm.sessionmaker,
+):
+    with TestUnitOfWork(session_factory) as uow:
+        repo = uow.get(UserRepository)
+        repo.update_many([User(user_id=1, name="Steve"), User(user_id=3, name="Terri")])
+        repo.update(User(user_id=4, name="Bill"))
+        uow.save()
+
+    actual = session_factory().query(User).order_by(User.user_id).all()
+    assert actual == [
+        User(user_id=1, name="Steve"),
+        User(user_id=2, name="Mandie"),
+        User(user_id=3, name="Terri"),
+        User(user_id=4, name="Bill"),
+    ]
+
+
+def test_sqlalchemy_repository_bulk_writes_refresh_loaded_objects(
+    session_factory: orm.sessionmaker,
+):
+    with TestUnitOfWork(session_factory) as uow:
+        repo = uow.get(UserRepository)
+        mark, mandie = repo.session.query(User).order_by(User.user_id).all()
+        repo.update_many([User(user_id=1, name="Steve")])
+        repo.delete_many([User(user_id=2, name="Mandie")])
+        assert mark.name == "Steve"
+        assert mandie not in repo.session
+        assert repo.session.query(User).get(2) is None
+        uow.save()
+
+
+@dataclasses.dataclass(unsafe_hash=True)
+class Membership:
+    group_id: int
+    user_id: int
+    role: str
+
+
+class MembershipRepository(lsa.SqlAlchemyRepository[Membership]):
+    @property
+    def entity_type(self) -> typing.Type[Membership]:
+        return Membership
+
+    @classmethod
+    def interface(cls) -> typing.Type[MembershipRepository]:
+        return cls
+
+
+def test_sqlalchemy_repository_bulk_writes_with_a_composite_key(
+    engine: sa.engine.Engine,
+):
+    membership_table = sa.Table(
+        "memberships",
+        sa.MetaData(),
+        sa.Column("group_id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, primary_key=True),
+        sa.Column("role", sa.String, nullable=False),
+    )
+    membership_table.create(engine)
+    orm.mapper(Membership, membership_table)
+    try:
+        session = orm.sessionmaker(bind=engine)()
+        repo = MembershipRepository(session)
+        repo.add_all(
+            [
+                Membership(1, 1, "owner"),
+                Membership(1, 2, "member"),
+                Membership(2, 1, "member"),
+            ]
+        )
+        repo.update_many([Membership(1, 2, "owner"), Membership(2, 2, "member")])
+        repo.delete_many([Membership(1, 1, "owner"), Membership(2, 1, "member")])
+        repo.save()
+        assert session.query(Membership).order_by(Membership.group_id).all() == [
+            Membership(1, 2, "owner"),
+            Membership(2, 2, "member"),
+        ]
+        session.close()
+    finally:
+        orm.clear_mappers()
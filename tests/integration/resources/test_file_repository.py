@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import pathlib
+import pickle
+import typing
+
+import pytest
+
+import lime_uow as lu
+from tests.conftest import User
+
+
+class UserFileRepository(lu.FileRepository[User]):
+    def __init__(self, file_path: pathlib.Path):
+        super().__init__(
+            file_path,
+            key_fn=lambda user: user.user_id,
+            initial_values=[User(user_id=1, name="Mark"), User(user_id=2, name="Mandie")],
+            fsync=False,
+        )
+
+    @classmethod
+    def interface(cls) -> typing.Type[UserFileRepository]:
+        return cls
+
+
+@pytest.fixture
+def file_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    return tmp_path / "users.log"
+
+
+def test_file_repository_save_persists_changes(file_path: pathlib.Path):
+    repo = UserFileRepository(file_path)
+    repo.add(User(3, "Terri"))
+    repo.update(User(1, "Steve"))
+    repo.delete(User(2, "Mandie"))
+    repo.save()
+    repo.close()
+
+    reopened = UserFileRepository(file_path)
+    assert reopened.all() == [User(1, "Steve"), User(3, "Terri")]
+    assert reopened.get(3) == User(3, "Terri")
+    reopened.close()
+
+
+def test_file_repository_rollback_truncates_log(file_path: pathlib.Path):
+    repo = UserFileRepository(file_path).open()
+    size = file_path.stat().st_size
+    repo.set_all([User(4, "Kellen")])
+    repo.add(User(5, "Bill"))
+    repo.rollback()
+    assert file_path.stat().st_size == size
+    assert repo.all() == [User(1, "Mark"), User(2, "Mandie")]
+    repo.close()
+
+
+def test_file_repository_replays_committed_tail_without_index(file_path: pathlib.Path):
+    repo = UserFileRepository(file_path)
+    repo.add(User(3, "Terri"))
+    repo.save()
+    repo.add(User(4, "Kellen"))  # never saved
+    repo.handle.flush()
+
+    # simulate a crash: no index is written and the last change was never committed
+    reopened = UserFileRepository(file_path)
+    assert reopened.all() == [User(1, "Mark"), User(2, "Mandie"), User(3, "Terri")]
+    reopened.close()
+
+
+def test_file_repository_compact(file_path: pathlib.Path):
+    repo = UserFileRepository(file_path)
+    for i in range(10):
+        repo.update(User(1, f"Mark {i}"))
+    repo.save()
+    size = file_path.stat().st_size
+    repo.compact()
+    assert file_path.stat().st_size < size
+    assert repo.all() == [User(1, "Mark 9"), User(2, "Mandie")]
+    repo.close()
+
+    reopened = UserFileRepository(file_path)
+    assert reopened.get(1) == User(1, "Mark 9")
+    reopened.close()
+
+
+def test_file_repository_writes_its_index_on_save(file_path: pathlib.Path):
+    repo = UserFileRepository(file_path)
+    repo.add_all([User(3, "Terri"), User(4, "Kellen")])
+    repo.save()
+    with open(file_path.with_name(f"{file_path.name}.idx"), "rb") as fh:
+        _, offset, index = pickle.load(fh)
+    # the index covers the whole log, so reopening does not replay it
+    assert offset == file_path.stat().st_size
+    assert sorted(index) == [1, 2, 3, 4]
+    repo.close()
+
+
+def test_file_repository_set_all_rejects_duplicate_keys_without_clearing(
+    file_path: pathlib.Path,
+):
+    repo = UserFileRepository(file_path)
+    with pytest.raises(lu.exceptions.DuplicateKeyError):
+        repo.set_all([User(3, "Terri"), User(3, "Steve")])
+    assert repo.all() == [User(1, "Mark"), User(2, "Mandie")]
+    repo.close()
+
+
+class FileUOW(lu.UnitOfWork):
+    def __init__(self, file_path: pathlib.Path):
+        super().__init__()
+        self._file_path = file_path
+        self.created = 0
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        self.created += 1
+        return [UserFileRepository(self._file_path)]
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return []
+
+
+def test_file_repository_keeps_its_handle_between_transactions(file_path: pathlib.Path):
+    uow = FileUOW(file_path)
+    for i in range(3, 6):
+        with uow:
+            repo = uow.get(UserFileRepository)
+            repo.add(User(i, f"user {i}"))
+            uow.save()
+    assert uow.created == 1
+    assert len(repo) == 5
+    repo.close()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import typing
+
+import pytest
+
+from lime_uow import pyodbc_resources as lpa
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements: typing.List[str] = []
+        self.fast_executemany = False
+
+    def execute(self, sql: str) -> None:
+        self.statements.append(sql.split(" lime_uow_")[0])
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.cursor_handle = RecordingCursor()
+
+    def cursor(self) -> RecordingCursor:
+        return self.cursor_handle
+
+
+@pytest.mark.parametrize(
+    "syntax, expected",
+    [
+        ("ansi", ["SAVEPOINT", "ROLLBACK TO SAVEPOINT", "SAVEPOINT", "RELEASE SAVEPOINT"]),
+        ("mssql", ["SAVE TRANSACTION", "ROLLBACK TRANSACTION", "SAVE TRANSACTION"]),
+    ],
+)
+def test_pyodbc_cursor_savepoint_runs_on_its_connection(
+    syntax: lpa.SavepointSyntax, expected: typing.List[str]
+):
+    con = RecordingConnection()
+    cursor = lpa.PyodbcCursor(con=con, savepoint_syntax=syntax)  # type: ignore
+    with pytest.raises(ValueError):
+        with cursor.savepoint():
+            raise ValueError()
+    with cursor.savepoint():
+        pass
+    assert con.cursor_handle.statements == expected
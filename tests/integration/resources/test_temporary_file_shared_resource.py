@@ -1,3 +1,5 @@
+import pytest
+
 import lime_uow as lu
 
 
@@ -11,3 +13,109 @@ def test_temporary_file_shared_resource():
         assert file.all() == "test this\ntest again"
         file.clear()
         assert file.all() == ""
+
+
+def test_temporary_file_shared_resource_streaming_readers():
+    with lu.TempFileSharedResource() as file:
+        file.add("line 1\n")
+        file.add("line 2\n")
+        assert list(file.iter_lines()) == ["line 1\n", "line 2\n"]
+        assert b"".join(file.iter_chunks(chunk_size=4)) == b"line 1\nline 2\n"
+        with file.view() as buffer:
+            assert buffer[:6] == b"line 1"
+        file.clear()
+        with file.view() as buffer:
+            assert len(buffer) == 0
+
+
+@pytest.mark.parametrize("compression", [None, "bz2", "gzip", "lzma"])
+def test_temporary_file_shared_resource_add_all(compression):
+    with lu.TempFileSharedResource(buffer_size=16, compression=compression) as file:
+        file.add_all(f"row {i}\n" for i in range(100))
+        file.save()
+        file.add("last row\n")
+        file.save()
+        lines = list(file.iter_lines())
+        assert lines[0] == "row 0\n"
+        assert lines[-1] == "last row\n"
+        assert len(lines) == 101
+        stats = file.write_stats
+        assert stats.records == 101
+        assert stats.bytes_written == sum(len(line) for line in lines)
+        if compression:
+            assert stats.bytes_stored == file.file_path.stat().st_size
+
+
+@pytest.mark.parametrize("compression", ["bz2", "gzip", "lzma"])
+def test_compressed_readers_skip_unsaved_content(compression):
+    with lu.TempFileSharedResource(compression=compression) as file:
+        file.add("saved\n")
+        file.save()
+        file.add("unsaved\n")
+        assert file.all() == "saved\n"
+        file.save()
+        assert file.all() == "saved\nunsaved\n"
+
+
+def test_spooled_temporary_file_shared_resource_stays_in_memory():
+    with lu.SpooledTempFileSharedResource(max_size=1024) as file:
+        file.add_all(["test this\n", "test again"])
+        file.save()
+        assert file.all() == "test this\ntest again"
+        with file.view() as buffer:
+            assert buffer[:4] == b"test"
+        assert not file.is_rolled_over
+
+
+def test_spooled_temporary_file_shared_resource_rolls_over_past_max_size():
+    with lu.SpooledTempFileSharedResource(max_size=16, file_extension="txt") as file:
+        file.add("test this\n")
+        assert not file.is_rolled_over
+        file.add("test again")
+        assert file.is_rolled_over
+        assert file.file_path.exists()
+        assert file.file_path.name.endswith(".txt")
+        assert list(file.iter_lines()) == ["test this\n", "test again"]
+        path = file.file_path
+    assert not path.exists()
+
+
+def test_spooled_temporary_file_shared_resource_file_path_forces_rollover():
+    with lu.SpooledTempFileSharedResource() as file:
+        file.add("test this")
+        assert file.file_path.read_text() == "test this"
+        assert file.is_rolled_over
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_temporary_file_shared_resource_rollback(compression):
+    with lu.TempFileSharedResource(compression=compression) as file:
+        file.add("saved\n")
+        file.save()
+        file.add("discarded\n")
+        file.rollback()
+        file.add("saved again\n")
+        file.save()
+        assert file.all() == "saved\nsaved again\n"
+
+
+def test_temporary_file_shared_resource_reuses_open_handle():
+    file = lu.TempFileSharedResource()
+    handle = file.open()
+    assert file.open() is handle
+    path = file.file_path
+    file.close()
+    file.close()
+    assert not path.exists()
+    assert file.open() is not handle
+    file.close()
+
+
+def test_spooled_temporary_file_shared_resource_rollback():
+    with lu.SpooledTempFileSharedResource(max_size=16) as file:
+        file.add("saved\n")
+        file.save()
+        file.add("discarded past the max size\n")
+        assert file.is_rolled_over
+        file.rollback()
+        assert file.all() == "saved\n"
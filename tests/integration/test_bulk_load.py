@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import orm
+
+import lime_uow as lu
+from lime_uow import sqlalchemy_resources as lsa
+from lime_uow.pyodbc_resources import pyodbc_bulk_load
+from tests.conftest import User, user_table
+
+
+@pytest.fixture
+def staged_users() -> lu.TempFileSharedResource:
+    file = lu.TempFileSharedResource(file_extension="csv")
+    file.add_all(["user_id,name\n", "3,Terri\n", "4,Kellen\n", "5,Bill\n"])
+    file.save()
+    yield file
+    file.close()
+
+
+@pytest.mark.parametrize("multi_row", [False, True])
+def test_sqlalchemy_bulk_load_commits_with_session(
+    session_factory: orm.sessionmaker,
+    staged_users: lu.TempFileSharedResource,
+    multi_row: bool,
+):
+    session = session_factory()
+    stats = lsa.sqlalchemy_bulk_load(
+        session, staged_users, table=user_table, chunk_size=2, multi_row=multi_row
+    )
+    session.commit()
+
+    assert (stats.rows, stats.chunks) == (3, 2)
+    assert session_factory().query(User).order_by(User.user_id).all() == [
+        User(1, "Mark"),
+        User(2, "Mandie"),
+        User(3, "Terri"),
+        User(4, "Kellen"),
+        User(5, "Bill"),
+    ]
+
+
+def test_sqlalchemy_bulk_load_rolls_back_with_session(
+    session_factory: orm.sessionmaker,
+    staged_users: lu.TempFileSharedResource,
+):
+    session = session_factory()
+    lsa.sqlalchemy_bulk_load(session, staged_users, table=user_table)
+    session.rollback()
+
+    assert session_factory().query(User).count() == 2
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def executemany(self, sql, rows):
+        self.statements.append((sql, rows))
+
+
+def test_pyodbc_bulk_load_quotes_identifiers():
+    file = lu.TempFileSharedResource(file_extension="csv")
+    file.add_all(['user_id,"name) VALUES (1); DROP TABLE users; --"\n', "3,Terri\n"])
+    file.save()
+    cursor = RecordingCursor()
+    pyodbc_bulk_load(cursor, file, table_name="dbo.users")
+    file.close()
+
+    assert cursor.statements == [
+        (
+            'INSERT INTO "dbo"."users" ("user_id", "name) VALUES (1); DROP TABLE users; --") '
+            "VALUES (?, ?)",
+            [("3", "Terri")],
+        )
+    ]
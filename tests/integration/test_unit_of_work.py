@@ -116,3 +116,66 @@ def test_unit_of_work_rollback():
         "rollback",
         "rollback",
     ]
+
+
+class StagingUOW(lu.UnitOfWork):
+    def __init__(self, staging_file: lu.TempFileSharedResource):
+        super().__init__()
+        self._staging_file = staging_file
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return []
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return [self._staging_file]
+
+
+def test_unit_of_work_saves_and_rolls_back_transactional_shared_resources():
+    staging_file = lu.TempFileSharedResource()
+    uow = StagingUOW(staging_file)
+    with uow:
+        uow.get(lu.TempFileSharedResource).write(b"saved\n")
+        uow.save()
+    with pytest.raises(ValueError):
+        with uow:
+            uow.get(lu.TempFileSharedResource).write(b"partial")
+            raise ValueError()
+
+    assert staging_file.all() == "saved\n"
+    uow.close()
+
+
+class ReadOnlyTestUOW(TestUOW):
+    def create_read_only_shared_resources(
+        self,
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return [TestSharedResource("replica")]
+
+
+def test_read_only_unit_of_work_uses_read_only_shared_resources():
+    uow = ReadOnlyTestUOW()
+    with uow.read_only():
+        assert uow.is_read_only
+        assert uow.get(TestSharedResource) == "replica"  # type: ignore
+        with pytest.raises(lu.exceptions.ReadOnlyConnection):
+            uow.save()
+    assert not uow.is_read_only
+
+    with uow:
+        assert uow.get(TestSharedResource) == "test"  # type: ignore
+
+
+def test_read_only_unit_of_work_only_releases_resources_it_used():
+    metrics = lu.MetricsCollector()
+    uow = TestUOW()
+    uow.add_listener(metrics)
+    with uow.read_only():
+        pass
+    assert metrics.count("rollback") == 0
+
+    with uow.read_only():
+        r = uow.get(TestResource)  # type: ignore
+    assert metrics.count("rollback") == 1
+    assert r.events == ["rollback"]
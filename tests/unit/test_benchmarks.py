@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import pathlib
+
+from benchmarks import __main__ as benchmarks_main, cases, load
+
+
+def test_benchmarks_run_and_compare_against_baseline(tmp_path: pathlib.Path):
+    output = tmp_path / "results.json"
+    args = ["--scale", "10", "--repeat", "1", "--warmup", "0", "-k", "dummy_repository.*"]
+
+    assert benchmarks_main.main([*args, "--output", str(output)]) == 0
+    results = json.loads(output.read_text())["results"]
+    assert {r["name"] for r in results} >= {"dummy_repository.add", "dummy_repository.add_all"}
+
+    for result in results:
+        result["per_op"] /= 1000
+    output.write_text(json.dumps({"results": results}))
+    assert benchmarks_main.main([*args, "--baseline", str(output)]) == 1
+
+
+def test_load_reports_throughput_and_timeline():
+    report = load.run_load(
+        load.LoadConfig(backend="memory", workers=2, duration=0.2, interval=0.1, rows=10)
+    )
+    assert report.overall.transactions > 0
+    assert report.overall.errors == 0
+    assert len(report.timeline) == 2
+    assert sum(window.transactions for window in report.timeline) == report.overall.transactions
+    assert report.overall.p50 <= report.overall.p99 <= report.overall.max
+
+
+def test_load_memory_workers_share_a_locked_table():
+    table = load._MemoryTable(10)
+    first, second = load._MemoryUOW(table), load._MemoryUOW(table)
+    with first:
+        first.get(load._MemoryRepository).update(cases.Item(item_id=1, name="changed"))
+        assert table.lock.locked()
+        first.save()
+    assert not table.lock.locked()
+    with second:
+        assert second.get(load._MemoryRepository).get(1).name == "changed"
+    assert not table.lock.locked()
+
+
+def test_load_sqlite_backend(tmp_path: pathlib.Path):
+    report = load.run_load(
+        load.LoadConfig(
+            backend="sqlite",
+            workers=2,
+            duration=0.2,
+            interval=0.1,
+            rows=10,
+            db_path=str(tmp_path / "load.db"),
+        )
+    )
+    assert report.overall.transactions > 0
+    assert report.overall.errors == 0
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import array
+import typing
+
+import pytest
+
+import lime_uow as lu
+from tests.conftest import User
+
+
+class UserColumnarRepository(lu.ColumnarRepository[User]):
+    def __init__(self, initial_users: typing.List[User]):
+        super().__init__(
+            entity_type=User,
+            key_fn=lambda user: user.user_id,
+            initial_values=initial_users,
+        )
+
+    @classmethod
+    def interface(cls) -> typing.Type[UserColumnarRepository]:
+        return cls
+
+
+@pytest.fixture
+def columnar_repo() -> UserColumnarRepository:
+    return UserColumnarRepository(
+        [User(user_id=1, name="Mark"), User(user_id=2, name="Mandie")]
+    )
+
+
+def test_columnar_repository_stores_int_fields_in_typed_arrays(
+    columnar_repo: UserColumnarRepository,
+):
+    assert isinstance(columnar_repo._columns["user_id"], array.array)
+    assert isinstance(columnar_repo._columns["name"], list)
+
+
+def test_columnar_repository_add_all_method(columnar_repo: UserColumnarRepository):
+    columnar_repo.add_all([User(3, "Terri"), User(4, "Kellen")])
+    assert list(columnar_repo.all()) == [
+        User(user_id=1, name="Mark"),
+        User(user_id=2, name="Mandie"),
+        User(user_id=3, name="Terri"),
+        User(user_id=4, name="Kellen"),
+    ]
+    assert columnar_repo.get(4) == User(user_id=4, name="Kellen")
+
+
+def test_columnar_repository_rejects_duplicate_keys(
+    columnar_repo: UserColumnarRepository,
+):
+    with pytest.raises(lu.exceptions.DuplicateKeyError):
+        columnar_repo.add_all([User(3, "Terri"), User(1, "Steve")])
+    assert len(columnar_repo) == 2
+
+
+def test_columnar_repository_set_all_rejects_duplicate_keys_without_clearing(
+    columnar_repo: UserColumnarRepository,
+):
+    with pytest.raises(lu.exceptions.DuplicateKeyError):
+        columnar_repo.set_all([User(3, "Terri"), User(3, "Steve")])
+    assert list(columnar_repo.all()) == [User(1, "Mark"), User(2, "Mandie")]
+
+
+def test_columnar_repository_rollback_undoes_each_change_in_reverse(
+    columnar_repo: UserColumnarRepository,
+):
+    columnar_repo.save()
+    columnar_repo.add(User(3, "Terri"))
+    columnar_repo.update(User(1, "Steve"))
+    columnar_repo.delete(User(2, "Mandie"))
+    columnar_repo.set_all([User(5, "Bill")])
+    columnar_repo.delete_many([User(5, "Bill")])
+    columnar_repo.add_all([User(6, "Sue")])
+    columnar_repo.rollback()
+    assert list(columnar_repo.all()) == [User(1, "Mark"), User(2, "Mandie")]
+    assert columnar_repo.get(2) == User(2, "Mandie")
+    assert columnar_repo._undo_log == []
+
+
+def test_columnar_repository_delete_and_update_methods(
+    columnar_repo: UserColumnarRepository,
+):
+    columnar_repo.add(User(3, "Terri"))
+    columnar_repo.delete(User(1, "Mark"))
+    columnar_repo.update(User(3, "Bill"))
+    assert list(columnar_repo.all()) == [User(2, "Mandie"), User(3, "Bill")]
+    assert columnar_repo.get(3) == User(3, "Bill")
+
+
+def test_columnar_repository_rollback_method(columnar_repo: UserColumnarRepository):
+    columnar_repo.add(User(3, "Terri"))
+    columnar_repo.save()
+    columnar_repo.set_all([User(4, "Kellen")])
+    columnar_repo.rollback()
+    assert list(columnar_repo.all()) == [
+        User(user_id=1, name="Mark"),
+        User(user_id=2, name="Mandie"),
+        User(user_id=3, name="Terri"),
+    ]
+    assert columnar_repo.get(3) == User(user_id=3, name="Terri")
+
+
+def test_columnar_repository_savepoint_restores_state_on_error(
+    columnar_repo: UserColumnarRepository,
+):
+    columnar_repo.add(User(3, "Terri"))
+    with pytest.raises(KeyError):
+        with columnar_repo.savepoint():
+            columnar_repo.delete(User(1, "Mark"))
+            columnar_repo.add(User(4, "Kellen"))
+            columnar_repo.get(999)
+    assert [user.user_id for user in columnar_repo.all()] == [1, 2, 3]
+
+    columnar_repo.rollback()
+    assert [user.user_id for user in columnar_repo.all()] == [1, 2]
+
+
+def test_columnar_repository_delete_many_method(columnar_repo: UserColumnarRepository):
+    columnar_repo.add_all([User(3, "Terri"), User(4, "Kellen")])
+    columnar_repo.delete_many([User(1, "Mark"), User(3, "Terri")])
+    assert list(columnar_repo.all()) == [User(2, "Mandie"), User(4, "Kellen")]
+    assert columnar_repo.get(4) == User(4, "Kellen")
+    columnar_repo.rollback()
+    assert len(columnar_repo) == 2
@@ -186,3 +186,32 @@ def test_dummy_repository_set_all_method(dummy_repo: TestDummyRepository):
         ),
         ("all", {}),
     ]
+
+
+class DummyRepositoryUOW(lu.UnitOfWork):
+    def __init__(self, repo: TestDummyRepository):
+        super().__init__()
+        self._repo = repo
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return [self._repo]
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return []
+
+
+def test_savepoint_rolls_back_only_its_own_changes(dummy_repo: TestDummyRepository):
+    with DummyRepositoryUOW(dummy_repo) as uow:
+        repo = uow.get(TestDummyRepository)  # type: ignore
+        repo.add(User(3, "Terri"))
+        with pytest.raises(ValueError):
+            with uow.savepoint():
+                repo.add(User(4, "Steve"))
+                raise ValueError()
+        with uow.savepoint():
+            repo.add(User(5, "Mike"))
+        uow.save()
+
+    assert [user.user_id for user in dummy_repo.all()] == [1, 2, 3, 5]
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import concurrent.futures
+import typing
+
+import pytest
+
+import lime_uow as lu
+from tests.conftest import User
+
+
+class UserRepository(lu.DummyRepository[User]):
+    def __init__(self):
+        super().__init__(key_fn=lambda user: user.user_id)
+        self.fail_next_save = False
+
+    @classmethod
+    def interface(cls) -> typing.Type[UserRepository]:
+        return cls
+
+    def save(self) -> None:
+        if self.fail_next_save:
+            self.fail_next_save = False
+            raise RuntimeError("commit failed")
+        super().save()
+
+
+class UserUOW(lu.UnitOfWork):
+    def __init__(self):
+        super().__init__()
+        self.repo = UserRepository()
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return [self.repo]
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return []
+
+
+def add_user(uow: lu.UnitOfWork, user_id: int) -> int:
+    if user_id < 0:
+        raise ValueError(f"invalid user_id {user_id}")
+    uow.get(UserRepository).add(User(user_id=user_id, name=f"user {user_id}"))  # type: ignore
+    return user_id
+
+
+def test_group_committer_batches_operations_from_many_producers():
+    uow = UserUOW()
+    with lu.GroupCommitter(uow, max_batch_size=50, max_delay=0.01) as committer:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as producers:
+            futures = list(
+                producers.map(lambda i: committer.submit(add_user, i), range(200))
+            )
+        assert [f.result(timeout=5) for f in futures] == list(range(200))
+
+    assert sorted(user.user_id for user in uow.repo.all()) == list(range(200))
+    assert uow.repo.events.count(("save", {})) == committer.batch_count
+    assert committer.operation_count == 200
+    assert committer.batch_count < 200
+
+
+def test_group_committer_fails_only_the_operation_that_raised():
+    uow = UserUOW()
+    with lu.GroupCommitter(uow, max_delay=0.05) as committer:
+        futures = [committer.submit(add_user, i) for i in (1, -1, 2)]
+
+    assert futures[0].result() == 1
+    with pytest.raises(ValueError):
+        futures[1].result()
+    assert futures[2].result() == 2
+    assert sorted(user.user_id for user in uow.repo.all()) == [1, 2]
+
+
+def test_group_committer_reports_commit_errors_to_every_producer():
+    uow = UserUOW()
+    uow.repo.fail_next_save = True
+    with lu.GroupCommitter(uow, max_delay=0.05) as committer:
+        futures = [committer.submit(add_user, i) for i in (1, 2)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="commit failed"):
+            future.result()
+    assert list(uow.repo.all()) == []
+
+
+def test_group_committer_rejects_operations_after_close():
+    committer = lu.GroupCommitter(UserUOW())
+    committer.close()
+    with pytest.raises(lu.exceptions.ResourceClosed):
+        committer.submit(add_user, 1)
+
+
+class AuditLog(lu.Resource[typing.List[str]]):
+    """Resource without savepoint support"""
+
+    def __init__(self):
+        self.saved: typing.List[str] = []
+        self.pending: typing.List[str] = []
+
+    @classmethod
+    def interface(cls) -> typing.Type[AuditLog]:
+        return cls
+
+    def open(self) -> typing.List[str]:
+        return self.pending
+
+    def rollback(self) -> None:
+        self.pending.clear()
+
+    def save(self) -> None:
+        self.saved += self.pending
+        self.pending.clear()
+
+
+class AuditedUserUOW(UserUOW):
+    def __init__(self):
+        super().__init__()
+        self.log = AuditLog()
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return [self.repo, self.log]
+
+
+def log_then_add_user(uow: lu.UnitOfWork, user_id: int) -> int:
+    uow.get(AuditLog).append(f"adding {user_id}")  # type: ignore
+    return add_user(uow, user_id)
+
+
+def test_group_committer_never_commits_partial_writes_without_savepoints():
+    uow = AuditedUserUOW()
+    with lu.GroupCommitter(uow, max_delay=0.05) as committer:
+        futures = [committer.submit(log_then_add_user, i) for i in (1, -1, 2)]
+
+    assert futures[0].result() == 1
+    with pytest.raises(ValueError):
+        futures[1].result()
+    assert futures[2].result() == 2
+    assert uow.log.saved == ["adding 1", "adding 2"]
+    assert sorted(user.user_id for user in uow.repo.all()) == [1, 2]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import typing
+
+import pytest
+
+import lime_uow as lu
+from tests.conftest import User
+
+
+class UserRepository(lu.ColumnarRepository[User]):
+    def __init__(self, initial_users: typing.List[User]):
+        super().__init__(
+            entity_type=User,
+            key_fn=lambda user: user.user_id,
+            initial_values=initial_users,
+        )
+
+    @classmethod
+    def interface(cls) -> typing.Type[UserRepository]:
+        return cls
+
+
+class AdminRepository(UserRepository):
+    @classmethod
+    def interface(cls) -> typing.Type[AdminRepository]:
+        return cls
+
+
+class IdentityMapUOW(lu.UnitOfWork):
+    def __init__(self):
+        super().__init__()
+        self.users = UserRepository([User(1, "Mark"), User(2, "Mandie")])
+        self.admins = AdminRepository([User(1, "Mark")])
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return [self.users, self.admins]
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return []
+
+
+def test_identity_map_counts_hits_and_misses():
+    identity_map = lu.IdentityMap()
+    load = lambda: User(1, "Mark")  # noqa: E731
+    first = identity_map.get_or_load("users", User, 1, load)
+    assert identity_map.get_or_load("users", User, 1, load) is first
+    assert identity_map.get_or_load("admins", User, 1, load) is not first
+    assert identity_map.get_or_load("users", User, 2, lambda: None) is None
+    assert (identity_map.hits, identity_map.misses) == (1, 3)
+    assert identity_map.hit_ratio == pytest.approx(1 / 4)
+    assert len(identity_map) == 2
+
+
+def test_repositories_of_a_unit_of_work_share_its_identity_map():
+    with IdentityMapUOW() as uow:
+        user = uow.get(UserRepository).get(1)
+        assert list(uow.get(UserRepository).all())[0] is user
+        assert uow.get(UserRepository).get(1) is user
+        assert uow.identity_map.hits == 1
+
+
+def test_identity_map_entries_are_scoped_by_repository_store():
+    with IdentityMapUOW() as uow:
+        uow.get(UserRepository).get(2)
+        with pytest.raises(KeyError):
+            uow.get(AdminRepository).get(2)
+        admin = uow.get(AdminRepository).get(1)
+        assert uow.get(UserRepository).get(1) is not admin
+
+
+def test_identity_map_follows_writes():
+    with IdentityMapUOW() as uow:
+        repo = uow.get(UserRepository)
+        repo.get(1)
+        repo.update(User(1, "Steve"))
+        assert repo.get(1) == User(1, "Steve")
+        repo.delete(User(1, "Steve"))
+        assert (repo.identity_scope(), User, 1) not in uow.identity_map
+
+
+def test_identity_map_is_cleared_on_rollback():
+    with IdentityMapUOW() as uow:
+        uow.get(UserRepository).get(1)
+        uow.rollback()
+        assert len(uow.identity_map) == 0
+
+
+def test_identity_map_is_cleared_when_a_savepoint_rolls_back():
+    with IdentityMapUOW() as uow:
+        repo = uow.get(UserRepository)
+        with pytest.raises(ValueError):
+            with uow.savepoint():
+                repo.update(User(2, "Bill"))
+                raise ValueError()
+        assert repo.get(2) == User(2, "Mandie")
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+
+def _loaded_modules(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint(' '.join(sys.modules))"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import lime_uow",
+        "import lime_uow as lu; lu.UnitOfWork; lu.SharedResources; lu.DummyRepository",
+        "from lime_uow import sqlalchemy_resources as lsa; lsa.SqlAlchemyEngine('sqlite://')",
+        "from lime_uow import pyodbc_resources as lpy; lpy.PyodbcConnection('DSN=x')",
+    ],
+)
+def test_backends_are_not_imported_until_a_resource_is_opened(code: str):
+    modules = _loaded_modules(code).split()
+    assert "sqlalchemy" not in modules
+    assert "pyodbc" not in modules
+
+
+def test_importing_lime_uow_only_loads_the_barrel():
+    modules = _loaded_modules("import lime_uow").split()
+    assert sorted(m for m in modules if m.startswith("lime_uow")) == [
+        "lime_uow",
+        "lime_uow._lazy",
+        "lime_uow.exceptions",
+    ]
+
+
+def test_star_import_exposes_every_public_name():
+    import lime_uow
+
+    namespace: dict = {}
+    exec("from lime_uow import *", namespace)
+    assert set(lime_uow.__all__) <= namespace.keys()
+    assert "exceptions" in namespace
+    assert "UnitOfWork" in dir(lime_uow)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import typing
+
+import pytest
+
+import lime_uow as lu
+from tests.unit.test_unit_of_work import DummyUOW
+
+
+def test_unit_of_work_reports_events_to_listeners():
+    events: typing.List[lu.Event] = []
+    uow = DummyUOW()
+    uow.add_listener(events.append)
+    with uow:
+        uow.save()
+    uow.close()
+
+    assert [(e.action, e.resource_name, e.outcome) for e in events] == [
+        ("open", "AbstractDummySharedResource", "ok"),
+        ("enter", None, "ok"),
+        ("save", "AbstractDummyResource", "ok"),
+        ("rollback", "AbstractDummyResource", "ok"),
+        ("close", "AbstractDummyResource", "ok"),
+        ("exit", None, "ok"),
+        ("close", "AbstractDummySharedResource", "ok"),
+    ]
+    assert all(e.source in ("DummyUOW", "SharedResources") for e in events)
+
+
+def test_metrics_collector_counts_events_and_renders_prometheus_text():
+    metrics = lu.MetricsCollector()
+    uow = DummyUOW()
+    uow.add_listener(metrics)
+    for _ in range(3):
+        with uow:
+            uow.save()
+
+    assert metrics.count("enter") == 3
+    assert metrics.count("save", "AbstractDummyResource", "ok") == 3
+    assert metrics.count("save", outcome="error") == 0
+    assert set(metrics.quantiles("enter")) == {0.5, 0.95, 0.99}
+
+    text = metrics.to_prometheus()
+    assert (
+        'lime_uow_events_total{action="enter",resource="",outcome="ok"} 3' in text
+    )
+    assert (
+        'lime_uow_duration_seconds_count{action="save",resource="AbstractDummyResource"} 3'
+        in text
+    )
+
+
+def test_histogram_quantile_interpolates_within_buckets():
+    histogram = lu.Histogram(buckets=[1.0, 2.0, 4.0])
+    for value in [0.5] * 50 + [1.5] * 45 + [3.0] * 5:
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == pytest.approx(1.0)
+    assert histogram.quantile(0.95) == pytest.approx(2.0)
+    assert 2.0 < histogram.quantile(0.99) <= 4.0
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import functools
+import os
+import pathlib
+import random
+import typing
+
+import pytest
+
+import lime_uow as lu
+from lime_uow import process_pool
+
+
+class Connection(lu.Resource[typing.Dict[str, int]]):
+    """Counts the tasks run with one handle, and records its close in a file"""
+
+    def __init__(self, closed_dir: pathlib.Path):
+        self._closed_dir = closed_dir
+        self._handle: typing.Optional[typing.Dict[str, int]] = None
+
+    @classmethod
+    def interface(cls) -> typing.Type[Connection]:
+        return cls
+
+    def close(self) -> None:
+        (self._closed_dir / str(os.getpid())).touch()
+
+    def open(self) -> typing.Dict[str, int]:
+        assert self._handle is None, "opened twice"
+        self._handle = {"tasks": 0}
+        return self._handle
+
+
+class WorkerUOW(lu.UnitOfWork):
+    def __init__(self, closed_dir: pathlib.Path):
+        super().__init__()
+        self._closed_dir = closed_dir
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return []
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return [Connection(self._closed_dir)]
+
+
+def square(uow: lu.UnitOfWork, n: int) -> typing.Tuple[int, int]:
+    uow.get(Connection)["tasks"] += 1  # type: ignore
+    return n * n, os.getpid()
+
+
+def fail_on_three(uow: lu.UnitOfWork, n: int) -> int:
+    if n == 3:
+        raise ValueError(n)
+    return n
+
+
+def jitter(uow: lu.UnitOfWork) -> float:
+    return process_pool._worker_retry_policy.rng.random()  # type: ignore
+
+
+def test_map_streams_results_in_order(tmp_path: pathlib.Path):
+    with lu.ProcessPoolRunner(
+        functools.partial(WorkerUOW, tmp_path), max_workers=2, chunk_size=3, max_in_flight=2
+    ) as runner:
+        results = list(runner.map(square, range(20)))
+        assert [n for n, _ in results] == [n * n for n in range(20)]
+        assert runner.submit(square, 4).result()[0] == 16
+    pids = {pid for _, pid in results}
+    assert {path.name for path in tmp_path.iterdir()} >= {str(pid) for pid in pids}
+
+
+def test_map_raises_task_errors(tmp_path: pathlib.Path):
+    with lu.ProcessPoolRunner(functools.partial(WorkerUOW, tmp_path), max_workers=1) as runner:
+        results = runner.map(fail_on_three, range(5))
+        assert [next(results) for _ in range(3)] == [0, 1, 2]
+        with pytest.raises(ValueError):
+            next(results)
+
+
+def test_map_yields_the_results_before_an_error_in_the_same_chunk(tmp_path: pathlib.Path):
+    with lu.ProcessPoolRunner(
+        functools.partial(WorkerUOW, tmp_path), max_workers=1, chunk_size=5
+    ) as runner:
+        results = runner.map(fail_on_three, range(5))
+        assert [next(results) for _ in range(3)] == [0, 1, 2]
+        with pytest.raises(ValueError):
+            next(results)
+
+
+def test_workers_reseed_the_retry_policy_rng(tmp_path: pathlib.Path):
+    policy = lu.RetryPolicy(rng=random.Random(0))
+    with lu.ProcessPoolRunner(
+        functools.partial(WorkerUOW, tmp_path), max_workers=1, retry_policy=policy
+    ) as runner:
+        assert runner.submit(jitter).result() != random.Random(0).random()
+
+
+def test_warmup_opens_shared_resources(tmp_path: pathlib.Path):
+    uow = WorkerUOW(tmp_path)
+    assert list(uow.warmup()) == [Connection]
+    with uow:
+        assert uow.get(Connection) == {"tasks": 0}  # type: ignore
+    uow.close()
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import pytest
+
+import lime_uow as lu
+
+
+def test_round_robin_hands_out_replicas_in_turn():
+    router = lu.ReplicaRouter("a", "b", "c")
+    assert [router.acquire() for _ in range(4)] == ["a", "b", "c", "a"]
+
+
+def test_least_loaded_prefers_replicas_with_fewer_connections():
+    router = lu.ReplicaRouter("a", "b", strategy="least_loaded")
+    first = router.acquire()
+    second = router.acquire()
+    assert {first, second} == {"a", "b"}
+
+    router.release("b")
+    assert router.acquire() == "b"
+    assert router.in_use() == {"a": 1, "b": 1}
+
+    with router.lease() as replica:
+        assert router.in_use()[replica] == 2
+    assert router.in_use() == {"a": 1, "b": 1}
+
+
+def test_router_requires_a_replica():
+    with pytest.raises(lu.exceptions.InvalidResource):
+        lu.ReplicaRouter()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import random
+import sqlite3
+import typing
+
+import pytest
+import sqlalchemy as sa
+
+import lime_uow as lu
+from tests.unit.test_unit_of_work import AbstractDummyResource, DummyUOW
+
+
+class FakePyodbcError(Exception):
+    __module__ = "pyodbc"
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (FakePyodbcError("40001", "[40001] Transaction was deadlocked (1205)"), True),
+        (FakePyodbcError("40P01", "deadlock detected"), True),
+        (FakePyodbcError("23505", "duplicate key value"), False),
+        (sa.exc.OperationalError("UPDATE", {}, sqlite3.OperationalError("database is locked")), True),
+        (sa.exc.OperationalError("UPDATE", {}, sqlite3.OperationalError("no such table: x")), False),
+        (sa.exc.DBAPIError("SELECT 1", {}, Exception(), connection_invalidated=True), True),
+        (sa.exc.DBAPIError("UPDATE", {}, Exception("40001", "deadlock")), True),
+        (KeyError("40001"), False),
+        (ValueError("bad value"), False),
+    ],
+)
+def test_is_retryable(error: BaseException, expected: bool):
+    assert lu.is_retryable(error) is expected
+
+
+def test_is_retryable_follows_the_exception_chain():
+    try:
+        try:
+            raise FakePyodbcError("40001", "deadlock")
+        except FakePyodbcError as e:
+            raise lu.exceptions.RollbackError("save failed") from e
+    except lu.exceptions.RollbackError as e:
+        assert lu.is_retryable(e)
+
+
+def make_policy(delays: typing.List[float], **kwargs: typing.Any) -> lu.RetryPolicy:
+    return lu.RetryPolicy(sleep=delays.append, rng=random.Random(0), **kwargs)
+
+
+def test_run_retries_retryable_errors_and_reports_them():
+    metrics = lu.MetricsCollector()
+    uow = DummyUOW()
+    uow.add_listener(metrics)
+    attempts = []
+
+    def work(u: lu.UnitOfWork, value: str) -> str:
+        u.get(AbstractDummyResource)  # type: ignore
+        attempts.append(value)
+        if len(attempts) < 3:
+            raise FakePyodbcError("40001", "deadlock")
+        return value
+
+    delays: typing.List[float] = []
+    assert uow.run(work, "done", retry_policy=make_policy(delays)) == "done"
+    assert len(attempts) == 3
+    assert len(delays) == 2
+    assert all(0 <= delay <= 0.05 * 2 ** ix for ix, delay in enumerate(delays))
+    assert metrics.count("retry") == 2
+    assert metrics.count("save") >= 1
+
+
+def test_run_does_not_retry_other_errors():
+    delays: typing.List[float] = []
+    with pytest.raises(ValueError):
+        DummyUOW().run(_fail_with(ValueError("bad")), retry_policy=make_policy(delays))
+    assert delays == []
+
+
+def test_run_gives_up_after_max_attempts():
+    delays: typing.List[float] = []
+    with pytest.raises(FakePyodbcError):
+        DummyUOW().run(
+            _fail_with(FakePyodbcError("40P01", "deadlock")),
+            retry_policy=make_policy(delays, max_attempts=3),
+        )
+    assert len(delays) == 2
+
+
+def test_run_stops_retrying_at_the_deadline():
+    delays: typing.List[float] = []
+    now = [0.0]
+
+    def work(u: lu.UnitOfWork) -> None:
+        now[0] += 10
+        raise FakePyodbcError("40001", "deadlock")
+
+    with pytest.raises(FakePyodbcError):
+        DummyUOW().run(
+            work,
+            retry_policy=make_policy(delays, deadline=15, clock=lambda: now[0]),
+        )
+    assert len(delays) == 1
+
+
+def _fail_with(error: BaseException) -> typing.Callable[[lu.UnitOfWork], None]:
+    def work(u: lu.UnitOfWork) -> None:
+        raise error
+
+    return work
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import typing
+
+import pytest
+
+import lime_uow as lu
+from lime_uow.resources import crc32_shard
+from tests.conftest import User
+
+
+class UserShard(lu.DummyRepository[User]):
+    def __init__(self, fail_on_save: bool = False):
+        super().__init__(key_fn=lambda user: user.user_id)
+        self.fail_on_save = fail_on_save
+
+    @classmethod
+    def interface(cls) -> typing.Type[UserShard]:
+        return cls
+
+    def save(self) -> None:
+        if self.fail_on_save:
+            raise RuntimeError("shard is down")
+        super().save()
+
+    def where(self, predicate: typing.Callable[[User], bool], /) -> typing.List[User]:
+        return [user for user in self.all() if predicate(user)]
+
+
+class ShardedUserRepository(lu.ShardedRepository[User]):
+    def __init__(self, shards: typing.List[UserShard]):
+        super().__init__(
+            shards,
+            key_fn=lambda user: user.user_id,
+            shard_fn=lambda key, shard_count: key % shard_count,
+        )
+
+    @classmethod
+    def interface(cls) -> typing.Type[ShardedUserRepository]:
+        return cls
+
+
+class ShardedUOW(lu.UnitOfWork):
+    def __init__(self, shards: typing.List[UserShard]):
+        super().__init__()
+        self._shards = shards
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return [ShardedUserRepository(self._shards)]
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return []
+
+
+@pytest.fixture
+def shards() -> typing.List[UserShard]:
+    return [UserShard(), UserShard(), UserShard()]
+
+
+def test_crc32_shard_is_stable():
+    assert crc32_shard("customer-42", 8) == crc32_shard("customer-42", 8)
+    assert {crc32_shard(i, 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_point_operations_are_routed_to_one_shard(shards: typing.List[UserShard]):
+    repo = ShardedUserRepository(shards)
+    repo.add(User(4, "Mark"))
+    assert shards[1].all() == [User(4, "Mark")]
+    assert shards[0].all() == shards[2].all() == []
+    assert repo.get(4) == User(4, "Mark")
+    repo.update(User(4, "Steve"))
+    assert shards[1].get(4) == User(4, "Steve")
+
+
+def test_all_gathers_every_shard(shards: typing.List[UserShard]):
+    repo = ShardedUserRepository(shards)
+    users = [User(i, f"user {i}") for i in range(6)]
+    repo.add_all(users)
+    assert sorted(repo.all(), key=lambda user: user.user_id) == users
+    assert shards[2].all() == [User(2, "user 2"), User(5, "user 5")]
+
+
+def test_save_and_rollback_only_touch_changed_shards(shards: typing.List[UserShard]):
+    repo = ShardedUserRepository(shards)
+    repo.add(User(1, "Mark"))
+    repo.save()
+    repo.rollback()
+    assert [("save", {}) in shard.events for shard in shards] == [False, True, False]
+    assert all(("rollback", {}) not in shard.events for shard in shards)
+
+
+def test_save_rolls_back_shards_that_were_only_read(shards: typing.List[UserShard]):
+    repo = ShardedUserRepository(shards)
+    repo.add(User(1, "Mark"))
+    repo.all()
+    repo.where(lambda user: user.name == "Mark")
+    repo.save()
+    assert [("save", {}) in shard.events for shard in shards] == [False, True, False]
+    assert [("rollback", {}) in shard.events for shard in shards] == [True, False, True]
+
+
+def test_rollback_ends_the_transactions_of_shards_that_were_read(
+    shards: typing.List[UserShard],
+):
+    repo = ShardedUserRepository(shards)
+    shards[2].add(User(2, "Mandie"))
+    assert repo.get(2) == User(2, "Mandie")
+    repo.rollback()
+    assert [("rollback", {}) in shard.events for shard in shards] == [False, False, True]
+    # nothing was used since
+    repo.rollback()
+    assert [shard.events.count(("rollback", {})) for shard in shards] == [0, 0, 1]
+
+
+def test_where_filters_every_shard(shards: typing.List[UserShard]):
+    repo = ShardedUserRepository(shards)
+    repo.add_all([User(i, f"user {i}") for i in range(6)])
+    actual = repo.where(lambda user: user.user_id % 2 == 0)
+    assert sorted(actual, key=lambda user: user.user_id) == [
+        User(0, "user 0"),
+        User(2, "user 2"),
+        User(4, "user 4"),
+    ]
+
+
+def test_sharded_repository_in_a_unit_of_work(shards: typing.List[UserShard]):
+    with ShardedUOW(shards) as uow:
+        repo = uow.get(ShardedUserRepository)
+        repo.add_all([User(i, f"user {i}") for i in range(3)])
+        uow.save()
+        assert all(("save", {}) in shard.events for shard in shards)
+        assert repo._executor is None
+        repo.get(1)
+        repo.update(User(1, "Steve"))
+        uow.rollback()
+    assert ("rollback", {}) in shards[1].events
+    assert ("rollback", {}) not in shards[0].events
+    assert ("rollback", {}) not in shards[2].events
+
+
+def test_shard_errors_are_aggregated():
+    shards = [UserShard(fail_on_save=True), UserShard(), UserShard(fail_on_save=True)]
+    repo = ShardedUserRepository(shards)
+    repo.add_all([User(i, f"user {i}") for i in range(3)])
+    with pytest.raises(lu.exceptions.ShardErrors) as exc_info:
+        repo.save()
+    assert exc_info.value.action == "save"
+    assert sorted(exc_info.value.errors) == [0, 2]
+    repo.close()
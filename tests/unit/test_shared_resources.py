@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import threading
+import time
+import typing
+
+import pytest
+
+import lime_uow as lu
+
+
+class OrderedResource(lu.Resource[str]):
+    def __init__(
+        self,
+        events: typing.List[str],
+        *,
+        depends_on: typing.Iterable[typing.Type[lu.Resource[typing.Any]]] = (),
+        barrier: typing.Optional[threading.Barrier] = None,
+    ):
+        self._events = events
+        self._depends_on = tuple(depends_on)
+        self._barrier = barrier
+
+    def dependencies(self) -> typing.Iterable[typing.Type[lu.Resource[typing.Any]]]:
+        return self._depends_on
+
+    def open(self) -> str:
+        if self._barrier is not None:
+            self._barrier.wait()
+        self._events.append(f"open {self.interface().__name__}")
+        return self.interface().__name__
+
+    def close(self) -> None:
+        self._events.append(f"close {self.interface().__name__}")
+
+
+class Engine(OrderedResource):
+    @classmethod
+    def interface(cls) -> typing.Type[Engine]:
+        return cls
+
+
+class SessionFactory(OrderedResource):
+    @classmethod
+    def interface(cls) -> typing.Type[SessionFactory]:
+        return cls
+
+
+class Cache(OrderedResource):
+    @classmethod
+    def interface(cls) -> typing.Type[Cache]:
+        return cls
+
+
+def test_shared_resources_warmup_respects_dependencies():
+    events: typing.List[str] = []
+    shared_resources = lu.SharedResources(
+        SessionFactory(events, depends_on=[Engine]),
+        Engine(events),
+    )
+    timings = shared_resources.warmup()
+    assert events == ["open Engine", "open SessionFactory"]
+    assert set(timings) == {Engine, SessionFactory}
+    assert shared_resources.get(SessionFactory) == "SessionFactory"
+
+    shared_resources.close()
+    assert events[2:] == ["close SessionFactory", "close Engine"]
+
+
+def test_shared_resources_warmup_opens_independent_resources_concurrently():
+    events: typing.List[str] = []
+    barrier = threading.Barrier(2, timeout=5)
+    shared_resources = lu.SharedResources(
+        Engine(events, barrier=barrier),
+        Cache(events, barrier=barrier),
+    )
+    shared_resources.warmup()
+    assert sorted(events) == ["open Cache", "open Engine"]
+    assert set(shared_resources.close()) == {Cache, Engine}
+
+
+def test_shared_resources_close_only_closes_opened_handles():
+    events: typing.List[str] = []
+    shared_resources = lu.SharedResources(Engine(events), Cache(events))
+    shared_resources.get(Cache)
+    shared_resources.close()
+    assert events == ["open Cache", "close Cache"]
+
+
+def test_shared_resources_rejects_circular_dependencies():
+    with pytest.raises(lu.exceptions.InvalidResource, match="circular dependencies"):
+        lu.SharedResources(
+            Engine([], depends_on=[SessionFactory]),
+            SessionFactory([], depends_on=[Engine]),
+        )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_shared_resources_evicts_idle_handles_between_transactions():
+    events: typing.List[str] = []
+    clock = FakeClock()
+    shared_resources = lu.SharedResources(
+        Engine(events),
+        expiry_policies={Engine: lu.ExpiryPolicy(idle_timeout=10)},
+        clock=clock,
+    )
+    shared_resources.get(Engine)
+    clock.now = 5
+    shared_resources.get(Engine)
+    clock.now = 14
+    assert shared_resources.evict_expired() == 0
+
+    clock.now = 25
+    # a handle is never closed on access, since a transaction may be using it
+    shared_resources.get(Engine)
+    assert events == ["open Engine"]
+    clock.now = 36
+    assert shared_resources.evict_expired() == 1
+    shared_resources.get(Engine)
+    assert events == ["open Engine", "close Engine", "open Engine"]
+    assert (shared_resources.eviction_count, shared_resources.reopen_count) == (1, 1)
+
+
+def test_shared_resources_counts_use_of_dependents_as_use():
+    events: typing.List[str] = []
+    clock = FakeClock()
+    shared_resources = lu.SharedResources(
+        SessionFactory(events, depends_on=[Engine]),
+        Engine(events),
+        expiry_policies={Engine: lu.ExpiryPolicy(idle_timeout=10)},
+        clock=clock,
+    )
+    shared_resources.warmup()
+    clock.now = 8
+    shared_resources.get(SessionFactory)
+    clock.now = 16
+    assert shared_resources.evict_expired() == 0
+    assert events == ["open Engine", "open SessionFactory"]
+
+
+def test_shared_resources_evict_expired_closes_handles_past_max_lifetime():
+    events: typing.List[str] = []
+    clock = FakeClock()
+    shared_resources = lu.SharedResources(
+        Engine(events),
+        Cache(events),
+        expiry_policies={Engine: lu.ExpiryPolicy(max_lifetime=10)},
+        clock=clock,
+    )
+    shared_resources.warmup()
+    clock.now = 11
+    assert shared_resources.evict_expired() == 1
+    assert events[-1] == "close Engine"
+    assert shared_resources.generation == 1
+    assert (shared_resources.eviction_count, shared_resources.reopen_count) == (1, 0)
+
+    shared_resources.get(Engine)
+    assert events[-1] == "open Engine"
+    assert shared_resources.reopen_count == 1
+
+
+def test_shared_resources_evicts_dependents_with_their_dependency():
+    events: typing.List[str] = []
+    clock = FakeClock()
+    shared_resources = lu.SharedResources(
+        SessionFactory(events, depends_on=[Engine]),
+        Engine(events),
+        Cache(events),
+        expiry_policies={Engine: lu.ExpiryPolicy(max_lifetime=10)},
+        clock=clock,
+    )
+    shared_resources.warmup()
+    clock.now = 11
+    assert shared_resources.evict_expired() == 2
+    assert events[-2:] == ["close SessionFactory", "close Engine"]
+
+    shared_resources.warmup()
+    clock.now = 22
+    assert shared_resources.evict_expired() == 2
+    assert events[-4:] == [
+        "open Engine",
+        "open SessionFactory",
+        "close SessionFactory",
+        "close Engine",
+    ]
+    assert shared_resources.eviction_count == 4
+
+
+class ExpiringUOW(lu.UnitOfWork):
+    def __init__(self, events: typing.List[str]):
+        super().__init__()
+        self._events = events
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return []
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return [Engine(self._events)]
+
+    def expiry_policies(
+        self,
+    ) -> typing.Mapping[typing.Type[lu.Resource[typing.Any]], lu.ExpiryPolicy]:
+        return {Engine: lu.ExpiryPolicy(max_lifetime=0.01)}
+
+
+def test_unit_of_work_only_evicts_expired_handles_between_transactions():
+    events: typing.List[str] = []
+    uow = ExpiringUOW(events)
+    with uow:
+        uow.get(Engine)
+        time.sleep(0.02)
+        uow.get(Engine)
+        assert events == ["open Engine"]
+    with uow:
+        assert events == ["open Engine", "close Engine"]
+        uow.get(Engine)
+    assert events == ["open Engine", "close Engine", "open Engine"]
+    uow.close()
+
+
+class FailingSessionFactory(SessionFactory):
+    def close(self) -> None:
+        super().close()
+        raise RuntimeError("close failed")
+
+
+def test_shared_resources_close_closes_every_level_and_collects_errors():
+    events: typing.List[str] = []
+    shared_resources = lu.SharedResources(
+        FailingSessionFactory(events, depends_on=[Engine]),
+        Engine(events),
+    )
+    shared_resources.warmup()
+    with pytest.raises(lu.exceptions.CloseErrors) as exc_info:
+        shared_resources.close()
+    assert events[2:] == ["close FailingSessionFactory", "close Engine"]
+    assert list(exc_info.value.errors) == ["FailingSessionFactory"]
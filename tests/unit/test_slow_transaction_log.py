@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+import pathlib
+import time
+import typing
+
+import lime_uow as lu
+from tests.unit.test_unit_of_work import AbstractDummyResource, DummyUOW
+
+
+def test_slow_transaction_log_reports_transactions_over_threshold():
+    records: typing.List[lu.SlowTransaction] = []
+    uow = DummyUOW()
+    uow.log_slow_transactions(0.01, records.append)
+
+    with uow:
+        uow.get(AbstractDummyResource)  # type: ignore
+        uow.get(AbstractDummyResource)  # type: ignore
+        uow.save()
+
+    with uow:
+        time.sleep(0.02)
+        uow.get(AbstractDummyResource)  # type: ignore
+        uow.save()
+
+    assert len(records) == 1
+    record = records[0]
+    assert record.unit_of_work == "DummyUOW"
+    assert record.duration >= 0.02
+    assert record.get_count == 1
+    assert [r.resource_name for r in record.resources] == ["AbstractDummyResource"]
+    assert record.caller is not None and __file__ in record.caller
+
+
+def test_slow_transaction_log_reports_the_with_statement_of_read_only():
+    records: typing.List[lu.SlowTransaction] = []
+    uow = DummyUOW()
+    uow.log_slow_transactions(0, records.append)
+    with uow.read_only():
+        uow.get(AbstractDummyResource)  # type: ignore
+
+    assert len(records) == 1
+    assert records[0].caller is not None and __file__ in records[0].caller
+
+
+def test_slow_transaction_log_keeps_totals_rather_than_events():
+    records: typing.List[lu.SlowTransaction] = []
+    uow = DummyUOW()
+    listener = uow.log_slow_transactions(0, records.append)
+    with uow:
+        for _ in range(1000):
+            uow.get(AbstractDummyResource)  # type: ignore
+        assert listener._local.transaction.get_count == 1000
+        assert not hasattr(listener._local, "events")
+    assert records[0].get_count == 1000
+    assert listener._local.transaction is None
+
+
+def test_json_lines_sink(tmp_path: pathlib.Path):
+    file_path = tmp_path / "slow.jsonl"
+    uow = DummyUOW()
+    uow.log_slow_transactions(0, lu.JsonLinesSink(file_path))
+    with uow:
+        uow.save()
+
+    lines = file_path.read_text().splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record["unit_of_work"] == "DummyUOW"
+    assert record["resources"][0]["resource_name"] == "AbstractDummySharedResource"
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+
+import sqlalchemy as sa
+
+import lime_uow as lu
+from lime_uow import sqlalchemy_resources
+from tests.unit.test_unit_of_work import AbstractDummyResource, DummyUOW
+
+
+def test_tracing_creates_root_span_with_resource_children():
+    tracer = lu.InMemoryTracer()
+    uow = DummyUOW()
+    uow.trace(tracer)
+
+    with uow:
+        uow.get(AbstractDummyResource)  # type: ignore
+        uow.save()
+
+    root = next(span for span in tracer.spans if span.parent_id is None)
+    children = [span for span in tracer.spans if span.parent_id == root.span_id]
+    assert root.name == "DummyUOW"
+    assert root.attributes["lime_uow.get_count"] == 1
+    assert {span.trace_id for span in tracer.spans} == {root.trace_id}
+    assert "save AbstractDummyResource" in {span.name for span in children}
+    assert "rollback AbstractDummyResource" in {span.name for span in children}
+    assert all(
+        root.start_time <= span.start_time <= span.end_time <= root.end_time  # type: ignore
+        for span in children
+    )
+    assert len(json.loads(tracer.to_json())) == len(tracer.spans)
+
+
+def test_sql_statements_are_nested_under_the_transaction():
+    tracer = lu.InMemoryTracer()
+    listener = lu.TracingListener(tracer)
+    engine = sa.create_engine("sqlite://")
+    sqlalchemy_resources.instrument_engine(engine, listener)
+    uow = DummyUOW()
+    uow.add_listener(listener)
+
+    with uow:
+        engine.execute("SELECT 1")
+
+    root = next(span for span in tracer.spans if span.parent_id is None)
+    execute_span = next(span for span in tracer.spans if span.name == "execute")
+    assert execute_span.parent_id == root.span_id
+    assert execute_span.attributes["db.statement"] == "SELECT 1"
+    assert execute_span.attributes["db.system"] == "sqlite"
+
+
+def test_statements_outside_a_transaction_are_not_buffered():
+    tracer = lu.InMemoryTracer()
+    listener = lu.TracingListener(tracer)
+    engine = sa.create_engine("sqlite://")
+    sqlalchemy_resources.instrument_engine(engine, listener)
+    for _ in range(10):
+        engine.execute("SELECT 1")
+    assert not getattr(listener._local, "events", None)
+    assert not getattr(listener._local, "pending", None)
+
+    uow = DummyUOW()
+    uow.add_listener(listener)
+    with uow:
+        pass
+    engine.execute("SELECT 1")
+    assert "execute" not in {span.name for span in tracer.spans}
+    assert listener._local.events is None
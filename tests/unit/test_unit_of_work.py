@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import abc
+import contextlib
 import typing
 
+import pytest
+
 import lime_uow as lu
 
 
@@ -67,3 +70,180 @@ def test_unit_of_work_get_resource_given_interface():
     with DummyUOW() as uow:
         repo = uow.get(AbstractDummyResource)  # type: ignore  # see mypy issue 5374
     assert type(repo) is DummyResource
+
+
+def _make_resource_class() -> typing.Type[lu.Resource[typing.Any]]:
+    class SameNameResource(lu.Resource[typing.Any]):
+        def __init__(self):
+            self.open_count = 0
+
+        @classmethod
+        def interface(cls) -> typing.Type[SameNameResource]:
+            return cls
+
+        def open(self) -> SameNameResource:
+            self.open_count += 1
+            return self
+
+    return SameNameResource
+
+
+FirstResource = _make_resource_class()
+SecondResource = _make_resource_class()
+
+
+class SameNameUOW(lu.UnitOfWork):
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return [FirstResource(), SecondResource()]
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return []
+
+
+def test_unit_of_work_keys_resources_by_type_rather_than_name():
+    with SameNameUOW() as uow:
+        first = uow.get(FirstResource)
+        second = uow.get(SecondResource)
+        assert type(first) is FirstResource
+        assert type(second) is SecondResource
+
+
+def test_unit_of_work_get_caches_handles_within_a_transaction():
+    uow = SameNameUOW()
+    with uow:
+        handle = uow.get(FirstResource)
+        assert uow.get(FirstResource) is handle
+        assert handle.open_count == 1  # type: ignore
+    with uow:
+        assert uow.get(FirstResource) is not handle
+
+
+class RecyclableResource(lu.Resource[typing.Any]):
+    created = 0
+
+    def __init__(self, recyclable: bool):
+        type(self).created += 1
+        self.recyclable = recyclable
+        self.resets = 0
+
+    @classmethod
+    def interface(cls) -> typing.Type[RecyclableResource]:
+        return cls
+
+    def reset(self) -> bool:
+        self.resets += 1
+        return self.recyclable
+
+
+class RecyclingUOW(lu.UnitOfWork):
+    def __init__(self, recyclable: bool):
+        super().__init__()
+        self._recyclable = recyclable
+
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return [RecyclableResource(self._recyclable)]
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return []
+
+
+@pytest.mark.parametrize("recyclable, expected_created", [(True, 1), (False, 3)])
+def test_unit_of_work_reuses_resources_that_can_be_reset(
+    recyclable: bool, expected_created: int
+):
+    RecyclableResource.created = 0
+    uow = RecyclingUOW(recyclable)
+    for _ in range(3):
+        with uow:
+            resource = uow.get(RecyclableResource)  # type: ignore
+    assert RecyclableResource.created == expected_created
+    assert resource.resets == (3 if recyclable else 1)
+
+
+def test_unit_of_work_cannot_be_entered_twice():
+    uow = RecyclingUOW(True)
+    with uow:
+        with pytest.raises(lu.exceptions.LimeUoWException, match="already in a transaction"):
+            uow.__enter__()
+
+
+savepoint_log: typing.List[str] = []
+
+
+class SavepointResource(lu.Resource[typing.Any]):
+    transactional = False
+
+    @classmethod
+    def interface(cls) -> typing.Type[SavepointResource]:
+        return cls
+
+    def is_transactional(self) -> bool:
+        return self.transactional
+
+    def open(self) -> SavepointResource:
+        savepoint_log.append(f"open {self.__class__.__name__}")
+        return self
+
+    @contextlib.contextmanager
+    def savepoint(self) -> typing.Iterator[None]:
+        savepoint_log.append(f"savepoint {self.__class__.__name__}")
+        try:
+            yield
+        except BaseException:
+            savepoint_log.append(f"rollback to {self.__class__.__name__}")
+            raise
+
+
+class UsedResource(SavepointResource):
+    pass
+
+
+class UnusedResource(SavepointResource):
+    pass
+
+
+class LateResource(SavepointResource):
+    pass
+
+
+class EnlistedResource(SavepointResource):
+    transactional = True
+
+
+class SavepointUOW(lu.UnitOfWork):
+    def create_resources(
+        self, shared_resources: lu.SharedResources
+    ) -> typing.List[lu.Resource[typing.Any]]:
+        return [UsedResource(), UnusedResource(), LateResource()]
+
+    def create_shared_resources(self) -> typing.List[lu.Resource[typing.Any]]:
+        return [EnlistedResource()]
+
+
+def test_savepoint_covers_open_and_enlisted_resources_and_those_opened_inside_it():
+    savepoint_log.clear()
+    with SavepointUOW() as uow:
+        uow.get(UsedResource)
+        uow.get(EnlistedResource)
+        savepoint_log.clear()
+        with pytest.raises(ValueError):
+            with uow.savepoint():
+                with uow.savepoint():
+                    uow.get(LateResource)
+                raise ValueError()
+    assert savepoint_log == [
+        "savepoint UsedResource",
+        "savepoint EnlistedResource",
+        "savepoint UsedResource",
+        "savepoint EnlistedResource",
+        "open LateResource",
+        "savepoint LateResource",
+        "savepoint LateResource",
+        "rollback to LateResource",
+        "rollback to EnlistedResource",
+        "rollback to UsedResource",
+    ]
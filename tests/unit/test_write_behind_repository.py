@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import typing
+
+import pytest
+
+import lime_uow as lu
+from tests.conftest import User
+
+
+class UserRepository(lu.DummyRepository[User]):
+    def __init__(self):
+        super().__init__(
+            key_fn=lambda user: user.user_id,
+            initial_values=[User(1, "Mark"), User(2, "Mandie")],
+        )
+
+    @classmethod
+    def interface(cls) -> typing.Type[UserRepository]:
+        return cls
+
+
+class WriteBehindUserRepository(lu.WriteBehindRepository[User]):
+    def __init__(self, inner: UserRepository):
+        super().__init__(inner, key_fn=lambda user: user.user_id)
+
+    @classmethod
+    def interface(cls) -> typing.Type[WriteBehindUserRepository]:
+        return cls
+
+
+@pytest.fixture
+def inner() -> UserRepository:
+    return UserRepository()
+
+
+@pytest.fixture
+def repo(inner: UserRepository) -> WriteBehindUserRepository:
+    return WriteBehindUserRepository(inner)
+
+
+def test_writes_are_collapsed_and_flushed_in_batches_on_save(
+    inner: UserRepository, repo: WriteBehindUserRepository
+):
+    for i in range(3, 6):
+        repo.add(User(i, "new"))
+        repo.update(User(i, f"user {i}"))
+    repo.delete(User(5, "user 5"))
+    repo.update(User(1, "Steve"))
+    repo.update(User(1, "Bill"))
+    repo.delete(User(2, "Mandie"))
+    assert repo.pending == 4
+    assert inner.events == []
+
+    repo.save()
+    assert [event for event, _ in inner.events] == [
+        "delete",
+        "update",
+        "add_all",
+        "save",
+    ]
+    assert inner.all() == [User(1, "Bill"), User(3, "user 3"), User(4, "user 4")]
+    assert repo.pending == 0
+
+
+def test_reads_see_buffered_writes(repo: WriteBehindUserRepository):
+    repo.add(User(3, "Terri"))
+    repo.update(User(1, "Steve"))
+    repo.delete(User(2, "Mandie"))
+    assert repo.all() == [User(1, "Steve"), User(3, "Terri")]
+    assert repo.get(3) == User(3, "Terri")
+    with pytest.raises(KeyError):
+        repo.get(2)
+
+
+def test_adding_a_pending_key_raises(repo: WriteBehindUserRepository):
+    repo.add(User(3, "Terri"))
+    with pytest.raises(lu.exceptions.DuplicateKeyError):
+        repo.add(User(3, "Terri"))
+    repo.update(User(1, "Steve"))
+    with pytest.raises(lu.exceptions.DuplicateKeyError):
+        repo.add(User(1, "Steve"))
+    repo.delete(User(2, "Mandie"))
+    repo.add(User(2, "Bill"))
+    assert repo.pending == 3
+
+
+def test_updating_a_pending_delete_raises(repo: WriteBehindUserRepository):
+    repo.delete(User(2, "Mandie"))
+    with pytest.raises(KeyError):
+        repo.update(User(2, "Bill"))
+    assert repo.all() == [User(1, "Mark")]
+
+
+def test_rollback_drops_the_buffer(
+    inner: UserRepository, repo: WriteBehindUserRepository
+):
+    repo.add(User(3, "Terri"))
+    repo.rollback()
+    assert repo.pending == 0
+    assert repo.all() == [User(1, "Mark"), User(2, "Mandie")]
+    assert [event for event, _ in inner.events] == ["rollback", "all"]